@@ -0,0 +1,43 @@
+"""
+This module offers a calendar for scheduling the deaths of animals ahead of time.
+"""
+import heapq
+import itertools
+from entities import Animal
+from typing import List
+
+class DeathCalendar:
+    """
+    A priority queue of the steps at which animals die of old age or starvation.
+
+    Animals book their death when they are born and rebook it when their energy changes (see entities.Animal).
+    Rebooking leaves the old entry in the queue; it is recognised as outdated and dropped when its step comes.
+    """
+    __slots__ = [
+        "_queue",
+        "_counter"
+    ]
+
+    def __init__(self):
+        self._queue = [] # Heap of (step, booking number, animal)
+        self._counter = itertools.count() # Keeps bookings for the same step in order, without comparing animals
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def book(self, animal: Animal, step: int) -> None:
+        """Books the death of an animal at the given step.
+        """
+        heapq.heappush(self._queue, (step, next(self._counter), animal))
+
+    def due(self, step: int) -> List[Animal]:
+        """Removes and returns the animals booked to die at or before the given step, in order of booking.
+        Outdated bookings are dropped.
+        """
+        queue = self._queue
+        animals = []
+        while queue and queue[0][0] <= step:
+            booked_step, _, animal = heapq.heappop(queue)
+            if animal.death_step() == booked_step:
+                animals.append(animal)
+        return animals
@@ -1,23 +1,67 @@
 from parameters import Population
+import math
 import random
 from typing import List, Optional, Tuple
 
+# Species codes, used instead of isinstance checks when dispatching on the kind of animal
+FOX = 0
+RABBIT = 1
+
+_MASK = (1 << 64) - 1
+
+def _mix(value: int) -> int:
+    """Scrambles a 64 bit integer (splitmix64 finaliser). Used for drawing deterministic values from a seed.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
 class Animal:
     """
     A generic animal in the simulation. See classes Fox and Rabbit.
+
+    Class variables
+    ---------------
+    - calendar: A calendar booking the step at which every animal dies (see calendars.DeathCalendar).
+      None (default) if animals age by being ticked. With a calendar, ticking an animal only records that it has
+      passed the current step and removes it once its death is due. Its age and energy follow from the steps it has
+      passed since it was last settled (see Patch.current_step), and its death is rebooked whenever its energy changes
+      by feeding or reproducing.
+    - pool: Dead animals kept for newborns, a list per species code (see spawn and recycle).
+      None (default) if every newborn is a new object.
     """
+    __slots__ = [
+        "_population",
+        "_patch",
+        "_energy",
+        "_age",
+        "_settled_step",
+        "_ticked_step",
+        "_death_step"
+    ]
+    species_code = None # Set by subclasses to FOX or RABBIT
+    calendar = None
+    pool = None
+
     def __init__(self, population: Population, patch: "Patch", energy: int, age: int):
         patch.add(self)
         self._population = population
         self._patch = patch
         self._energy = energy
         self._age = age
+        self._settled_step = Patch.current_step
+        self._ticked_step = Patch.current_step # Newborns are not ticked in the step they are born
+        self._death_step = None
+        self._book_death()
     
     def age(self) -> int:
         """
         Returns the age of the animal. The value does not change after the death of the animal.
         """
-        return self._age
+        if Animal.calendar is None:
+            return self._age
+        return self._age + self._now() - self._settled_step
     
     def can_reproduce(self) -> bool:
         """
@@ -34,7 +78,78 @@ class Animal:
         """
         Returns the energy of the animal. The value does not change after the death of the animal.
         """
-        return self._energy
+        if Animal.calendar is None:
+            return self._energy
+        elapsed = self._now() - self._settled_step
+        return self._energy - self._population.metabolism * elapsed
+
+    @classmethod
+    def spawn(cls, population: Population, patch: "Patch", age: int, energy: Optional[int] = None) -> "Animal":
+        """
+        Returns a new animal of this class, re-initialising a dead one from the pool if there is one.
+        Takes the same arguments as the constructor of the class.
+        """
+        pool = Animal.pool
+        if pool is not None and pool[cls.species_code]:
+            animal = pool[cls.species_code].pop()
+            animal.__init__(population, patch, age, energy)
+            return animal
+        return cls(population, patch, age, energy)
+
+    def recycle(self) -> None:
+        """
+        Returns this dead animal to the pool, to be re-initialised for a newborn (see spawn). Does nothing without
+        a pool. The animal must not be used afterwards.
+        """
+        if Animal.pool is not None:
+            Animal.pool[self.species_code].append(self)
+
+    def death_step(self) -> Optional[int]:
+        """
+        Returns the step at which the animal dies, as booked in the calendar. None if there is no calendar.
+        """
+        return self._death_step
+
+    def _now(self) -> int:
+        """
+        With a calendar, returns the step the age and energy of the animal have reached: the current step once the
+        animal has been ticked in it, the step before until then, and at most the step of its death.
+        """
+        step = Patch.current_step
+        if self._ticked_step != step:
+            step -= 1
+        return min(step, self._death_step)
+
+    def _settle(self) -> None:
+        """
+        With a calendar, stores the age and energy reached so far (see _now).
+        Must be called before changing the energy of the animal.
+        """
+        if Animal.calendar is None:
+            return
+        now = self._now()
+        elapsed = now - self._settled_step
+        if elapsed > 0:
+            self._age += elapsed
+            self._energy -= self._population.metabolism * elapsed
+            self._settled_step = now
+
+    def _book_death(self) -> None:
+        """
+        With a calendar, books the step at which the animal dies of old age or starvation unless it feeds before.
+        Must be called after changing the energy of the animal. The booking is left as it is if the step is unchanged.
+        """
+        calendar = Animal.calendar
+        if calendar is None:
+            return
+        population = self._population
+        steps_left = population.max_age - self._age
+        if population.metabolism > 0:
+            steps_left = min(steps_left, math.ceil(self._energy / population.metabolism))
+        death_step = self._settled_step + max(0, steps_left)
+        if death_step != self._death_step:
+            self._death_step = death_step
+            calendar.book(self, death_step)
     
     def feed(self) -> None: 
         """
@@ -62,6 +177,12 @@ class Animal:
         Returns the position of the animal. The value does not change after the death of the animal.
         """
         return self._patch
+
+    def population(self) -> Population:
+        """
+        Returns the parameters of the population of the animal.
+        """
+        return self._population
     
     def predators_in(self, patch: "Patch") -> bool:
         """
@@ -82,7 +203,7 @@ class Animal:
         Return True if the given patch contains an alive animal of the same species.
         """
         for animal in patch.animals(): 
-            if animal._population.species == self._population.species:
+            if animal.species_code == self.species_code:
                 return True
             else:
                 return False
@@ -92,8 +213,13 @@ class Animal:
         Records the passage of time (one step in the simulation).
         If the animal is alive, it ages and consumes its energy.
         If the animal becomes too old or depletes its energy reserve, it dies and it is removed from its current patch.
+        With a calendar, the age and energy follow from the step, and the animal is removed if its death is due.
         """
-        if self.is_alive() == False:
+        if Animal.calendar is not None:
+            self._ticked_step = Patch.current_step
+            if self._death_step <= Patch.current_step:
+                self.patch().remove(self)
+        elif self.is_alive() == False:
             animal = self #This is done to avoid confusion between self referring to the animal or the patch
             animal.patch().remove(animal)
         else:
@@ -127,25 +253,26 @@ class Fox(Animal):
     - population: The parameters for the fox population used in this run of the simulation.
     - patch: The position assigned to this animal (the constructor takes care of adding it to the list of animals of this patch).
     - Age: The current age of the animal
+    - energy: The starting energy of the animal (default 70% of the maximum energy of the population)
 
     Class variables
     ---------------
     - food_energy_per_unit: How much energy a fox gains when eating a rabbit
     - reproduction_cost_rate: The cost of reproduction as a percentage og the minimum reproduction level
+    - species_code: The species code of foxes (FOX)
     """
+    __slots__ = []
     reproduction_cost_rate = 0.85
     food_energy_per_unit = 15
+    species_code = FOX
     
-    def __init__(self, population : Population, patch: "Patch", age:int):
-        self._energy = int(population.max_energy * 0.70)
-        self._population = population
-        self._patch = patch
-        self._age = age
-        self._was_killed = False
-        super().__init__(population = self._population,
-                         patch = self._patch,
-                         energy = self._energy,
-                         age = self._age)
+    def __init__(self, population : Population, patch: "Patch", age:int, energy: Optional[int] = None):
+        if energy is None:
+            energy = int(population.max_energy * 0.70)
+        super().__init__(population = population,
+                         patch = patch,
+                         energy = energy,
+                         age = age)
 
     def is_alive(self) -> bool:
         """
@@ -155,7 +282,7 @@ class Fox(Animal):
         -------
         A bool indicating if the animal is alive
         """
-        if self._energy > 0 and self._age < self._population.max_age:
+        if self.energy() > 0 and self.age() < self._population.max_age:
             return True
         else:
             return False
@@ -169,14 +296,16 @@ class Fox(Animal):
         """
         animals = self.patch().animals()
         if self.is_alive() and self.energy() < self._population.max_energy and self.patch().has_alive_rabbit():
+            self._settle()
             for animal in animals:
-                if isinstance(animal, Rabbit):
+                if animal.species_code == RABBIT:
                     if Fox.food_energy_per_unit + self.energy() > self._population.max_energy:
                         self._energy = self._population.max_energy
                         animal.kill()
                     else:
                         self._energy += Fox.food_energy_per_unit 
                         animal.kill()
+            self._book_death()
                 
     def reproduce(self, newborn_patch: "Patch") -> Optional["Fox"]:
         """ Returns an instance of this class when successful and reduces the energy reserve of this animal 
@@ -194,8 +323,10 @@ class Fox(Animal):
             probability = self._population.reproduction_probability
             reproduction_res = random.random()
             if reproduction_res <= probability:
+                self._settle()
                 self._energy -= (self._population.reproduction_min_energy * Fox.reproduction_cost_rate)
-                fox = Fox(population = self._population,
+                self._book_death()
+                fox = Fox.spawn(population = self._population,
                                 patch = newborn_patch,
                                 age = 0)
                 # If animal dies after reproduction, remove it
@@ -227,6 +358,7 @@ class Rabbit(Animal):
     - population: The parameters for the rabbit population used in this run of the simulation.
     - patch: The parameters for the rabbit population used in this run of the simulation.
     - age: The current age of the animal
+    - energy: The starting energy of the animal (default 25% of the maximum energy of the population)
 
     Ancestors
     ---------
@@ -236,28 +368,33 @@ class Rabbit(Animal):
     ----------------
     - reproduction_cost_rate: The cost of reproduction as a percentage og the minimum reproduction level
     - feeding_metabolism_rate: A percentage of how much of a rabbits metabolism it can use for feeding
+    - species_code: The species code of rabbits (RABBIT)
     """
+    __slots__ = [
+        "_was_killed"
+    ]
     reproduction_cost_rate = 0.85
     feeding_metabolism_rate = 2.5
+    species_code = RABBIT
 
-    def __init__(self, population: Population, patch: "Patch", age:int):
-        # Initialise attributes
-        self._energy = int(population.max_energy * 0.25)
-        self._population =  population
-        self._patch = patch
-        self._age = age
+    def __init__(self, population: Population, patch: "Patch", age:int, energy: Optional[int] = None):
         self._was_killed = False
+        if energy is None:
+            energy = int(population.max_energy * 0.25)
         # Inherit from Superclass Animals
-        super().__init__(population = self._population,
-                         patch = self._patch,
-                         energy = self._energy,
-                         age = self._age)
+        super().__init__(population = population,
+                         patch = patch,
+                         energy = energy,
+                         age = age)
     def kill(self):
         """ Kill this rabbit and remove it from the current patch, if this rabbit is alive.
         """
         rabbit = self
         rabbit.patch().remove(rabbit)
+        rabbit._settle()
         rabbit._was_killed = True
+        if Animal.calendar is not None:
+            rabbit._death_step = rabbit._now() # Stops ageing. The booking in the calendar is ignored
         
     def was_killed(self)-> bool:
         """Check if this rabbit was killed.
@@ -288,6 +425,7 @@ class Rabbit(Animal):
         the amount of energy that can be added to its reserve, and the amount of grass available at its current patch 
         """
         if self.is_alive():
+            self._settle()
             # Determine how much grass the rabbit can eat
             grass_amount = self.patch().grass() 
             grass_eaten =  Rabbit.feeding_metabolism_rate * self._population.metabolism
@@ -299,6 +437,7 @@ class Rabbit(Animal):
             # Update values
             self._energy += grass_eaten
             self.patch()._patch_grass -= grass_eaten
+            self._book_death()
 
     def reproduce(self, newborn_patch: "Patch") -> Optional["Rabbit"]:
         """ Returns an instance of this class when successful and reduces the energy reserve of this animal 
@@ -316,10 +455,12 @@ class Rabbit(Animal):
             probability = self._population.reproduction_probability
             reproduction_res = random.random()
             if reproduction_res <= probability:
+                self._settle()
                 self._energy = self.energy() - self._population.reproduction_min_energy * Rabbit.reproduction_cost_rate
-                rabbit = Rabbit(population = self._population,
-                                patch = newborn_patch,
-                                age = 0)
+                self._book_death()
+                rabbit = Rabbit.spawn(population = self._population,
+                                      patch = newborn_patch,
+                                      age = 0)
                 # If animal dies after reproduction, remove it
                 if self.is_alive() == False:
                     animal = self #This is done to avoid confusion between self referring to the animal or the patch
@@ -347,15 +488,58 @@ class Patch:
 
     x: the west-east corrdinate for this patch.
     y: the north-south coordinate for this patch.
+    grass: the initial amount of grass (optional). Drawn at random if not given.
+    settled_step: the step at which the grass amount is valid (optional). Defaults to the current step.
+
+    Patches without animals share an empty tuple instead of each holding an empty list.
+
+    Class variables
+    ---------------
+    - current_step: The step the simulation is at. Advanced by the simulation once per step.
+    - lazy_grass: If True, patches are not ticked. Instead the grass that grew since the last read is
+      added the next time the grass is read (see grass), capped at max_grass_amount.
+    - grass_seed: With lazy grass, the seed the growth of every patch in every step is derived from, together with the
+      coordinates of the patch and the step. The grass therefore does not depend on when or how often it is read.
+      Set by the simulation at the start of a run.
+    - occupied: A set of the patches holding at least one animal, kept up to date by add and remove.
+      None (default) if the occupied patches are not tracked.
     """
+    __slots__ = [
+        "_x",
+        "_y",
+        "_animals",
+        "_patch_grass",
+        "_settled_step"
+    ]
     min_grass_growth = 1
     max_grass_growth = 4
     max_grass_amount = 30
-    def __init__(self, x: int, y = int):
+    current_step = 0
+    lazy_grass = False
+    grass_seed = 0
+    occupied = None
+    def __init__(self, x: int, y = int, grass: Optional[int] = None, settled_step: Optional[int] = None):
         self._x = x
         self._y= y
-        self._animals = []
-        self._patch_grass = random.randint(0, Patch.max_grass_amount)
+        self._animals = ()
+        if grass is None:
+            grass = random.randint(0, Patch.max_grass_amount)
+        self._patch_grass = grass
+        if settled_step is None:
+            settled_step = Patch.current_step
+        self._settled_step = settled_step
+
+    def reset(self, grass: int) -> None:
+        """Empties this patch and sets its grass, as if it had just been created, so a world can be reused for
+        another run (see simulation.refill_world).
+
+        Parameters
+        ----------
+        - grass: The initial amount of grass
+        """
+        self._animals = ()
+        self._patch_grass = grass
+        self._settled_step = Patch.current_step
 
     def coordinates(self) -> Tuple[int, int]:
         """Method for returning the coordinates of the patch.
@@ -369,14 +553,41 @@ class Patch:
         
     def grass(self) -> int:
         """Method for returning the amount of grass in a patch.
+        With lazy grass, the growth since the last read is added first (see _settle).
         Returns
         -------
         An integer of how much grass in the patch
         """
+        if Patch.lazy_grass:
+            self._settle()
         return self._patch_grass
 
+    def _settle(self) -> None:
+        """Adds the grass grown between the settled step and the current step, capped at max_grass_amount.
+        Each step adds between min_grass_growth and max_grass_growth, drawn from grass_seed, the coordinates and the
+        step. The growth is only drawn until the cap is reached.
+        """
+        elapsed = Patch.current_step - self._settled_step
+        if elapsed <= 0:
+            return
+        grass = self._patch_grass
+        if grass < Patch.max_grass_amount:
+            if grass + elapsed * Patch.min_grass_growth >= Patch.max_grass_amount:
+                grass = Patch.max_grass_amount
+            else:
+                key = _mix(Patch.grass_seed ^ _mix(self._x << 32 | self._y))
+                growth_range = Patch.max_grass_growth - Patch.min_grass_growth + 1
+                step = self._settled_step
+                while step < Patch.current_step and grass < Patch.max_grass_amount:
+                    step += 1
+                    grass += Patch.min_grass_growth + _mix(key + step) % growth_range
+                grass = min(grass, Patch.max_grass_amount)
+        self._patch_grass = grass
+        self._settled_step = Patch.current_step
+
     def tick(self) -> None:
         """Method for recording the passage of time (one step in the simulation) -> Grass grows.
+        Not used with lazy grass.
         Returns
         -------
         Nothing. 
@@ -400,7 +611,7 @@ class Patch:
         A bool indicating if there is an alive fox
         """
         for animal in self._animals:
-            if isinstance(animal, Fox) and animal.is_alive():
+            if animal.species_code == FOX and animal.is_alive():
                 return True
             else:
                 return False
@@ -413,7 +624,7 @@ class Patch:
         A bool indicating if there is an alive rabbit
         """
         for animal in self._animals:
-            if isinstance(animal, Rabbit) and animal.is_alive():
+            if animal.species_code == RABBIT and animal.is_alive():
                 return True
             else:
                 return False
@@ -424,7 +635,12 @@ class Patch:
         ----------
         - animal: An instance of the class Animal
         """
-        self._animals.append(animal)
+        if self._animals:
+            self._animals.append(animal)
+        else:
+            self._animals = [animal]
+            if Patch.occupied is not None:
+                Patch.occupied.add(self)
 
     def remove(self, animal) -> None:
         """ Remove a given animal from this patch.
@@ -433,6 +649,10 @@ class Patch:
         - animal: An instance of the class Animal
         """
         self._animals.remove(animal)
+        if not self._animals:
+            self._animals = ()
+            if Patch.occupied is not None:
+                Patch.occupied.discard(self)
 
     # __str__ is not used, since it defaults to __repr__ if not defined
     def __repr__(self) -> str:
@@ -1,2 +1,376 @@
-import base64
-eval(compile(base64.b64decode(b'Y2xhc3MgU2ltdWxhdGlvbjoKICAiIiIKICBEZXNjcmliZXMgdGhlIHNpbXVsYXRpb24gc2V0dXAgKHRoZSB3b3JsZCwgdGhlIHBvcHVsYXRpb25zIG9mIHJhYmJpdHMgYW5kCiAgZm94ZXMsIGFuZCBpdHMgZXhlY3V0aW9uKS4gSW5zdGFuY2UgdmFyaWFibGVzICh3b3JsZCwgcmFiYml0cywgZm94ZXMsIGFuZAogIGV4ZWN1dGlvbikgYXJlIGluaXRpYWxpc2VkIHdpdGggYW4gaW5zdGFuY2Ugb2YgdGhlIGFwcHJvcHJpYXRlIGNsYXNzIChXb3JsZCwKICBQb3B1bGF0aW9uLCBvciBFeGVjdXRpb24pIGNvbnRhaW5pbmcgZGVmYXVsdCB2YWx1ZXMgZm9yIGFsbCBwYXJhbWV0ZXJzLgogICIiIgoKICBfX3Nsb3RzX18gPSBbCiAgICAnX3dvcmxkJywKICAgICdfcmFiYml0cycsCiAgICAnX2ZveGVzJywKICAgICdfZXhlY3V0aW9uJwogICAgXQoKICBkZWYgX19pbml0X18oc2VsZik6CiAgICBzZWxmLl93b3JsZCA9IFdvcmxkKCkKICAgIHNlbGYuX3JhYmJpdHMgPSBQb3B1bGF0aW9uKAogICAgICAncmFiYml0cycsCiAgICAgIDEwMCwgIyBpbml0aWFsX3NpemUKICAgICAgMywgICAjIG1ldGFib2xpc20KICAgICAgMjUsICAjIG1heF9hZ2UKICAgICAgNDUsICAjIG1heF9lbmVyZ3kKICAgICAgLjUsICAjIHJlcHJvZHVjdGlvbl9yYXRlCiAgICAgIDQwLCAgIyByZXByb2R1Y3Rpb25fbWluX2VuZXJneQogICAgICAxMCwgICMgcmVwcm9kdWN0aW9uX21pbl9hZ2UKICAgICAgKQogICAgc2VsZi5fZm94ZXMgPSBQb3B1bGF0aW9uKAogICAgICAnZm94ZXMnLAogICAgICAyNSwgICMgaW5pdGlhbF9zaXplCiAgICAgIDIsICAgIyBtZXRhYm9saXNtCiAgICAgIDUwLCAgIyBtYXhfYWdlCiAgICAgIDIwMCwgIyBtYXhfZW5lcmd5CiAgICAgIC41LCAgIyByZXByb2R1Y3Rpb25fcmF0ZQogICAgICAxMjAsICMgcmVwcm9kdWN0aW9uX21pbl9lbmVyZ3kKICAgICAgMTAsICAjIHJlcHJvZHVjdGlvbl9taW5fYWdlCiAgICAgICkKICAgIHNlbGYuX2V4ZWN1dGlvbiA9IEV4ZWN1dGlvbigpCgogIEBwcm9wZXJ0eQogIGRlZiB3b3JsZChzZWxmKSAtPiAnV29ybGQnOgogICAgIiIiCiAgICBQYXJhbWV0ZXJzIGZvciB0aGUgc2ltdWxhdGVkIHdvcmxkLiBTZWUgY2xhc3MgV29ybGQuCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl93b3JsZAoKICBAcHJvcGVydHkKICBkZWYgcmFiYml0cyhzZWxmKSAtPiAnUG9wdWxhdGlvbic6CiAgICAiIiIKICAgIFBhcmFtZXRlcnMgZm9yIHRoZSByYWJiaXQgcG9wdWxhdGlvbi4gU2VlIGNsYXNzIFBvcHVsYXRpb24uCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9yYWJiaXRzCgogIEBwcm9wZXJ0eQogIGRlZiBmb3hlcyhzZWxmKSAtPiAnUG9wdWxhdGlvbic6CiAgICAiIiIKICAgIFBhcmFtZXRlcnMgZm9yIHRoZSBmb3ggcG9wdWxhdGlvbi4gU2VlIGNsYXNzIFBvcHVsYXRpb24uCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9mb3hlcwoKICBAcHJvcGVydHkKICBkZWYgZXhlY3V0aW9uKHNlbGYpIC0+ICdFeGVjdXRpb24nOgogICAgIiIiCiAgICBQYXJhbWV0ZXJzIGZvciB0aGUgc2ltdWxhdGlvbiBleGVjdXRpb24uIFNlZSBjbGFzcyBFeGVjdXRpb24uCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9leGVjdXRpb24KCiAgZGVmIF9fc3RyX18oc2VsZikgLT4gc3RyOgogICAgcmV0dXJuIGYid29ybGQ6IHtzZWxmLndvcmxkfVxue3NlbGYucmFiYml0c31cbntzZWxmLmZveGVzfVxuZXhlY3V0aW9uOiB7c2VsZi5leGVjdXRpb259IgoKICAgIApjbGFzcyBXb3JsZDoKICAiIiIKICBEZXNjcmliZXMgdGhlIHNpbXVsYXRlZCAyRCB3b3JsZCBpbiBpdHMgc2hhcGUgKHRvcm9pZCBvciBpc2xhbmQpIGFuZCBzaXplLgoKICBTZWUgX19pbml0X18gZm9yIGRlZmF1bHRzLgogICIiIgogIAogIF9fc2xvdHNfXyA9IFsKICAgICAgJ2lzX3Rvcm9pZCcsCiAgICAgICdfbm9ydGhfc291dGhfbGVuZ3RoJywKICAgICAgJ193ZXN0X2Vhc3RfbGVuZ3RoJwogICAgICBdCgogIGRlZiBfX2luaXRfXyhzZWxmLAogICAgICAgICAgICAgICBub3J0aF9zb3V0aF9sZW5ndGggPSAyMCwKICAgICAgICAgICAgICAgd2VzdF9lYXN0X2xlbmd0aCA9IDIwLAogICAgICAgICAgICAgICBpc190b3JvaWQgPSBUcnVlKToKICAgIHNlbGYuaXNfdG9yb2lkID0gaXNfdG9yb2lkCiAgICBzZWxmLm5vcnRoX3NvdXRoX2xlbmd0aCA9IG5vcnRoX3NvdXRoX2xlbmd0aAogICAgc2VsZi53ZXN0X2Vhc3RfbGVuZ3RoID0gd2VzdF9lYXN0X2xlbmd0aAoKICBkZWYgc2hhcGUoc2VsZikgLT4gc3RyOgogICAgIiIiCiAgICBSZXR1cm5zIHRoZSBuYW1lIG9mIHRoZSBzaGFwZSBvZiB0aGUgd29ybGQgKCd0b3JvaWQnIG9yICdpc2xhbmQnKS4KICAgICIiIgogICAgcmV0dXJuICd0b3JvaWQnIGlmIHNlbGYuaXNfdG9yb2lkIGVsc2UgJ2lzbGFuZCcKICAgIAogIEBwcm9wZXJ0eQogIGRlZiBub3J0aF9zb3V0aF9sZW5ndGgoc2VsZikgLT4gaW50OgogICAgIiIiCiAgICBUaGUgbm9ydGgtc291dGggbGVuZ3RoIG9mIHRoZSBzaW11bGF0ZWQgd29ybGQuCiAgICAKICAgIFByZWNvbmRpdGlvbjogaW50ZWdlciBhbmQgbm9uLW5lZ2F0aXZlLgogICAgIiIiCiAgICByZXR1cm4gc2VsZi5fbm9ydGhfc291dGhfbGVuZ3RoCgogIEBub3J0aF9zb3V0aF9sZW5ndGguc2V0dGVyCiAgZGVmIG5vcnRoX3NvdXRoX2xlbmd0aChzZWxmLGxlbmd0aCA6IGludCk6CiAgICBzZWxmLl9ub3J0aF9zb3V0aF9sZW5ndGggPSBsZW5ndGgKCiAgQHByb3BlcnR5CiAgZGVmIHdlc3RfZWFzdF9sZW5ndGgoc2VsZikgLT4gaW50OgogICAgIiIiCiAgICBUaGUgd2VzdC1lYXN0IGxlbmd0aCBvZiB0aGUgc2ltdWxhdGVkIHdvcmxkLgogICAgCiAgICBQcmVjb25kaXRpb246IGludGVnZXIgYW5kIG5vbi1uZWdhdGl2ZS4KICAgICIiIgogICAgcmV0dXJuIHNlbGYuX3dlc3RfZWFzdF9sZW5ndGgKCiAgQHdlc3RfZWFzdF9sZW5ndGguc2V0dGVyCiAgZGVmIHdlc3RfZWFzdF9sZW5ndGgoc2VsZixsZW5ndGggOiBpbnQpOgogICAgc2VsZi5fd2VzdF9lYXN0X2xlbmd0aCA9IGxlbmd0aAoKICBkZWYgYXJlYShzZWxmKSAtPiBpbnQ6CiAgICAiIiIKICAgIFJldHVybnMgdGhlIHRvdGFsIGFyZWEgb2YgdGhlIHdvcmxkLgogICAgIiIiCiAgICByZXR1cm4gc2VsZi5ub3J0aF9zb3V0aF9sZW5ndGggKiBzZWxmLndlc3RfZWFzdF9sZW5ndGgKCiAgZGVmIF9fcmVwcl9fKHNlbGYpOgogICAgcmV0dXJuIGYiV29ybGQoe3NlbGYubm9ydGhfc291dGhfbGVuZ3RofSx7c2VsZi53ZXN0X2Vhc3RfbGVuZ3RofSx7c2VsZi5pc190b3JvaWR9KSIKCiAgZGVmIF9fc3RyX18oc2VsZik6CiAgICByZXR1cm4gZiJ7c2VsZi5zaGFwZSgpfSB7c2VsZi5ub3J0aF9zb3V0aF9sZW5ndGh9IGJ5IHtzZWxmLndlc3RfZWFzdF9sZW5ndGh9IgogICAgCmNsYXNzIFBvcHVsYXRpb246CiAgIiIiCiAgRGVzY3JpYmVzIGEgcG9wdWxhdGlvbiBpbiB0aGUgc2ltdWxhdGlvbiAoZS5nLiwgcmFiYml0cykuCiAgIiIiCiAKICBfX3Nsb3RzX18gPSBbCiAgICAnX3NwZWNpZXMnLAogICAgJ19tYXhfYWdlJywKICAgICdfbWV0YWJvbGlzbScsCiAgICAnX21heF9lbmVyZ3knLAogICAgJ19pbml0aWFsX3NpemUnLAogICAgJ19yZXByb2R1Y3Rpb25fcHJvYmFiaWxpdHknLAogICAgJ19yZXByb2R1Y3Rpb25fbWluX2VuZXJneScsCiAgICAnX3JlcHJvZHVjdGlvbl9taW5fYWdlJwogICAgXQoKICBkZWYgX19pbml0X18oc2VsZiwKICAgICAgICAgICAgICAgc3BlY2llcywKICAgICAgICAgICAgICAgaW5pdGlhbF9zaXplLAogICAgICAgICAgICAgICBtZXRhYm9saXNtLAogICAgICAgICAgICAgICBtYXhfYWdlLAogICAgICAgICAgICAgICBtYXhfZW5lcmd5LAogICAgICAgICAgICAgICByZXByb2R1Y3Rpb25fcHJvYmFiaWxpdHksCiAgICAgICAgICAgICAgIHJlcHJvZHVjdGlvbl9taW5fZW5lcmd5LAogICAgICAgICAgICAgICByZXByb2R1Y3Rpb25fbWluX2FnZSk6CiAgICAiIiIKICAgIEFyZ3VtZW50czogc2VlIHRoZSBjb3JyZXNwb25kaW5nIHByb3BlcnRpZXMgYW5kIGRhdGEgZGVzY3JpcHRvcnMuCiAgICAiIiIKICAgIHNlbGYuX3NwZWNpZXMgPSBzcGVjaWVzCiAgICBzZWxmLmluaXRpYWxfc2l6ZSA9IGluaXRpYWxfc2l6ZQogICAgc2VsZi5tZXRhYm9saXNtID0gbWV0YWJvbGlzbQogICAgc2VsZi5tYXhfYWdlID0gbWF4X2FnZQogICAgc2VsZi5tYXhfZW5lcmd5ID0gbWF4X2VuZXJneQogICAgc2VsZi5yZXByb2R1Y3Rpb25fcHJvYmFiaWxpdHkgPSByZXByb2R1Y3Rpb25fcHJvYmFiaWxpdHkKICAgIHNlbGYucmVwcm9kdWN0aW9uX21pbl9lbmVyZ3kgPSByZXByb2R1Y3Rpb25fbWluX2VuZXJneQogICAgc2VsZi5yZXByb2R1Y3Rpb25fbWluX2FnZSA9IHJlcHJvZHVjdGlvbl9taW5fYWdlCgogIEBwcm9wZXJ0eQogIGRlZiBzcGVjaWVzKHNlbGYpIC0+IHN0cjoKICAgICIiIgogICAgVGhlIHBvcHVsYXRpb24gc3BlY2llcyAoZS5nLiwncmFiYml0cycpLgogICAgIiIiCiAgICByZXR1cm4gc2VsZi5fc3BlY2llcwoKICBAcHJvcGVydHkKICBkZWYgaW5pdGlhbF9zaXplKHNlbGYpIC0+IGludDoKICAgICIiIgogICAgVGhlIGluaXRpYWwgc2l6ZSBvZiB0aGUgcG9wdWxhdGlvLgogICAgCiAgICBQcmVjb25kaXRpb246IGludGVnZXIgYmV0d2VlbiAwIGFuZCB0aGUgYXZhbHVhYmxlIHN1cmZhY2UgYXJlYS4KICAgICIiIgogICAgcmV0dXJuIHNlbGYuX2luaXRpYWxfc2l6ZQoKICBAaW5pdGlhbF9zaXplLnNldHRlcgogIGRlZiBpbml0aWFsX3NpemUoc2VsZix2YWx1ZSk6CiAgICBzZWxmLl9pbml0aWFsX3NpemUgPSB2YWx1ZQoKICBAcHJvcGVydHkKICBkZWYgbWV0YWJvbGlzbShzZWxmKSAtPiBpbnQ6CiAgICAiIiIKICAgIFRoZSBhbW91bnQgb2YgZW5lcmd5IGNvbnN1bWVkIGR1cmluZyBlYWNoIHN0ZXAgb2YgdGhlIHNpbXVsYXRpb24uCgogICAgUHJlY29uZGl0aW9uOiBub24tbmVnYXRpdmUuCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9tZXRhYm9saXNtCgogIEBtZXRhYm9saXNtLnNldHRlcgogIGRlZiBtZXRhYm9saXNtKHNlbGYsdmFsdWUpOgogICAgc2VsZi5fbWV0YWJvbGlzbSA9IHZhbHVlCgogIEBwcm9wZXJ0eQogIGRlZiBtYXhfYWdlKHNlbGYpIC0+IGludDoKICAgICIiIgogICAgVGhlIG1heGltdW0gYWdlIChpbiBzaW11bGF0aW9uIHN0ZXBzKSBhIG1lbWJlciBvZiB0aGlzIHNwZWNpZXMgY2FuIGhhdmUuCiAgICAKICAgIFByZWNvbmRpdGlvbjogaW50ZWdlciBhbmQgcG9zaXRpdmUuCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9tYXhfYWdlCgogIEBtYXhfYWdlLnNldHRlcgogIGRlZiBtYXhfYWdlKHNlbGYsdmFsdWUpOgogICAgc2VsZi5fbWF4X2FnZSA9IHZhbHVlCgogIEBwcm9wZXJ0eQogIGRlZiBtYXhfZW5lcmd5KHNlbGYpIC0+IGludDoKICAgICIiIgogICAgVGhlIG1heGltdW0gZW5lcmd5IGxldmVsIGEgbWVtYmVyIG9mIHRoaXMgc3BlY2llcyBjYW4gaGF2ZS4KCiAgICBQcmVjb25kaXRpb246IHBvc2l0aXZlLgogICAgIiIiCiAgICByZXR1cm4gc2VsZi5fbWF4X2VuZXJneQoKICBAbWF4X2VuZXJneS5zZXR0ZXIKICBkZWYgbWF4X2VuZXJneShzZWxmLHZhbHVlIDogaW50KToKICAgIHNlbGYuX21heF9lbmVyZ3kgPSB2YWx1ZQoKICBAcHJvcGVydHkKICBkZWYgcmVwcm9kdWN0aW9uX3Byb2JhYmlsaXR5KHNlbGYpIC0+IGZsb2F0OgogICAgIiIiCiAgICBUaGUgcHJvYmFiaWxpdHkgb2YgcmVwcm9kdWN0aW9uIHdoZW4gYWxsIGNvbmRpdGlvbnMgb24gYWdlLCBlbmVyZ3ksIGFuZCBlbnZpcm9ubWVudCBhcmUgbWV0LgogICAgCiAgICBQcmVjb25kaXRpb246IGEgZmxvYXRpbmcgcG9pbnQgdmFsdWUgcmVwcmVzZW50aW5nIGEgcHJvYmFiaWxpdHkuCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9yZXByb2R1Y3Rpb25fcHJvYmFiaWxpdHkKCiAgQHJlcHJvZHVjdGlvbl9wcm9iYWJpbGl0eS5zZXR0ZXIKICBkZWYgcmVwcm9kdWN0aW9uX3Byb2JhYmlsaXR5KHNlbGYsdmFsdWUpOgogICAgc2VsZi5fcmVwcm9kdWN0aW9uX3Byb2JhYmlsaXR5ID0gdmFsdWUKCiAgCiAgQHByb3BlcnR5CiAgZGVmIHJlcHJvZHVjdGlvbl9taW5fYWdlKHNlbGYpIC0+IGludDoKICAgICIiIgogICAgVGhlIG1pbmltdW0gYWdlIGFuIGluZGl2aWR1YWwgbXVzdCBoYXZlIGluIG9yZGVyIHRvIHJlcHJvZHVjZS4KICAgICIiIgogICAgcmV0dXJuIHNlbGYuX3JlcHJvZHVjdGlvbl9taW5fYWdlCgogIEByZXByb2R1Y3Rpb25fbWluX2FnZS5zZXR0ZXIKICBkZWYgcmVwcm9kdWN0aW9uX21pbl9hZ2Uoc2VsZix2YWx1ZSk6CiAgICBzZWxmLl9yZXByb2R1Y3Rpb25fbWluX2FnZSA9IHZhbHVlCgogIAogIEBwcm9wZXJ0eQogIGRlZiByZXByb2R1Y3Rpb25fbWluX2VuZXJneShzZWxmKSAtPiBpbnQ6CiAgICAiIiIKICAgIFRoZSBtaW5pbXVtIGVuZXJneSBsZXZlbCBhbiBpbmRpdmlkdWFsIG11c3QgaGF2ZSBpbiBvcmRlciB0byByZXByb2R1Y2UuCiAgICAiIiIKICAgIHJldHVybiBzZWxmLl9yZXByb2R1Y3Rpb25fbWluX2VuZXJneQoKICBAcmVwcm9kdWN0aW9uX21pbl9lbmVyZ3kuc2V0dGVyCiAgZGVmIHJlcHJvZHVjdGlvbl9taW5fZW5lcmd5KHNlbGYsdmFsdWUpOgogICAgc2VsZi5fcmVwcm9kdWN0aW9uX21pbl9lbmVyZ3kgPSB2YWx1ZQoKICBkZWYgX19yZXByX18oc2VsZikgLT4gc3RyOgogICAgcmV0dXJuICJQb3B1bGF0aW9uKCd7fScsIHt9LCB7fSwge30sIHt9LCB7fSwge30sIHt9KSIuZm9ybWF0KAogICAgICBzZWxmLnNwZWNpZXMsCiAgICAgIHNlbGYuaW5pdGlhbF9zaXplLAogICAgICBzZWxmLm1ldGFib2xpc20sCiAgICAgIHNlbGYubWF4X2FnZSwKICAgICAgc2VsZi5tYXhfZW5lcmd5LAogICAgICBzZWxmLnJlcHJvZHVjdGlvbl9wcm9iYWJpbGl0eSwKICAgICAgc2VsZi5yZXByb2R1Y3Rpb25fbWluX2VuZXJneSwKICAgICAgc2VsZi5yZXByb2R1Y3Rpb25fbWluX2FnZSkKCiAgZGVmIF9fc3RyX18oc2VsZikgLT4gc3RyOgogICAgcmV0dXJuIGYiIiJ7c2VsZi5zcGVjaWVzfToge3NlbGYuaW5pdGlhbF9zaXplfQogIG1ldGFib2xpc206ICAgIHtzZWxmLm1ldGFib2xpc219CiAgbWF4X2FnZTogICAgICAge3NlbGYubWF4X2FnZX0KICBtYXhfZW5lcmd5OiAgICB7c2VsZi5tYXhfZW5lcmd5fQogIHJlcHJvZHVjdGlvbjoKICAgIHByb2JhYmlsaXR5OiB7c2VsZi5yZXByb2R1Y3Rpb25fcHJvYmFiaWxpdHl9CiAgICBjb3N0OiAgICAgICAge3NlbGYucmVwcm9kdWN0aW9uX21pbl9lbmVyZ3l9CiAgICBhZ2U6ICAgICAgICAge3NlbGYucmVwcm9kdWN0aW9uX21pbl9hZ2V9IiIiCgpjbGFzcyBFeGVjdXRpb246CiAgIiIiCiAgQ29udGFpbnMgcGFyYW1ldGVycyBmb3IgdGhlIHNpbXVsYXRpb24gZXhlY3V0aW9uLgoKICBTZWUgX19pbml0X18gZm9yIGRlZmF1bHRzLgogICIiIgogIAogIF9fc2xvdHNfXyA9IFsKICAgICAgJ19tYXhfc3RlcHMnLAogICAgICAnX3N0ZXBfZGVsYXknLAogICAgICAnX2JhdGNoJwogICAgICBdCgogIGRlZiBfX2luaXRfXyhzZWxmLAogICAgICAgICAgICAgICBtYXhfc3RlcHMgPSAxMDAwLAogICAgICAgICAgICAgICBzdGVwX2RlbGF5ID0gMC4xLAogICAgICAgICAgICAgICBiYXRjaCA9IFRydWUpOgogICAgc2VsZi5tYXhfc3RlcHMgPSBtYXhfc3RlcHMKICAgIHNlbGYuc3RlcF9kZWxheSA9IHN0ZXBfZGVsYXkKICAgIHNlbGYuYmF0Y2ggPSBiYXRjaAoKICBAcHJvcGVydHkKICBkZWYgbWF4X3N0ZXBzKHNlbGYpIC0+IGludDoKICAgICIiIgogICAgVGhlIG1heGltdW0gbnVtYmVyIG9mIHN0ZXBzIHRoZSBzaW11bGF0aW9uIGNhbiBydW4gZm9yLgogICAgIiIiCiAgICByZXR1cm4gc2VsZi5fbWF4X3N0ZXBzCgogIEBtYXhfc3RlcHMuc2V0dGVyCiAgZGVmIG1heF9zdGVwcyhzZWxmLHZhbHVlKToKICAgIHNlbGYuX21heF9zdGVwcyA9IHZhbHVlCgoKICBAcHJvcGVydHkKICBkZWYgc3RlcF9kZWxheShzZWxmKSAtPiBmbG9hdDoKICAgICIiIgogICAgQSBkZWxheSAoaW4gc2Vjb25kcykgYWRkZWQgdG8gZWFjaCBzdGVwIG9mIHRoZSBzaW11bGF0aW9uLgogICAgIiIiCiAgICByZXR1cm4gc2VsZi5fc3RlcF9kZWxheQoKICBAc3RlcF9kZWxheS5zZXR0ZXIKICBkZWYgc3RlcF9kZWxheShzZWxmLHZhbHVlKToKICAgIHNlbGYuX3N0ZXBfZGVsYXkgPSB2YWx1ZQoKCiAgQHByb3BlcnR5CiAgZGVmIGJhdGNoKHNlbGYpIC0+IGJvb2w6CiAgICAiIiIKICAgIFdoZXRoZXIgdGhlIHNpbXVsYXRpb24gZXhlY3V0ZWQgaW4gYmF0Y2ggbW9kZSAobm8gdmlzdWFsaXphdGlvbikgb3IgdmlzdWFsaXNpbmcgaXRzIHN0YXR1cy4KICAgICIiIgogICAgcmV0dXJuIHNlbGYuX2JhdGNoCgogIEBiYXRjaC5zZXR0ZXIKICBkZWYgYmF0Y2goc2VsZix2YWx1ZSk6CiAgICBzZWxmLl9iYXRjaCA9IHZhbHVlCgogIGRlZiBtb2RlKHNlbGYpIC0+IHN0cjoKICAgICIiIgogICAgUmV0dXJucyB0aGUgbW9kZSBvZiBleGVjdXRpb24gKGJhdGNoIG9yIHZpc3VhbCkgYXMgYSBzdHJpbmcuCiAgICAiIiIKICAgIHJldHVybiAnYmF0Y2gnIGlmIHNlbGYuYmF0Y2ggZWxzZSAndmlzdWFsJwoKICBkZWYgX19yZXByX18oc2VsZikgLT4gc3RyOgogICAgcmV0dXJuIGYiRXhlY3V0aW9uKHtzZWxmLm1heF9zdGVwc30se3NlbGYuc3RlcF9kZWxheX0se3NlbGYuYmF0Y2h9KSIKCiAgZGVmIF9fc3RyX18oc2VsZikgLT4gc3RyOgogICAgcmV0dXJuIGYie3NlbGYubW9kZSgpfSBtb2RlLCB7c2VsZi5tYXhfc3RlcHN9IHN0ZXBzIHdpdGggYSBkZWxheSB7c2VsZi5zdGVwX2RlbGF5fXMiCg=='),'<string>','exec'))
\ No newline at end of file
+class Simulation:
+  """
+  Describes the simulation setup (the world, the populations of rabbits and
+  foxes, and its execution). Instance variables (world, rabbits, foxes, and
+  execution) are initialised with an instance of the appropriate class (World,
+  Population, or Execution) containing default values for all parameters.
+  """
+
+  __slots__ = [
+    '_world',
+    '_rabbits',
+    '_foxes',
+    '_execution'
+    ]
+
+  def __init__(self):
+    self._world = World()
+    self._rabbits = Population(
+      'rabbits',
+      100, # initial_size
+      3,   # metabolism
+      25,  # max_age
+      45,  # max_energy
+      .5,  # reproduction_rate
+      40,  # reproduction_min_energy
+      10,  # reproduction_min_age
+      )
+    self._foxes = Population(
+      'foxes',
+      25,  # initial_size
+      2,   # metabolism
+      50,  # max_age
+      200, # max_energy
+      .5,  # reproduction_rate
+      120, # reproduction_min_energy
+      10,  # reproduction_min_age
+      )
+    self._execution = Execution()
+
+  @property
+  def world(self) -> 'World':
+    """
+    Parameters for the simulated world. See class World.
+    """
+    return self._world
+
+  @property
+  def rabbits(self) -> 'Population':
+    """
+    Parameters for the rabbit population. See class Population.
+    """
+    return self._rabbits
+
+  @property
+  def foxes(self) -> 'Population':
+    """
+    Parameters for the fox population. See class Population.
+    """
+    return self._foxes
+
+  @property
+  def execution(self) -> 'Execution':
+    """
+    Parameters for the simulation execution. See class Execution.
+    """
+    return self._execution
+
+  def __str__(self) -> str:
+    return f"world: {self.world}\n{self.rabbits}\n{self.foxes}\nexecution: {self.execution}"
+
+    
+class World:
+  """
+  Describes the simulated 2D world in its shape (toroid or island) and size.
+
+  See __init__ for defaults.
+  """
+  
+  __slots__ = [
+      'is_toroid',
+      '_north_south_length',
+      '_west_east_length'
+      ]
+
+  def __init__(self,
+               north_south_length = 20,
+               west_east_length = 20,
+               is_toroid = True):
+    self.is_toroid = is_toroid
+    self.north_south_length = north_south_length
+    self.west_east_length = west_east_length
+
+  def shape(self) -> str:
+    """
+    Returns the name of the shape of the world ('toroid' or 'island').
+    """
+    return 'toroid' if self.is_toroid else 'island'
+    
+  @property
+  def north_south_length(self) -> int:
+    """
+    The north-south length of the simulated world.
+    
+    Precondition: integer and non-negative.
+    """
+    return self._north_south_length
+
+  @north_south_length.setter
+  def north_south_length(self,length : int):
+    self._north_south_length = length
+
+  @property
+  def west_east_length(self) -> int:
+    """
+    The west-east length of the simulated world.
+    
+    Precondition: integer and non-negative.
+    """
+    return self._west_east_length
+
+  @west_east_length.setter
+  def west_east_length(self,length : int):
+    self._west_east_length = length
+
+  def area(self) -> int:
+    """
+    Returns the total area of the world.
+    """
+    return self.north_south_length * self.west_east_length
+
+  def __repr__(self):
+    return f"World({self.north_south_length},{self.west_east_length},{self.is_toroid})"
+
+  def __str__(self):
+    return f"{self.shape()} {self.north_south_length} by {self.west_east_length}"
+    
+class Population:
+  """
+  Describes a population in the simulation (e.g., rabbits).
+  """
+ 
+  __slots__ = [
+    '_species',
+    '_max_age',
+    '_metabolism',
+    '_max_energy',
+    '_initial_size',
+    '_reproduction_probability',
+    '_reproduction_min_energy',
+    '_reproduction_min_age',
+    '_sensing_radius'
+    ]
+
+  def __init__(self,
+               species,
+               initial_size,
+               metabolism,
+               max_age,
+               max_energy,
+               reproduction_probability,
+               reproduction_min_energy,
+               reproduction_min_age,
+               sensing_radius = 0):
+    """
+    Arguments: see the corresponding properties and data descriptors.
+    """
+    self._species = species
+    self.initial_size = initial_size
+    self.metabolism = metabolism
+    self.max_age = max_age
+    self.max_energy = max_energy
+    self.reproduction_probability = reproduction_probability
+    self.reproduction_min_energy = reproduction_min_energy
+    self.reproduction_min_age = reproduction_min_age
+    self.sensing_radius = sensing_radius
+
+  @property
+  def species(self) -> str:
+    """
+    The population species (e.g.,'rabbits').
+    """
+    return self._species
+
+  @property
+  def initial_size(self) -> int:
+    """
+    The initial size of the populatio.
+    
+    Precondition: integer between 0 and the avaluable surface area.
+    """
+    return self._initial_size
+
+  @initial_size.setter
+  def initial_size(self,value):
+    self._initial_size = value
+
+  @property
+  def metabolism(self) -> int:
+    """
+    The amount of energy consumed during each step of the simulation.
+
+    Precondition: non-negative.
+    """
+    return self._metabolism
+
+  @metabolism.setter
+  def metabolism(self,value):
+    self._metabolism = value
+
+  @property
+  def max_age(self) -> int:
+    """
+    The maximum age (in simulation steps) a member of this species can have.
+    
+    Precondition: integer and positive.
+    """
+    return self._max_age
+
+  @max_age.setter
+  def max_age(self,value):
+    self._max_age = value
+
+  @property
+  def max_energy(self) -> int:
+    """
+    The maximum energy level a member of this species can have.
+
+    Precondition: positive.
+    """
+    return self._max_energy
+
+  @max_energy.setter
+  def max_energy(self,value : int):
+    self._max_energy = value
+
+  @property
+  def reproduction_probability(self) -> float:
+    """
+    The probability of reproduction when all conditions on age, energy, and environment are met.
+    
+    Precondition: a floating point value representing a probability.
+    """
+    return self._reproduction_probability
+
+  @reproduction_probability.setter
+  def reproduction_probability(self,value):
+    self._reproduction_probability = value
+
+  
+  @property
+  def reproduction_min_age(self) -> int:
+    """
+    The minimum age an individual must have in order to reproduce.
+    """
+    return self._reproduction_min_age
+
+  @reproduction_min_age.setter
+  def reproduction_min_age(self,value):
+    self._reproduction_min_age = value
+
+  
+  @property
+  def reproduction_min_energy(self) -> int:
+    """
+    The minimum energy level an individual must have in order to reproduce.
+    """
+    return self._reproduction_min_energy
+
+  @reproduction_min_energy.setter
+  def reproduction_min_energy(self,value):
+    self._reproduction_min_energy = value
+
+  @property
+  def sensing_radius(self) -> int:
+    """
+    How far a member of this species senses the other species. Foxes move towards the most rabbits within this
+    radius, rabbits away from the most foxes (0 for moving at random).
+
+    Precondition: integer and non-negative.
+    """
+    return self._sensing_radius
+
+  @sensing_radius.setter
+  def sensing_radius(self,value):
+    self._sensing_radius = value
+
+  def __repr__(self) -> str:
+    return "Population('{}', {}, {}, {}, {}, {}, {}, {}, {})".format(
+      self.species,
+      self.initial_size,
+      self.metabolism,
+      self.max_age,
+      self.max_energy,
+      self.reproduction_probability,
+      self.reproduction_min_energy,
+      self.reproduction_min_age,
+      self.sensing_radius)
+
+  def __str__(self) -> str:
+    return f"""{self.species}: {self.initial_size}
+  metabolism:    {self.metabolism}
+  max_age:       {self.max_age}
+  max_energy:    {self.max_energy}
+  reproduction:
+    probability: {self.reproduction_probability}
+    cost:        {self.reproduction_min_energy}
+    age:         {self.reproduction_min_age}
+  sensing:       {self.sensing_radius}"""
+
+class Execution:
+  """
+  Contains parameters for the simulation execution.
+
+  See __init__ for defaults.
+  """
+  
+  __slots__ = [
+      '_max_steps',
+      '_step_delay',
+      '_batch'
+      ]
+
+  def __init__(self,
+               max_steps = 1000,
+               step_delay = 0.1,
+               batch = True):
+    self.max_steps = max_steps
+    self.step_delay = step_delay
+    self.batch = batch
+
+  @property
+  def max_steps(self) -> int:
+    """
+    The maximum number of steps the simulation can run for.
+    """
+    return self._max_steps
+
+  @max_steps.setter
+  def max_steps(self,value):
+    self._max_steps = value
+
+
+  @property
+  def step_delay(self) -> float:
+    """
+    A delay (in seconds) added to each step of the simulation.
+    """
+    return self._step_delay
+
+  @step_delay.setter
+  def step_delay(self,value):
+    self._step_delay = value
+
+
+  @property
+  def batch(self) -> bool:
+    """
+    Whether the simulation executed in batch mode (no visualization) or visualising its status.
+    """
+    return self._batch
+
+  @batch.setter
+  def batch(self,value):
+    self._batch = value
+
+  def mode(self) -> str:
+    """
+    Returns the mode of execution (batch or visual) as a string.
+    """
+    return 'batch' if self.batch else 'visual'
+
+  def __repr__(self) -> str:
+    return f"Execution({self.max_steps},{self.step_delay},{self.batch})"
+
+  def __str__(self) -> str:
+    return f"{self.mode()} mode, {self.max_steps} steps with a delay {self.step_delay}s"
@@ -1,2 +1,463 @@
-import base64
-eval(compile(base64.b64decode(b'IiIiClRoaXMgbW9kdWxlIGltcGxlbWVudHMgYmF0Y2ggYW5kIGdyYXBoaWNhbCB2aXN1YWxpc2VycyBmb3IgdGhlIHNpbXVsYXRpb24uCiIiIgoKaW1wb3J0IGVudGl0aWVzCmltcG9ydCB0eXBpbmcKaW1wb3J0IHRpbWUKCmNsYXNzIEJhdGNoOgogICIiIgogIFRoaXMgY2xhc3MgaW5jcmVtZW50YWxseSBwcmludHMgYSBwcm9ncmVzcyBiYXIgdG8gc2hvdyB0aGUgcHJvcG9ydGlvbiBvZiAKICBzaW11bGF0aW9uIHN0ZXBzIGNvbXBsZXRlZCAoYnV0IG5vdGhpbmcgbW9yZSkuIAoKICBUaGUgY29uc3RydWN0b3IgdGFrZXMgdGhlIHRvdGFsIG51bWJlciBvZiBzdGVwcyBhbmQsIG9wdGlvbmFsbHksIHRoZSB3aWR0aCBvZgogIHRoZSBwcm9ncmVzcyBiYXIgaW4gY2hhcmFjdGVycyAobWluaW11bSBpcyAzMCwgZGVmYXVsdCBpcyA2MCkuCgogIHZpcyA9IEJhdGNoUHJvZ3Jlc3MoIHRvdGFsX3N0ZXBzLCB0ZXh0X3dpZHRoID0gODApCiAgdmlzLnN0YXJ0KCkKICBmb3Igc3RlcCBpbiByYW5nZSggdG90YWxfc3RlcHMgKToKICAgIHZpcy51cGRhdGUoIHN0ZXAsIDEgKQogIHZpcy5zdG9wKCkKICAiIiIKCiAgX19zbG90c19fID0gWwogICAgIl90b3RhbF9zdGVwcyIsCiAgICAiX3RleHRfd2lkdGgiLAogICAgIl9maWxsZWQiCiAgXQoKICBkZWYgX19pbml0X18oc2VsZiwgdG90YWxfc3RlcHMgOiBpbnQsIHRleHRfd2lkdGggOiBpbnQgPSA2MCk6CiAgICBzZWxmLl90b3RhbF9zdGVwcyA9IHRvdGFsX3N0ZXBzCiAgICBzZWxmLl90ZXh0X3dpZHRoID0gbWF4KDMwLCB0ZXh0X3dpZHRoKQogICAgc2VsZi5fZmlsbGVkID0gMAogIAogIGRlZiBzdGFydChzZWxmKToKICAgICIiIgogICAgQmVnaW5zIGRpc3BsYXlpbmcgdGhlIHByb2dyZXNzIGluZGljYXRvci4KICAgICIiIgogICAgc2VsZi5fZmlsbGVkID0gMAogICAgcHJpbnQoJyBbJyArICdzaW11bGF0aW9uIHByb2dyZXNzJy5jZW50ZXIoc2VsZi5fdGV4dF93aWR0aCAtIDgpICsgJ10gICAgICcpCiAgICBwcmludCgnIFsnLCBlbmQ9JycsIGZsdXNoPVRydWUpCiAgICAKICBkZWYgdXBkYXRlKHNlbGYsIHN0ZXAgOiBpbnQpOgogICAgIiIiCiAgICBVcGRhdGVzIHRoZSBwcm9ncmVzcyBpbmRpY2F0b3IgdG8gcmVmbGVjdCB0aGUgYW1vdW50IG9mIGNvbXBsZXRlZCBzdGVwcwogICAgKGV4cGVjdGVkIHRvIGdyb3cgbW9ub3RvbmljYWxseSkuCiAgICAiIiIKICAgIHggPSBpbnQocm91bmQoKHNlbGYuX3RleHRfd2lkdGggLSA4KSAqIHN0ZXAgLyBzZWxmLl90b3RhbF9zdGVwcykpCiAgICBpZiB4IC0gc2VsZi5fZmlsbGVkID4gMDoKICAgICAgcHJpbnQoJy0nICogKHggLSBzZWxmLl9maWxsZWQpLCBlbmQ9JycsIGZsdXNoPVRydWUpCiAgICAgIHNlbGYuX2ZpbGxlZCA9IHgKCiAgZGVmIHN0b3Aoc2VsZik6CiAgICAiIiIKICAgIENvbXBsZXRlcyB0aGUgcHJvZ3Jlc3MgaW5kaWNhdG9yLgogICAgIiIiCiAgICBzZWxmLnVwZGF0ZShzZWxmLl90b3RhbF9zdGVwcykKICAgIHByaW50KCddIGRvbmUnLGZsdXNoPVRydWUpCgoKaW1wb3J0IG51bXB5IGFzIG5wCmltcG9ydCBtYXRwbG90bGliIGFzIG1wbAppbXBvcnQgbWF0cGxvdGxpYi5weXBsb3QgYXMgcGx0CgpjbGFzcyBHcmF5c2NhbGVHcmFwaGljcyhCYXRjaCk6CiAgIiIiCiAgQmVzaWRlcyBvZmZlcmluZyB0aGUgc2FtZSBmdW5jdGlvbmFsaXR5IG9mIEJhdGNoLCB0aGlzIGNsYXNzIHZpc3VhbGlzZXMKICB0aGUgc2ltdWxhdGVkIHdvcmxkIHVzaW5nIGNvbG91cnMgdG8gcmVwcmVzZW50IGFuaW1hbHMgYW5kIGdyYXNzIGxldmVsLgogIFRoZSBjbGFzcyBjb25zdHJ1Y3RvciB0YWtlcyB0aGUgdG90YWwgbnVtYmVyIG9mIHN0ZXBzLCB0aGUgbGlzdCBvZiBwYXRjaGVzCiAgaW4gdGhlIHNpbXVsYXRpb24gKGEgMUQgbGlzdCksIHRoZSB3aWR0aCBhbmQgaGVpZ2h0IG9mIHRoZSBncmlkIG9mIHBhdGNoZXMgCiAgKHNvIG9uZSBwYXRjaCBmb3IgZXZlcnkgcGFpciAwIDw9IHggPCB3aWR0aCBhbmQgMCA8PSB5IDwgaGVpZ2h0KS4KICBUaGUgY29uc3RydWN0b3IgaGFzIGFsc28gdGhyZWUgb3B0aW9uYWwgYXJndW1lbnRzOiB0aGUgZmlyc3QgaXMgYSB0aW1lIGRlbGF5IAogIGluIHNlY29uZHMgYWRkZWQgdG8gZWFjaCBjYWxsIHRvIHRoZSB1cGRhdGUgbWV0aG9kIChtaW5pbXVtIGlzIDAuMDVzLCBkZWZhdWx0IAogIGlzIDAuMXMpLCB0aGUgc2Vjb25kIGlzIGEgYm9vbGVhbiBmbGFnIHNwZWNpZnlpbmcgd2hldGhlciB0byByZW5kZXIgdGhlIAogIGFtb3VudCBvZiBncmFzcyBpbiBlYWNoIHBhdGNoLCB0aGUgbGFzdCBvbmUgaXMgdGhlIHNhbWUgb3B0aW9uYWwgYXJndW1lbnQgb2YgCiAgQmF0Y2guCgogIENvbG91ckdyYXBoaWModG90YWxfc3RlcHMsIHBhdGNoZXMsIHdpZHRoLCBoZWlnaHQsIGRlbGF5ID0gMC4xLCBncmFzc19sZXZlbHMgPSBGYWxzZSwgdGV4dF93aWR0aCA9IDYwKQogICIiIgoKICBfX3Nsb3RzX18gPSBbCiAgICAiX3dpZHRoIiwKICAgICJfaGVpZ2h0IiwKICAgICJfcGx0X2dyaWQiLAogICAgIl9wYXRjaGVzIiwKICAgICJfZ3Jhc3MiLAogICAgIl9maWciLAogICAgIl93YXgiLAogICAgIl93aW0iLAogICAgIl9kZWxheSIKICBdCgogIGRlZiBfX2luaXRfXyhzZWxmLCB0b3RhbF9zdGVwcyA6IGludCwgCiAgICAgICAgICAgICAgIHBhdGNoZXMgOiB0eXBpbmcuTGlzdFtlbnRpdGllcy5QYXRjaF0sCiAgICAgICAgICAgICAgIHdpZHRoIDogaW50LCBoZWlnaHQgOiBpbnQsCiAgICAgICAgICAgICAgIGRlbGF5IDogZmxvYXQgPSAwLjEsCiAgICAgICAgICAgICAgIGdyYXNzX2xldmVscyA6IGJvb2wgPSBGYWxzZSwKICAgICAgICAgICAgICAgdGV4dF93aWR0aCA6IGludCA9IDYwKToKICAgIHN1cGVyKCkuX19pbml0X18odG90YWxfc3RlcHMsIHRleHRfd2lkdGgpCgogICAgc2VsZi5fd2lkdGggPSB3aWR0aAogICAgc2VsZi5faGVpZ2h0ID0gaGVpZ2h0CiAgICBzZWxmLl9wbHRfZ3JpZCA9IG5wLnplcm9zKChzZWxmLl9oZWlnaHQsc2VsZi5fd2lkdGgpKQogICAgc2VsZi5fcGF0Y2hlcyA9IHBhdGNoZXMKICAgIHNlbGYuX2dyYXNzID0gZ3Jhc3NfbGV2ZWxzCiAgICBzZWxmLl91cGRhdGVfZ3JpZCgpCiAgICBzZWxmLl9kZWxheSA9IG1heChkZWxheSwwLjA1KQoKICBkZWYgX3VwZGF0ZV9ncmlkKHNlbGYpOiAgICAKICAgIGdyaWQgPSBzZWxmLl9wbHRfZ3JpZAogICAgZm9yIHBhdGNoIGluIHNlbGYuX3BhdGNoZXM6CiAgICAgIHgseSA9IHBhdGNoLmNvb3JkaW5hdGVzKCkKICAgICAgaWYgcGF0Y2guaGFzX2FsaXZlX2ZveCgpIG9yIHBhdGNoLmhhc19hbGl2ZV9yYWJiaXQoKToKICAgICAgICBncmlkW3kseF0gPSAxLjIKICAgICAgZWxpZiBzZWxmLl9ncmFzczoKICAgICAgICBncmlkW3kseF0gPSAocGF0Y2guZ3Jhc3MoKSAvIGVudGl0aWVzLlBhdGNoLm1heF9ncmFzc19hbW91bnQpICogMC43CiAgICAgIGVsc2U6CiAgICAgICAgZ3JpZFt5LHhdID0gMAoKICBkZWYgc3RhcnQoc2VsZik6CiAgICAiIiIKICAgIEJlZ2lucyBkaXNwbGF5aW5nIHRoZSBwcm9ncmVzcyBpbmRpY2F0b3IgYW5kIG9wZW5zIHRoZSBzaW11bGF0aW9uIHdpbmRvdy4KICAgICIiIgogICAgc3VwZXIoKS5zdGFydCgpCiAgICBmaWcsIHdheCA9IHBsdC5zdWJwbG90cygpCiAgICBmaWcuaXNfb3BlbiA9IFRydWUKICAgIGRlZiBfb25fY2xvc2UoZXZlbnQpOgogICAgICBldmVudC5jYW52YXMuZmlndXJlLmlzX29wZW4gPSBGYWxzZQogICAgZmlnLmNhbnZhcy5tcGxfY29ubmVjdCgnY2xvc2VfZXZlbnQnLCBfb25fY2xvc2UpCiAgICBmaWcuY2FudmFzLm1hbmFnZXIuc2V0X3dpbmRvd190aXRsZSgnRm94ZXMgYW5kIHJhYmJpdHMnKQogICAgc2VsZi5fZmlnID0gZmlnCiAgICB3YXguYXhlcy54YXhpcy5zZXRfdGlja3MobnAuYXJhbmdlKDAsc2VsZi5fd2lkdGgsNSkpCiAgICB3YXguYXhlcy54YXhpcy5zZXRfdGlja3MocmFuZ2Uoc2VsZi5fd2lkdGgpLCBtaW5vcj1UcnVlKQogICAgd2F4LmF4ZXMueWF4aXMuc2V0X3RpY2tzKG5wLmFyYW5nZSgwLHNlbGYuX2hlaWdodCw1KSkKICAgIHdheC5heGVzLnlheGlzLnNldF90aWNrcyhyYW5nZShzZWxmLl9oZWlnaHQpLCBtaW5vcj1UcnVlKQogICAgd2F4LmdyaWQod2hpY2g9J2JvdGgnLCBhbHBoYT0wLjIpCiAgICBzZWxmLl93YXggPSB3YXgKICAgIHNlbGYuX3dpbSA9IHdheC5pbXNob3coc2VsZi5fcGx0X2dyaWQsIAogICAgICAgICAgICAgICAgICAgICAgICAgICBpbnRlcnBvbGF0aW9uPSduZWFyZXN0JywgCiAgICAgICAgICAgICAgICAgICAgICAgICAgIGNtYXA9J2dyYXlfcicsIAogICAgICAgICAgICAgICAgICAgICAgICAgICB2bWluID0gMCwgdm1heD0xLjUpCgogIGRlZiB1cGRhdGUoc2VsZiwgc3RlcCA6IGludCk6IAogICAgIiIiCiAgICBVcGRhdGVzIHRoZSBzaW11bGF0aW9uIHdpbmRvdyBhbmQgdGhlIHByb2dyZXNzIGluZGljYXRvciAoc2VlIEJhdGNoLnVwZGF0ZSkuCiAgICAiIiIKICAgIHRzID0gdGltZS5wZXJmX2NvdW50ZXIoKQogICAgc3VwZXIoKS51cGRhdGUoc3RlcCkKICAgIGlmIHNlbGYuX2ZpZy5pc19vcGVuOgogICAgICBzZWxmLl91cGRhdGVfZ3JpZCgpCiAgICAgIHNlbGYuX3dpbS5zZXRfZGF0YShzZWxmLl9wbHRfZ3JpZCkKICAgICAgd2F4ID0gc2VsZi5fd2F4CiAgICAgIHdheC50ZXh0cy5jbGVhcigpCiAgICAgIGZvciBwYXRjaCBpbiBzZWxmLl9wYXRjaGVzOgogICAgICAgIHgseSA9IHBhdGNoLmNvb3JkaW5hdGVzKCkKICAgICAgICBhZiA9IHBhdGNoLmhhc19hbGl2ZV9mb3goKQogICAgICAgIGFyID0gcGF0Y2guaGFzX2FsaXZlX3JhYmJpdCgpCiAgICAgICAgaWYgYWYgYW5kIGFyOgogICAgICAgICAgd2F4LnRleHQoeCx5LCAiRi9SIiwgaGE9ImNlbnRlciIsIHZhPSJjZW50ZXIiLCBjb2xvcj0idyIpCiAgICAgICAgZWxpZiBhZjoKICAgICAgICAgIHdheC50ZXh0KHgseSwgIkYiLCBoYT0iY2VudGVyIiwgdmE9ImNlbnRlciIsIGNvbG9yPSJ3IikKICAgICAgICBlbGlmIGFyOgogICAgICAgICAgd2F4LnRleHQoeCx5LCAiUiIsIGhhPSJjZW50ZXIiLCB2YT0iY2VudGVyIiwgY29sb3I9InciKQogICAgICBwbHQuZHJhdygpCiAgICAgIHRlID0gdGltZS5wZXJmX2NvdW50ZXIoKQogICAgICBwYXVzZSA9IG1heCgwLjA1LCBzZWxmLl9kZWxheSAtICh0ZSAtIHRzKSkKICAgICAgcGx0LnBhdXNlKHBhdXNlKQoKICBkZWYgc3RvcChzZWxmKToKICAgICIiIgogICAgQ2xvc2VzIHRoZSBzaW11bGF0aW9uIHdpbmRvdyBhbmQgY29tcGxldGVzIHRoZSBwcm9ncmVzcyBpbmRpY2F0b3IuCiAgICAiIiIKICAgIHN1cGVyKCkuc3RvcCgpCiAgICBpZiBzZWxmLl9maWcuaXNfb3BlbjoKICAgICAgcGx0LmNsb3NlKHNlbGYuX2ZpZykKCmNsYXNzIENvbG91ckdyYXBoaWNzKEJhdGNoKToKICAiIiIKICBCZXNpZGVzIG9mZmVyaW5nIHRoZSBzYW1lIGZ1bmN0aW9uYWxpdHkgb2YgQmF0Y2gsIHRoaXMgY2xhc3MgdmlzdWFsaXNlcwogIHRoZSBzaW11bGF0ZWQgd29ybGQgdXNpbmcgY29sb3VycyB0byByZXByZXNlbnQgYW5pbWFscyBhbmQgZ3Jhc3MgbGV2ZWwuCiAgVGhlIGNsYXNzIGNvbnN0cnVjdG9yIHRha2VzIHRoZSB0b3RhbCBudW1iZXIgb2Ygc3RlcHMsIHRoZSBsaXN0IG9mIHBhdGNoZXMKICBpbiB0aGUgc2ltdWxhdGlvbiAoYSAxRCBsaXN0KSwgdGhlIHdpZHRoIGFuZCBoZWlnaHQgb2YgdGhlIGdyaWQgb2YgcGF0Y2hlcwogIChzbyBvbmUgcGF0Y2ggZm9yIGV2ZXJ5IHBhaXIgMCA8PSB4IDwgd2lkdGggYW5kIDAgPD0geSA8IGhlaWdodCkuCiAgVGhlIGNvbnN0cnVjdG9yIGhhcyBhbHNvIHRocmVlIG9wdGlvbmFsIGFyZ3VtZW50czogdGhlIGZpcnN0IGlzIGEgdGltZSBkZWxheSAKICBpbiBzZWNvbmRzIGFkZGVkIHRvIGVhY2ggY2FsbCB0byB0aGUgdXBkYXRlIG1ldGhvZCAobWluaW11bSBpcyAwLjA1cywgZGVmYXVsdCAKICBpcyAwLjFzKSwgdGhlIHNlY29uZCBpcyBhIGJvb2xlYW4gZmxhZyBzcGVjaWZ5aW5nIHdoZXRoZXIgdG8gcmVuZGVyIHRoZSAKICBhbW91bnQgb2YgZ3Jhc3MgaW4gZWFjaCBwYXRjaCwgdGhlIGxhc3Qgb25lIGlzIHRoZSBzYW1lIG9wdGlvbmFsIGFyZ3VtZW50IG9mIAogIEJhdGNoLgoKICBDb2xvdXJHcmFwaGljKHRvdGFsX3N0ZXBzLCBwYXRjaGVzLCB3aWR0aCwgaGVpZ2h0LCBkZWxheSA9IDAuMSwgZ3Jhc3NfbGV2ZWxzID0gRmFsc2UsIHRleHRfd2lkdGggPSA2MCkKICAiIiIKCiAgX19zbG90c19fID0gWwogICAgIl93aWR0aCIsCiAgICAiX2hlaWdodCIsCiAgICAiX3BsdF9ncmlkIiwKICAgICJfcGF0Y2hlcyIsCiAgICAiX2dyYXNzIiwKICAgICJfZmlnIiwKICAgICJfd2F4IiwKICAgICJfd2ltIiwKICAgICJfZGVsYXkiCiAgXQoKICBkZWYgX19pbml0X18oc2VsZiwgdG90YWxfc3RlcHMgOiBpbnQsIAogICAgICAgICAgICAgICBwYXRjaGVzIDogdHlwaW5nLkxpc3RbZW50aXRpZXMuUGF0Y2hdLAogICAgICAgICAgICAgICB3aWR0aCA6IGludCwgaGVpZ2h0IDogaW50LAogICAgICAgICAgICAgICBkZWxheSA6IGZsb2F0ID0gMC4xLAogICAgICAgICAgICAgICBncmFzc19sZXZlbHMgOiBib29sID0gRmFsc2UsCiAgICAgICAgICAgICAgIHRleHRfd2lkdGggOiBpbnQgPSA2MCk6CiAgICBzdXBlcigpLl9faW5pdF9fKHRvdGFsX3N0ZXBzLCB0ZXh0X3dpZHRoKQoKICAgIHNlbGYuX3dpZHRoID0gd2lkdGgKICAgIHNlbGYuX2hlaWdodCA9IGhlaWdodAogICAgc2VsZi5fcGx0X2dyaWQgPSBucC56ZXJvcygoc2VsZi5faGVpZ2h0ICogMiwgc2VsZi5fd2lkdGggKiAyKSkKICAgIHNlbGYuX3BhdGNoZXMgPSBwYXRjaGVzCiAgICBzZWxmLl9ncmFzcyA9IGdyYXNzX2xldmVscwogICAgc2VsZi5fdXBkYXRlX2dyaWQoKQogICAgc2VsZi5fZGVsYXkgPSBtYXgoZGVsYXksMC4wNSkKCiAgZGVmIF91cGRhdGVfZ3JpZChzZWxmKTogICAgCiAgICBncmlkID0gc2VsZi5fcGx0X2dyaWQKICAgIGZvciBwYXRjaCBpbiBzZWxmLl9wYXRjaGVzOgogICAgICB4LHkgPSBwYXRjaC5jb29yZGluYXRlcygpCiAgICAgIHggKj0gMgogICAgICB5ICo9IDIKICAgICAgYWYgPSBwYXRjaC5oYXNfYWxpdmVfZm94KCkKICAgICAgYXIgPSBwYXRjaC5oYXNfYWxpdmVfcmFiYml0KCkKICAgICAgZ3IgPSBwYXRjaC5ncmFzcygpIC8gZW50aXRpZXMuUGF0Y2gubWF4X2dyYXNzX2Ftb3VudCBpZiBzZWxmLl9ncmFzcyBlbHNlIDAKICAgICAgaWYgYWYgYW5kIGFyOgogICAgICAgIGdyaWRbeSAgLHggIF0gPSAyIAogICAgICAgIGdyaWRbeSsxLHgrMV0gPSAyCiAgICAgICAgZ3JpZFt5ICAseCsxXSA9IDMKICAgICAgICBncmlkW3krMSx4ICBdID0gMwogICAgICBlbGlmIGFmOgogICAgICAgIGdyaWRbeSAgLHggIF0gPSAyIAogICAgICAgIGdyaWRbeSsxLHgrMV0gPSAyCiAgICAgICAgZ3JpZFt5ICAseCsxXSA9IDIKICAgICAgICBncmlkW3krMSx4ICBdID0gMgogICAgICBlbGlmIGFyOgogICAgICAgIGdyaWRbeSAgLHggIF0gPSAzIAogICAgICAgIGdyaWRbeSsxLHgrMV0gPSAzCiAgICAgICAgZ3JpZFt5ICAseCsxXSA9IDMKICAgICAgICBncmlkW3krMSx4ICBdID0gMwogICAgICBlbHNlOgogICAgICAgIGdyaWRbeSAgLHggIF0gPSBnciAKICAgICAgICBncmlkW3krMSx4KzFdID0gZ3IKICAgICAgICBncmlkW3kgICx4KzFdID0gZ3IKICAgICAgICBncmlkW3krMSx4ICBdID0gZ3IKCgogIGRlZiBzdGFydChzZWxmKToKICAgICIiIgogICAgQmVnaW5zIGRpc3BsYXlpbmcgdGhlIHByb2dyZXNzIGluZGljYXRvciBhbmQgb3BlbnMgdGhlIHNpbXVsYXRpb24gd2luZG93LgogICAgIiIiCiAgICBzdXBlcigpLnN0YXJ0KCkKICAgIGZpZywgd2F4ID0gcGx0LnN1YnBsb3RzKCkKICAgIGZpZy5pc19vcGVuID0gVHJ1ZQogICAgZGVmIF9vbl9jbG9zZShldmVudCk6CiAgICAgIGV2ZW50LmNhbnZhcy5maWd1cmUuaXNfb3BlbiA9IEZhbHNlCiAgICBmaWcuY2FudmFzLm1wbF9jb25uZWN0KCdjbG9zZV9ldmVudCcsIF9vbl9jbG9zZSkKICAgIGZpZy5jYW52YXMubWFuYWdlci5zZXRfd2luZG93X3RpdGxlKCdGb3hlcyBhbmQgcmFiYml0cycpCiAgICBzZWxmLl9maWcgPSBmaWcKICAgIHdheC5heGVzLnhheGlzLnNldF90aWNrcyhucC5hcmFuZ2UoMC41LHNlbGYuX3dpZHRoKjIsMTApKQogICAgd2F4LmF4ZXMueGF4aXMuc2V0X3RpY2tsYWJlbHMobnAuYXJhbmdlKDAsc2VsZi5fd2lkdGgsNSkpCiAgICB3YXguYXhlcy54YXhpcy5zZXRfdGlja3MobnAuYXJhbmdlKDAuNSxzZWxmLl93aWR0aCoyLDIpLCBtaW5vcj1UcnVlKQogICAgd2F4LmF4ZXMueWF4aXMuc2V0X3RpY2tzKG5wLmFyYW5nZSgwLjUsc2VsZi5faGVpZ2h0KjIsMTApKQogICAgd2F4LmF4ZXMueWF4aXMuc2V0X3RpY2tsYWJlbHMobnAuYXJhbmdlKDAsc2VsZi5faGVpZ2h0LDUpKQogICAgd2F4LmF4ZXMueWF4aXMuc2V0X3RpY2tzKG5wLmFyYW5nZSgwLjUsc2VsZi5faGVpZ2h0KjIsMiksIG1pbm9yPVRydWUpCiAgICB3YXguZ3JpZCh3aGljaD0nYm90aCcsIGFscGhhPTAuMikKICAgIHdheC5zZXRfYXNwZWN0KCJlcXVhbCIpCiAgICBzZWxmLl93YXggPSB3YXgKICAgIGNtYXAgPSBtcGwuY29sb3JzLkxpc3RlZENvbG9ybWFwKFsnbGltZWdyZWVuJywnZm9yZXN0Z3JlZW4nLCdncmVlbicsJ2RhcmtncmVlbicsICdkYXJrb3JhbmdlJywgJ2RpbWdyZXknXSkKICAgIGJvdW5kcyA9IFswLCAwLjAyLCAwLjMsIDAuNiwgMS4xLCAyLjUsIDMuNV0KICAgIG5vcm0gPSBtcGwuY29sb3JzLkJvdW5kYXJ5Tm9ybShib3VuZHMsIGNtYXAuTikKICAgIHNlbGYuX3dpbSA9IHdheC5pbXNob3coc2VsZi5fcGx0X2dyaWQsIGludGVycG9sYXRpb249J25vbmUnLCBjbWFwPWNtYXAsIG5vcm09bm9ybSwpCgogIGRlZiB1cGRhdGUoc2VsZiwgc3RlcCA6IGludCk6IAogICAgIiIiCiAgICBVcGRhdGVzIHRoZSBzaW11bGF0aW9uIHdpbmRvdyBhbmQgdGhlIHByb2dyZXNzIGluZGljYXRvciAoc2VlIEJhdGNoLnVwZGF0ZSkuCiAgICAiIiIKICAgIHRzID0gdGltZS5wZXJmX2NvdW50ZXIoKQogICAgc3VwZXIoKS51cGRhdGUoc3RlcCkKICAgIGlmIHNlbGYuX2ZpZy5pc19vcGVuOgogICAgICBzZWxmLl91cGRhdGVfZ3JpZCgpCiAgICAgIHNlbGYuX3dpbS5zZXRfZGF0YShzZWxmLl9wbHRfZ3JpZCkKICAgICAgcGx0LmRyYXcoKQogICAgICB0ZSA9IHRpbWUucGVyZl9jb3VudGVyKCkKICAgICAgcGF1c2UgPSBtYXgoMC4wNSwgc2VsZi5fZGVsYXkgLSAodGUgLSB0cykpCiAgICAgIHBsdC5wYXVzZShwYXVzZSkKCiAgZGVmIHN0b3Aoc2VsZik6CiAgICAiIiIKICAgIENsb3NlcyB0aGUgc2ltdWxhdGlvbiB3aW5kb3cgYW5kIGNvbXBsZXRlcyB0aGUgcHJvZ3Jlc3MgaW5kaWNhdG9yLgogICAgIiIiCiAgICBzdXBlcigpLnN0b3AoKQogICAgaWYgc2VsZi5fZmlnLmlzX29wZW46CiAgICAgIHBsdC5jbG9zZShzZWxmLl9maWcpCg=='),'<string>','exec'))
\ No newline at end of file
+"""
+This module implements batch and graphical visualisers for the simulation.
+"""
+
+import entities
+import json
+import typing
+import time
+
+class Batch:
+  """
+  This class prints a progress bar to show the proportion of simulation steps
+  completed, followed by the speed of the run (steps and animals per second),
+  the elapsed time and the estimated time left.
+
+  The constructor takes the total number of steps and, optionally, the width of
+  the progress bar in characters (minimum is 30, default is 60). The line is
+  redrawn at most once per interval (in seconds, default is 0.5), so updating
+  in every step costs next to nothing. If a JSON lines file is given, a line
+  with the same figures is appended to it at most once per json_interval
+  seconds (default is 5) and once more when the run stops, e.g. for a job
+  scheduler.
+
+  vis = Batch( total_steps, text_width = 80, json_path = "progress.jsonl")
+  vis.start()
+  for step in range( total_steps ):
+    vis.update( step, animals )
+  vis.stop()
+  """
+
+  __slots__ = [
+    "_total_steps",
+    "_text_width",
+    "_interval",
+    "_json_path",
+    "_json_interval",
+    "_json_file",
+    "_step",
+    "_animals",
+    "_started",
+    "_next_print",
+    "_next_json",
+    "_last_time",
+    "_last_step",
+    "_last_animals",
+    "_step_rate",
+    "_animal_rate",
+    "_line_length"
+  ]
+
+  def __init__(self, total_steps : int, text_width : int = 60,
+               interval : float = 0.5,
+               json_path : typing.Optional[str] = None,
+               json_interval : float = 5.0):
+    self._total_steps = total_steps
+    self._text_width = max(30, text_width)
+    self._interval = interval
+    self._json_path = json_path
+    self._json_interval = json_interval
+    self._json_file = None
+    self._step = self._animals = 0
+    self._started = self._next_print = self._next_json = self._last_time = 0.0
+    self._last_step = self._last_animals = 0
+    self._step_rate = self._animal_rate = None
+    self._line_length = 0
+
+  def start(self):
+    """
+    Begins displaying the progress indicator.
+    """
+    self._started = self._last_time = time.perf_counter()
+    self._next_print = self._started + self._interval
+    self._next_json = self._started + self._json_interval
+    self._step = self._animals = self._last_step = self._last_animals = 0
+    self._step_rate = self._animal_rate = None
+    self._line_length = 0
+    if self._json_path is not None:
+      self._json_file = open(self._json_path, 'a')
+    print(' [' + 'simulation progress'.center(self._text_width - 8) + ']     ')
+    self._print()
+
+  def update(self, step : int, animals : int = 0):
+    """
+    Updates the progress indicator to reflect the amount of completed steps
+    (expected to grow monotonically) and the number of animals updated in
+    them so far (optional).
+    """
+    self._step = step
+    self._animals = animals
+    now = time.perf_counter()
+    if now >= self._next_print:
+      self._measure(now)
+      self._print()
+      self._next_print = now + self._interval
+    if self._json_file is not None and now >= self._next_json:
+      self._measure(now)
+      self._write_json(False)
+      self._next_json = now + self._json_interval
+
+  def stop(self):
+    """
+    Completes the progress indicator.
+    """
+    now = time.perf_counter()
+    elapsed = now - self._started
+    # The figures of the whole run
+    self._step_rate = self._step / elapsed if elapsed > 0 else None
+    self._animal_rate = self._animals / elapsed if elapsed > 0 else None
+    self._last_time, self._last_step, self._last_animals = now, self._step, self._animals
+    self._print(final = True)
+    print(flush=True)
+    if self._json_file is not None:
+      self._write_json(True)
+      self._json_file.close()
+      self._json_file = None
+
+  def _measure(self, now : float):
+    """
+    Updates the speed of the run since the previous measurement.
+    """
+    if now - self._last_time > 0 and self._step > self._last_step:
+      self._step_rate = (self._step - self._last_step) / (now - self._last_time)
+      self._animal_rate = (self._animals - self._last_animals) / (now - self._last_time)
+      self._last_time, self._last_step, self._last_animals = now, self._step, self._animals
+
+  def _eta(self) -> typing.Optional[float]:
+    if not self._step_rate:
+      return None
+    return max(0, self._total_steps - self._step) / self._step_rate
+
+  def _print(self, final : bool = False):
+    """
+    Redraws the progress line. The final line shows "done" instead of the time left.
+    """
+    width = self._text_width - 8
+    step = min(self._step, self._total_steps)
+    filled = int(round(width * step / self._total_steps)) if self._total_steps else width
+    line = ' [' + '-' * filled + ' ' * (width - filled) + ']'
+    line += f' {step}/{self._total_steps}'
+    if self._step_rate is not None:
+      line += f'  {self._step_rate:.1f} steps/s'
+      if self._animals:
+        line += f'  {_format_count(self._animal_rate)} animals/s'
+    line += f'  elapsed {_format_duration(time.perf_counter() - self._started)}'
+    eta = None if final else self._eta()
+    if eta is not None:
+      line += f'  ETA {_format_duration(eta)}'
+    if final:
+      line += '  done'
+    # Spaces cover what is left of a longer previous line
+    print('\r' + line + ' ' * max(0, self._line_length - len(line)), end='', flush=True)
+    self._line_length = len(line)
+
+  def _write_json(self, done : bool):
+    """
+    Appends the progress of the run to the JSON lines file.
+    """
+    self._json_file.write(json.dumps({
+      'time': time.time(),
+      'step': min(self._step, self._total_steps),
+      'total_steps': self._total_steps,
+      'elapsed_seconds': time.perf_counter() - self._started,
+      'steps_per_second': self._step_rate,
+      'animals_per_second': self._animal_rate,
+      'eta_seconds': 0 if done else self._eta(),
+      'done': done
+    }) + '\n')
+    self._json_file.flush()
+
+def _format_duration(seconds : float) -> str:
+  """
+  Formats a number of seconds as hours, minutes and seconds (h:mm:ss).
+  """
+  minutes, seconds = divmod(int(round(seconds)), 60)
+  hours, minutes = divmod(minutes, 60)
+  return f'{hours}:{minutes:02d}:{seconds:02d}'
+
+def _format_count(count : float) -> str:
+  """
+  Formats a count with a metric suffix (e.g. 12.3k).
+  """
+  for limit, suffix in ((1e9, 'G'), (1e6, 'M'), (1e3, 'k')):
+    if count >= limit:
+      return f'{count / limit:.1f}{suffix}'
+  return f'{count:.0f}'
+
+
+np = mpl = plt = None # NumPy and matplotlib, imported by _load_plotting
+
+def _load_plotting():
+  """
+  Imports NumPy and matplotlib when the first graphical visualiser is created,
+  so batch runs start without loading them.
+  """
+  global np, mpl, plt
+  if plt is None:
+    import numpy
+    import matplotlib
+    import matplotlib.pyplot
+    np, mpl, plt = numpy, matplotlib, matplotlib.pyplot
+
+def _patch_groups(patches, tiles):
+  """
+  Yields groups of patches to render, each with a flag telling whether the
+  group may hold animals. Without tiles, all patches form a single group.
+  With tiles (see worlds.TiledWorld), every tile is a group and the animal
+  checks are skipped for tiles without animals.
+  """
+  if tiles is None:
+    yield patches, True
+  else:
+    for tile in tiles:
+      yield tile, not tile.is_empty()
+
+class GrayscaleGraphics(Batch):
+  """
+  Besides offering the same functionality of Batch, this class visualises
+  the simulated world using colours to represent animals and grass level.
+  The class constructor takes the total number of steps, the list of patches
+  in the simulation (a 1D list), the width and height of the grid of patches 
+  (so one patch for every pair 0 <= x < width and 0 <= y < height).
+  The constructor has also three optional arguments: the first is a time delay 
+  in seconds added to each call to the update method (minimum is 0.05s, default 
+  is 0.1s), the second is a boolean flag specifying whether to render the 
+  amount of grass in each patch, the third one is the same optional argument of 
+  Batch. The last optional argument is the list of tiles of a tiled world (see
+  worlds.TiledWorld), used to skip looking for animals on empty tiles.
+
+  ColourGraphic(total_steps, patches, width, height, delay = 0.1, grass_levels = False, text_width = 60, tiles = None)
+  """
+
+  __slots__ = [
+    "_width",
+    "_height",
+    "_plt_grid",
+    "_patches",
+    "_grass",
+    "_fig",
+    "_wax",
+    "_wim",
+    "_delay",
+    "_tiles"
+  ]
+
+  def __init__(self, total_steps : int, 
+               patches : typing.List[entities.Patch],
+               width : int, height : int,
+               delay : float = 0.1,
+               grass_levels : bool = False,
+               text_width : int = 60,
+               tiles : typing.Optional[list] = None):
+    super().__init__(total_steps, text_width)
+    _load_plotting()
+
+    self._width = width
+    self._height = height
+    self._plt_grid = np.zeros((self._height,self._width))
+    self._patches = patches
+    self._grass = grass_levels
+    self._tiles = tiles
+    self._update_grid()
+    self._delay = max(delay,0.05)
+
+  def _update_grid(self):    
+    grid = self._plt_grid
+    for patches, animals in _patch_groups(self._patches, self._tiles):
+      for patch in patches:
+        x,y = patch.coordinates()
+        if animals and (patch.has_alive_fox() or patch.has_alive_rabbit()):
+          grid[y,x] = 1.2
+        elif self._grass:
+          grid[y,x] = (patch.grass() / entities.Patch.max_grass_amount) * 0.7
+        else:
+          grid[y,x] = 0
+
+  def start(self):
+    """
+    Begins displaying the progress indicator and opens the simulation window.
+    """
+    super().start()
+    fig, wax = plt.subplots()
+    fig.is_open = True
+    def _on_close(event):
+      event.canvas.figure.is_open = False
+    fig.canvas.mpl_connect('close_event', _on_close)
+    fig.canvas.manager.set_window_title('Foxes and rabbits')
+    self._fig = fig
+    wax.axes.xaxis.set_ticks(np.arange(0,self._width,5))
+    wax.axes.xaxis.set_ticks(range(self._width), minor=True)
+    wax.axes.yaxis.set_ticks(np.arange(0,self._height,5))
+    wax.axes.yaxis.set_ticks(range(self._height), minor=True)
+    wax.grid(which='both', alpha=0.2)
+    self._wax = wax
+    self._wim = wax.imshow(self._plt_grid, 
+                           interpolation='nearest', 
+                           cmap='gray_r', 
+                           vmin = 0, vmax=1.5)
+
+  def update(self, step : int, animals : int = 0): 
+    """
+    Updates the simulation window and the progress indicator (see Batch.update).
+    """
+    ts = time.perf_counter()
+    super().update(step, animals)
+    if self._fig.is_open:
+      self._update_grid()
+      self._wim.set_data(self._plt_grid)
+      wax = self._wax
+      wax.texts.clear()
+      for patches, animals in _patch_groups(self._patches, self._tiles):
+        if not animals:
+          continue
+        for patch in patches:
+          x,y = patch.coordinates()
+          af = patch.has_alive_fox()
+          ar = patch.has_alive_rabbit()
+          if af and ar:
+            wax.text(x,y, "F/R", ha="center", va="center", color="w")
+          elif af:
+            wax.text(x,y, "F", ha="center", va="center", color="w")
+          elif ar:
+            wax.text(x,y, "R", ha="center", va="center", color="w")
+      plt.draw()
+      te = time.perf_counter()
+      pause = max(0.05, self._delay - (te - ts))
+      plt.pause(pause)
+
+  def stop(self):
+    """
+    Closes the simulation window and completes the progress indicator.
+    """
+    super().stop()
+    if self._fig.is_open:
+      plt.close(self._fig)
+
+class ColourGraphics(Batch):
+  """
+  Besides offering the same functionality of Batch, this class visualises
+  the simulated world using colours to represent animals and grass level.
+  The class constructor takes the total number of steps, the list of patches
+  in the simulation (a 1D list), the width and height of the grid of patches
+  (so one patch for every pair 0 <= x < width and 0 <= y < height).
+  The constructor has also three optional arguments: the first is a time delay 
+  in seconds added to each call to the update method (minimum is 0.05s, default 
+  is 0.1s), the second is a boolean flag specifying whether to render the 
+  amount of grass in each patch, the third one is the same optional argument of 
+  Batch. The last optional argument is the list of tiles of a tiled world (see
+  worlds.TiledWorld), used to skip looking for animals on empty tiles.
+
+  ColourGraphic(total_steps, patches, width, height, delay = 0.1, grass_levels = False, text_width = 60, tiles = None)
+  """
+
+  __slots__ = [
+    "_width",
+    "_height",
+    "_plt_grid",
+    "_patches",
+    "_grass",
+    "_fig",
+    "_wax",
+    "_wim",
+    "_delay",
+    "_tiles"
+  ]
+
+  def __init__(self, total_steps : int, 
+               patches : typing.List[entities.Patch],
+               width : int, height : int,
+               delay : float = 0.1,
+               grass_levels : bool = False,
+               text_width : int = 60,
+               tiles : typing.Optional[list] = None):
+    super().__init__(total_steps, text_width)
+    _load_plotting()
+
+    self._width = width
+    self._height = height
+    self._plt_grid = np.zeros((self._height * 2, self._width * 2))
+    self._patches = patches
+    self._grass = grass_levels
+    self._tiles = tiles
+    self._update_grid()
+    self._delay = max(delay,0.05)
+
+  def _update_grid(self):    
+    grid = self._plt_grid
+    for patches, animals in _patch_groups(self._patches, self._tiles):
+      for patch in patches:
+        x,y = patch.coordinates()
+        x *= 2
+        y *= 2
+        af = animals and patch.has_alive_fox()
+        ar = animals and patch.has_alive_rabbit()
+        gr = patch.grass() / entities.Patch.max_grass_amount if self._grass else 0
+        if af and ar:
+          grid[y  ,x  ] = 2 
+          grid[y+1,x+1] = 2
+          grid[y  ,x+1] = 3
+          grid[y+1,x  ] = 3
+        elif af:
+          grid[y  ,x  ] = 2 
+          grid[y+1,x+1] = 2
+          grid[y  ,x+1] = 2
+          grid[y+1,x  ] = 2
+        elif ar:
+          grid[y  ,x  ] = 3 
+          grid[y+1,x+1] = 3
+          grid[y  ,x+1] = 3
+          grid[y+1,x  ] = 3
+        else:
+          grid[y  ,x  ] = gr 
+          grid[y+1,x+1] = gr
+          grid[y  ,x+1] = gr
+          grid[y+1,x  ] = gr
+
+
+  def start(self):
+    """
+    Begins displaying the progress indicator and opens the simulation window.
+    """
+    super().start()
+    fig, wax = plt.subplots()
+    fig.is_open = True
+    def _on_close(event):
+      event.canvas.figure.is_open = False
+    fig.canvas.mpl_connect('close_event', _on_close)
+    fig.canvas.manager.set_window_title('Foxes and rabbits')
+    self._fig = fig
+    wax.axes.xaxis.set_ticks(np.arange(0.5,self._width*2,10))
+    wax.axes.xaxis.set_ticklabels(np.arange(0,self._width,5))
+    wax.axes.xaxis.set_ticks(np.arange(0.5,self._width*2,2), minor=True)
+    wax.axes.yaxis.set_ticks(np.arange(0.5,self._height*2,10))
+    wax.axes.yaxis.set_ticklabels(np.arange(0,self._height,5))
+    wax.axes.yaxis.set_ticks(np.arange(0.5,self._height*2,2), minor=True)
+    wax.grid(which='both', alpha=0.2)
+    wax.set_aspect("equal")
+    self._wax = wax
+    cmap = mpl.colors.ListedColormap(['limegreen','forestgreen','green','darkgreen', 'darkorange', 'dimgrey'])
+    bounds = [0, 0.02, 0.3, 0.6, 1.1, 2.5, 3.5]
+    norm = mpl.colors.BoundaryNorm(bounds, cmap.N)
+    self._wim = wax.imshow(self._plt_grid, interpolation='none', cmap=cmap, norm=norm,)
+
+  def update(self, step : int, animals : int = 0): 
+    """
+    Updates the simulation window and the progress indicator (see Batch.update).
+    """
+    ts = time.perf_counter()
+    super().update(step, animals)
+    if self._fig.is_open:
+      self._update_grid()
+      self._wim.set_data(self._plt_grid)
+      plt.draw()
+      te = time.perf_counter()
+      pause = max(0.05, self._delay - (te - ts))
+      plt.pause(pause)
+
+  def stop(self):
+    """
+    Closes the simulation window and completes the progress indicator.
+    """
+    super().stop()
+    if self._fig.is_open:
+      plt.close(self._fig)
@@ -0,0 +1,317 @@
+"""
+This module offers alternative storage for the simulated world.
+
+The worlds behave like the nested lists built by simulation.create_world (world[ns_pos][we_pos], len(world),
+len(world[0]) and negative indices wrap around), so the functions in the module simulation work with any of them.
+"""
+import random
+from entities import FOX, Animal, Patch, _mix
+from typing import Iterator, List
+
+
+class _GridRow:
+    """
+    A row of a sparse or tiled grid. Indexing it returns the value at the given west-east position.
+    """
+    __slots__ = [
+        "_grid",
+        "_ns_pos"
+    ]
+
+    def __init__(self, grid: "SparseWorld | TiledWorld | SparseCounts", ns_pos: int):
+        self._grid = grid
+        self._ns_pos = ns_pos
+
+    def __len__(self) -> int:
+        return self._grid._west_east_length
+
+    def __getitem__(self, we_pos: int):
+        return self._grid._get(self._ns_pos, we_pos)
+
+    def __setitem__(self, we_pos: int, value) -> None:
+        self._grid._set(self._ns_pos, we_pos, value)
+
+
+class SparseWorld:
+    """
+    A world that only creates a patch the first time it is touched.
+
+    Untouched patches hold a default amount of grass derived from the seed and their coordinates, so two worlds
+    with the same seed agree on every patch no matter in which order they are touched. When a patch is created
+    after the simulation has started, its grass is grown for the steps that have passed (see Patch.tick), or
+    settled on the next read with lazy grass (see Patch.grass).
+
+    Iterating over the world yields the created patches in row-major order (one list per row). Patches created
+    while iterating are not visited until the next iteration.
+
+    Parameters
+    ----------
+    - north_south_length: The north-south length of the world
+    - west_east_length: The west-east length of the world
+    - seed: The seed for the default grass of untouched patches
+    """
+    __slots__ = [
+        "_north_south_length",
+        "_west_east_length",
+        "_seed",
+        "_patches"
+    ]
+
+    def __init__(self, north_south_length: int, west_east_length: int, seed: int):
+        self._north_south_length = north_south_length
+        self._west_east_length = west_east_length
+        self._seed = seed
+        self._patches = {} # Flat index (ns_pos * west_east_length + we_pos) -> Patch
+
+    def __len__(self) -> int:
+        return self._north_south_length
+
+    def __getitem__(self, ns_pos: int) -> _GridRow:
+        if ns_pos < 0:
+            ns_pos += self._north_south_length
+        return _GridRow(self, ns_pos)
+
+    def __iter__(self) -> Iterator[List[Patch]]:
+        patches = self._patches
+        row = []
+        row_ns_pos = None
+        for index in sorted(patches): # Sorting takes a snapshot, so patches can be created while iterating
+            ns_pos = index // self._west_east_length
+            if ns_pos != row_ns_pos:
+                if row:
+                    yield row
+                row = []
+                row_ns_pos = ns_pos
+            row.append(patches[index])
+        if row:
+            yield row
+
+    def _get(self, ns_pos: int, we_pos: int) -> Patch:
+        if we_pos < 0:
+            we_pos += self._west_east_length
+        index = ns_pos * self._west_east_length + we_pos
+        patch = self._patches.get(index)
+        if patch is None:
+            if not (0 <= ns_pos < self._north_south_length and 0 <= we_pos < self._west_east_length):
+                raise IndexError(f"Coordinates ({ns_pos}, {we_pos}) are outside of the world")
+            if Patch.lazy_grass:
+                patch = Patch(ns_pos, we_pos, self._grass_at(index, 0), settled_step = 0)
+            else:
+                patch = Patch(ns_pos, we_pos, self._grass_at(index, Patch.current_step))
+            self._patches[index] = patch
+        return patch
+
+    def _set(self, ns_pos: int, we_pos: int, value: Patch) -> None:
+        raise TypeError("Patches of a sparse world are created on demand and cannot be replaced")
+
+    def _grass_at(self, index: int, steps: int) -> int:
+        """Returns the grass of an untouched patch after the given number of steps.
+        """
+        key = _mix(self._seed ^ _mix(index))
+        grass = key % (Patch.max_grass_amount + 1)
+        growth_range = Patch.max_grass_growth - Patch.min_grass_growth + 1
+        # Grass grows by at least min_grass_growth per step, so this loop ends after a few draws
+        draw = 0
+        while draw < steps and grass <= Patch.max_grass_amount:
+            draw += 1
+            grass += Patch.min_grass_growth + _mix(key + draw) % growth_range
+        return grass
+
+    def default_grass(self, ns_pos: int, we_pos: int) -> int:
+        """Returns the amount of grass an untouched patch at the given coordinates starts with.
+        """
+        return self._grass_at(ns_pos * self._west_east_length + we_pos, 0)
+
+    def materialised(self) -> int:
+        """Returns the number of patches that have been created so far.
+        """
+        return len(self._patches)
+
+class Tile:
+    """
+    A square block of patches in a tiled world (see TiledWorld), with counters of the foxes and rabbits on it.
+
+    Iterating over the tile yields its patches in row-major order.
+    """
+    __slots__ = [
+        "_patches",
+        "_width",
+        "_foxes",
+        "_rabbits"
+    ]
+
+    def __init__(self, width: int):
+        self._patches = []
+        self._width = width
+        self._foxes = 0
+        self._rabbits = 0
+
+    def __iter__(self) -> Iterator[Patch]:
+        return iter(self._patches)
+
+    def foxes(self) -> int:
+        """Returns the number of foxes on the tile.
+        """
+        return self._foxes
+
+    def rabbits(self) -> int:
+        """Returns the number of rabbits on the tile.
+        """
+        return self._rabbits
+
+    def is_empty(self) -> bool:
+        """Returns True if there are no animals on the tile, False otherwise.
+        """
+        return self._foxes == 0 and self._rabbits == 0
+
+
+class TiledPatch(Patch):
+    """
+    A patch in a tiled world. Adding and removing animals updates the counters of its tile.
+
+    Parameters
+    ----------
+    - tile: The tile this patch belongs to
+    See Patch for the other parameters.
+    """
+    __slots__ = [
+        "_tile"
+    ]
+
+    def __init__(self, x: int, y: int, grass: int, tile: Tile):
+        super().__init__(x, y, grass)
+        self._tile = tile
+
+    def add(self, animal: Animal) -> None:
+        super().add(animal)
+        if animal.species_code == FOX:
+            self._tile._foxes += 1
+        else:
+            self._tile._rabbits += 1
+
+    def remove(self, animal: Animal) -> None:
+        super().remove(animal)
+        if animal.species_code == FOX:
+            self._tile._foxes -= 1
+        else:
+            self._tile._rabbits -= 1
+
+
+class TiledWorld:
+    """
+    A world whose patches are stored in square tiles (e.g. 32x32 patches), each tile holding its patches contiguously.
+
+    Every tile counts the animals on it, so a step can skip whole tiles without animals. Iterating over the world
+    yields the tiles (see Tile) in row-major order, and the patches of a tile in row-major order within the tile.
+    Tiles on the south and east borders are smaller if the lengths of the world are not multiples of the tile size.
+
+    Parameters
+    ----------
+    - north_south_length: The north-south length of the world
+    - west_east_length: The west-east length of the world
+    - tile_size: The side length of a tile (default 32)
+    """
+    __slots__ = [
+        "_north_south_length",
+        "_west_east_length",
+        "_tile_size",
+        "_tiles_per_row",
+        "_tiles"
+    ]
+
+    def __init__(self, north_south_length: int, west_east_length: int, tile_size: int = 32):
+        self._north_south_length = north_south_length
+        self._west_east_length = west_east_length
+        self._tile_size = tile_size
+        self._tiles_per_row = -(-west_east_length // tile_size) # Rounded up
+        self._tiles = []
+        grass = range(Patch.max_grass_amount + 1)
+        for ns_start in range(0, north_south_length, tile_size):
+            ns_end = min(ns_start + tile_size, north_south_length)
+            for we_start in range(0, west_east_length, tile_size):
+                we_end = min(we_start + tile_size, west_east_length)
+                tile = Tile(we_end - we_start)
+                tile_grass = iter(random.choices(grass, k = (ns_end - ns_start) * (we_end - we_start)))
+                tile._patches = [TiledPatch(ns_pos, we_pos, next(tile_grass), tile)
+                                 for ns_pos in range(ns_start, ns_end)
+                                 for we_pos in range(we_start, we_end)]
+                self._tiles.append(tile)
+
+    def __len__(self) -> int:
+        return self._north_south_length
+
+    def __getitem__(self, ns_pos: int) -> _GridRow:
+        if ns_pos < 0:
+            ns_pos += self._north_south_length
+        return _GridRow(self, ns_pos)
+
+    def __iter__(self) -> Iterator[Tile]:
+        return iter(self._tiles)
+
+    def _get(self, ns_pos: int, we_pos: int) -> TiledPatch:
+        if we_pos < 0:
+            we_pos += self._west_east_length
+        if not (0 <= ns_pos < self._north_south_length and 0 <= we_pos < self._west_east_length):
+            raise IndexError(f"Coordinates ({ns_pos}, {we_pos}) are outside of the world")
+        size = self._tile_size
+        tile = self._tiles[(ns_pos // size) * self._tiles_per_row + we_pos // size]
+        return tile._patches[(ns_pos % size) * tile._width + we_pos % size]
+
+    def _set(self, ns_pos: int, we_pos: int, value: Patch) -> None:
+        raise TypeError("Patches of a tiled world are created with the world and cannot be replaced")
+
+    def tiles(self) -> List[Tile]:
+        """Returns the tiles of the world in row-major order.
+        """
+        return self._tiles
+
+
+class SparseCounts:
+    """
+    A grid of counters (e.g. kills per patch) that only stores the non-zero counts.
+
+    Indexing works like a nested list of integers (counts[ns_pos][we_pos] += 1). Iterating yields every row as a
+    list, which is only sensible for worlds small enough to be shown in full.
+
+    Parameters
+    ----------
+    - north_south_length: The north-south length of the grid
+    - west_east_length: The west-east length of the grid
+    """
+    __slots__ = [
+        "_north_south_length",
+        "_west_east_length",
+        "_counts"
+    ]
+
+    def __init__(self, north_south_length: int, west_east_length: int):
+        self._north_south_length = north_south_length
+        self._west_east_length = west_east_length
+        self._counts = {} # (ns_pos, we_pos) -> count
+
+    def __len__(self) -> int:
+        return self._north_south_length
+
+    def __getitem__(self, ns_pos: int) -> _GridRow:
+        if ns_pos < 0:
+            ns_pos += self._north_south_length
+        return _GridRow(self, ns_pos)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for ns_pos in range(self._north_south_length):
+            yield [self._counts.get((ns_pos, we_pos), 0) for we_pos in range(self._west_east_length)]
+
+    def _get(self, ns_pos: int, we_pos: int) -> int:
+        if we_pos < 0:
+            we_pos += self._west_east_length
+        return self._counts.get((ns_pos, we_pos), 0)
+
+    def _set(self, ns_pos: int, we_pos: int, value: int) -> None:
+        if we_pos < 0:
+            we_pos += self._west_east_length
+        self._counts[(ns_pos, we_pos)] = value
+
+    def items(self) -> Iterator[tuple]:
+        """Returns the coordinates and counts of every non-zero counter.
+        """
+        return self._counts.items()
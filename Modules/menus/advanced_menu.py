@@ -1,6 +1,7 @@
 import os
 import sys
 import config_menus as cm
+import navigation
 import typing
 
 sys.path.append(os.path.join("..", "..")) # For main menu
@@ -9,7 +10,7 @@ sys.path.append(os.path.join("..", "classes")) # For classes
 import parameters
 import foxes_and_rabbits
 
-def advanced_menu(sim_parameters: parameters.Simulation) -> None:
+def advanced_menu(sim_parameters: parameters.Simulation) -> typing.Optional[navigation.Screen]:
     """Display advanced menu
         This function displays the advanced menu and activates submenus based on user input.
 
@@ -19,7 +20,7 @@ def advanced_menu(sim_parameters: parameters.Simulation) -> None:
 
         Return
         ------------
-        No return value
+        The next menu to show (see the module navigation)
 
         Example
         ------------
@@ -44,22 +45,22 @@ def advanced_menu(sim_parameters: parameters.Simulation) -> None:
     choice = input("Enter selection: ")
     # Configure world
     if choice == "1":
-        cm.configure_world(sim_parameters)        
+        return navigation.goto(cm.configure_world, sim_parameters)
     # Configure rabbits population
     elif choice == "2":
         rabbits = sim_parameters.rabbits
-        cm.configure_species(sim_parameters, rabbits)
+        return navigation.goto(cm.configure_species, sim_parameters, rabbits)
     #configure foxes population
     elif choice == "3":
         foxes = sim_parameters.foxes
-        cm.configure_species(sim_parameters, foxes)
+        return navigation.goto(cm.configure_species, sim_parameters, foxes)
     # configure execution    
     elif choice == "4":
-        cm.configure_execution(sim_parameters)
+        return navigation.goto(cm.configure_execution, sim_parameters)
     #Return to main menu    
     elif choice == "0":
-        foxes_and_rabbits.configuration(sim_parameters)
+        return navigation.goto(foxes_and_rabbits.configuration, sim_parameters)
     #Invalid input
     else:
         print("invalid choice")
-        advanced_menu(sim_parameters)
\ No newline at end of file
+        return navigation.goto(advanced_menu, sim_parameters)
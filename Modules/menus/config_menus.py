@@ -1,14 +1,15 @@
 import advanced_menu as am
+import navigation
 import sys
 import os
-from typing import List
+from typing import List, Optional
 
 sys.path.append(os.path.join("..", "classes"))
 import parameters
 
 
 #---------- Sub-menu: configure world ----------
-def configure_world(sim_parameters: parameters.Simulation) -> None:
+def configure_world(sim_parameters: parameters.Simulation) -> Optional[navigation.Screen]:
     """Configure world parameters. 
     This function displays the menu for configuring the world parameter and changes their values based on user input.
 
@@ -18,7 +19,7 @@ def configure_world(sim_parameters: parameters.Simulation) -> None:
 
     Return 
     -----------
-    No return value
+    The next menu to show (see the module navigation)
 
     Example
     -----------
@@ -44,7 +45,7 @@ def configure_world(sim_parameters: parameters.Simulation) -> None:
     choice = input("Enter parameter: ")
     # set shape
     if choice == "1":
-        select_shape(sim_parameters)           
+        return navigation.goto(select_shape, sim_parameters)
     # set North-South length
     elif choice == "2":
         try:
@@ -55,13 +56,13 @@ def configure_world(sim_parameters: parameters.Simulation) -> None:
                 world_size > sizes_rabbits):
                 world.north_south_length = north_south
                 print("North-South set to " + str(north_south))
-                configure_world(sim_parameters)
+                return navigation.goto(configure_world, sim_parameters)
             else:
                 print("Invalid input. North-South must be a positive integer and larger than population size")
-                configure_world(sim_parameters)
+                return navigation.goto(configure_world, sim_parameters)
         except ValueError:
             print("Invalid input. North-South length must be an integer")
-            configure_world(sim_parameters)             
+            return navigation.goto(configure_world, sim_parameters)
     # set West-East length
     elif choice == "3":
         try:
@@ -72,26 +73,26 @@ def configure_world(sim_parameters: parameters.Simulation) -> None:
                 world_size > sizes_rabbits):
                 world.west_east_length = west_east
                 print("West-East length set to " + str(west_east))
-                configure_world(sim_parameters)
+                return navigation.goto(configure_world, sim_parameters)
             else:
                 print("Invalid input. West-East must be a positive integer and larger than population size")
-                configure_world(sim_parameters)
+                return navigation.goto(configure_world, sim_parameters)
             
             
         except ValueError:
             print("Invalid input. West-East length must be an integer")
-            configure_world(sim_parameters)                  
+            return navigation.goto(configure_world, sim_parameters)
     # Back to top menu
     elif choice == "0":
-        am.advanced_menu(sim_parameters)
+        return navigation.goto(am.advanced_menu, sim_parameters)
     # Invalid input
     else:
         print("Invalid choice...")
-        configure_world(sim_parameters)
+        return navigation.goto(configure_world, sim_parameters)
 
         
 # ------ Sub-sub-menu: select shape ------
-def select_shape(sim_parameters: parameters.Simulation) -> None:
+def select_shape(sim_parameters: parameters.Simulation) -> Optional[navigation.Screen]:
     """Configure shape
     This function displays a menu which lets the user choose the shape of the world (toroid or island).
 
@@ -101,7 +102,7 @@ def select_shape(sim_parameters: parameters.Simulation) -> None:
 
     Return
     -----------
-    No return values.
+    The next menu to show (see the module navigation)
 
     Example
     -----------
@@ -125,23 +126,23 @@ def select_shape(sim_parameters: parameters.Simulation) -> None:
     if choice == "1":
         world.is_toroid = True
         print("World shape set to Toroid")
-        configure_world(sim_parameters)
+        return navigation.goto(configure_world, sim_parameters)
     # Island
     elif choice == "2":
         world.is_toroid = False
         print("World shape set to Island")
-        configure_world(sim_parameters)
+        return navigation.goto(configure_world, sim_parameters)
     # Go back
     elif choice == "0":
-        configure_world(sim_parameters)
+        return navigation.goto(configure_world, sim_parameters)
     # Invalid input
     else:
         print("Invalid choice")
-        select_shape(sim_parameters)
+        return navigation.goto(select_shape, sim_parameters)
 
         
 #---------- Submenu: configure species ----------
-def configure_species(sim_parameters: parameters.Simulation, species: str) -> None:
+def configure_species(sim_parameters: parameters.Simulation, species: str) -> Optional[navigation.Screen]:
     """Configure species
     This function displays a menu, which lets the user configure the parameters of a given population species in the simulation.
 
@@ -152,7 +153,7 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
 
     Return
     ----------
-    No return values.
+    The next menu to show (see the module navigation)
     
     Example
     ----------
@@ -168,6 +169,7 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
         [5] Reproduction probability 
         [6] Reproduction energy 
         [7] Reproduction age 
+        [8] Sensing radius 
         [0] Go back
     Enter parameter:   
     """   
@@ -180,6 +182,7 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
           "\n\t[5] Reproduction probability" +
           "\n\t[6] Reproduction energy" + 
           "\n\t[7] Reproduction age" + 
+          "\n\t[8] Sensing radius" + 
           "\n\t[0] Go back")
     choice = input("Enter parameter: ")
     # Initial size
@@ -191,13 +194,13 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 < initial_size < world_size:
                 species.initial_size = initial_size
                 print("Initial size set to " + str(initial_size))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. The size of a species must be larger than 0 and less than the size of the world")
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Input must be an integer")
-            configure_species(sim_parameters, species)
+            return navigation.goto(configure_species, sim_parameters, species)
     # Metabolism
     elif choice == "2":
         try:
@@ -205,13 +208,13 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 <= metabolism: 
                 species.metabolism = metabolism
                 print("Metabolism set to " + str(metabolism))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. Metabolism must be non-negative")
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Input must be an integer")
-            configure_species(sim_parameters, species)
+            return navigation.goto(configure_species, sim_parameters, species)
     # Max energy
     elif choice == "3":
         try:
@@ -219,13 +222,13 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 < max_energy:
                 species.max_energy = max_energy
                 print("Max energy set to " + str(max_energy))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. Max energy must be a positive integer")
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Max energy must be a positive integer")
-            configure_species(sim_parameters, species)              
+            return navigation.goto(configure_species, sim_parameters, species)
     # Max age
     elif choice == "4":
         try:
@@ -233,13 +236,13 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 < max_age:
                 species.max_age = max_age
                 print("Max age set to " + str(max_age))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. max_age must be a positive integer")
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Input must be a positive integer")
-            configure_species(sim_parameters, species)               
+            return navigation.goto(configure_species, sim_parameters, species)
     # Reproduction probability    
     elif choice == "5":
         try:
@@ -247,13 +250,13 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 <= reproduction_probability <= 1: # Precondition not specified in documentation. But negative probability makes no sense
                 species.reproduction_probability = reproduction_probability
                 print("Reproduction probability set to " + str(reproduction_probability))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. Input must be a non-negative floating point between 0 and 1")
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Input must be a floating point value")
-            configure_species(sim_parameters, species)                
+            return navigation.goto(configure_species, sim_parameters, species)
     # Reproduction minimum energy    
     elif choice == "6":
         try:
@@ -261,13 +264,13 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 <= reproduction_min_energy: # Precondition not specified in documentation. But negative energy makes no sense
                 species.reproduction_min_energy = reproduction_min_energy
                 print("Reproduction probability set to " + str(reproduction_min_energy))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. Input must be a non-negative integer")
-                configure_species(sim_parameters, species)                    
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Input must be an integer")
-            configure_species(sim_parameters, species)            
+            return navigation.goto(configure_species, sim_parameters, species)
     # Reproduction minimum age
     elif choice == "7":
         try:
@@ -275,24 +278,38 @@ def configure_species(sim_parameters: parameters.Simulation, species: str) -> No
             if 0 <= reproduction_min_age:# Precondition not specified in documentation. But negative age makes no sense
                 species.reproduction_min_age = reproduction_min_age
                 print("Reproduction minimum age set to " + str(reproduction_min_age))
-                configure_species(sim_parameters, species)
+                return navigation.goto(configure_species, sim_parameters, species)
             else:
                 print("Invalid input. Input must be a positive integer")
-                configure_species(sim_parameters, species)  
+                return navigation.goto(configure_species, sim_parameters, species)
         except ValueError:
             print("Invalid input. Input must be a positive integer")
-            configure_species(sim_parameters, species)             
+            return navigation.goto(configure_species, sim_parameters, species)
+    # Sensing radius
+    elif choice == "8":
+        try:
+            sensing_radius = int(input("Enter sensing radius (0 for moving at random): "))
+            if 0 <= sensing_radius:
+                species.sensing_radius = sensing_radius
+                print("Sensing radius set to " + str(sensing_radius))
+                return navigation.goto(configure_species, sim_parameters, species)
+            else:
+                print("Invalid input. Input must be a non-negative integer")
+                return navigation.goto(configure_species, sim_parameters, species)
+        except ValueError:
+            print("Invalid input. Input must be an integer")
+            return navigation.goto(configure_species, sim_parameters, species)
     # Back to top menu
     elif choice == "0":
-        am.advanced_menu(sim_parameters)            
+        return navigation.goto(am.advanced_menu, sim_parameters)
     # Invalid input
     else:
         print("Invalid choice...")
-        configure_species(sim_parameters, species)
+        return navigation.goto(configure_species, sim_parameters, species)
 
 
 #---------- Sub-menu: configure execution ----------
-def configure_execution(sim_parameters: parameters.Simulation) -> None:
+def configure_execution(sim_parameters: parameters.Simulation) -> Optional[navigation.Screen]:
     """Configure execution
     This function displays a menu, which lets the user configure the execution parameters.
 
@@ -302,7 +319,7 @@ def configure_execution(sim_parameters: parameters.Simulation) -> None:
 
     Return
     ------------
-    No return value
+    The next menu to show (see the module navigation)
 
     Example
     -----------
@@ -331,13 +348,13 @@ def configure_execution(sim_parameters: parameters.Simulation) -> None:
             if 0 < max_steps: # Precondition not specified in documentation, however it seems absurd to accept negative values and 0
                 execution.max_steps = max_steps
                 print("Max steps set to " + str(max_steps))
-                configure_execution(sim_parameters)
+                return navigation.goto(configure_execution, sim_parameters)
             else:
                 print("Invalid input. Max steps must be a positive integer")
-                configure_execution(sim_parameters)
+                return navigation.goto(configure_execution, sim_parameters)
         except ValueError:
             print("Invalid input. Max steps must be a positive integer")
-            configure_execution(sim_parameters)
+            return navigation.goto(configure_execution, sim_parameters)
     # set step delay
     elif choice == "2":
         try:
@@ -345,27 +362,27 @@ def configure_execution(sim_parameters: parameters.Simulation) -> None:
             if 0 <= step_delay: # Precondition is not specified in documentation, however it seems absurd to accept negative values
                 execution.step_delay = float(step_delay)
                 print("Step delay set to " + str(step_delay))
-                configure_execution(sim_parameters)
+                return navigation.goto(configure_execution, sim_parameters)
             else:
                 print("Invalid input Step delay must be a positive float or integer")
-                configure_execution(sim_parameters)                    
+                return navigation.goto(configure_execution, sim_parameters)
         except ValueError:
             print("Invalid input. Step delay must be a positive float or integer")
-            configure_execution(sim_parameters)
+            return navigation.goto(configure_execution, sim_parameters)
     # set mode 
     elif choice == "3":
-        select_mode(sim_parameters)
+        return navigation.goto(select_mode, sim_parameters)
     # Back to top menu
     elif choice == "0":
-        am.advanced_menu(sim_parameters)
+        return navigation.goto(am.advanced_menu, sim_parameters)
     # Invalid input
     else:
         print("Invalid choice ...")
-        configure_execution(sim_parameters)
+        return navigation.goto(configure_execution, sim_parameters)
 
         
 #----- Sub-sub-menu: select mode ------
-def select_mode(sim_parameters: parameters.Simulation) -> None:
+def select_mode(sim_parameters: parameters.Simulation) -> Optional[navigation.Screen]:
     """Configure simulation mode
     This function displays a menu, which lets the user select how the simulation is executed (batch or visual).
 
@@ -375,7 +392,7 @@ def select_mode(sim_parameters: parameters.Simulation) -> None:
 
     Return
     -----------
-    No return value.
+    The next menu to show (see the module navigation)
     
     Example
     -----------
@@ -399,16 +416,16 @@ def select_mode(sim_parameters: parameters.Simulation) -> None:
     if modality_choice == "1":
         execution.batch = True
         print("Mode set to batch")
-        configure_execution(sim_parameters)          
+        return navigation.goto(configure_execution, sim_parameters)
     # Visual
     elif modality_choice == "2":
         execution.batch = False
         print("Mode set to visual")
-        configure_execution(sim_parameters)
+        return navigation.goto(configure_execution, sim_parameters)
     # Go back
     elif modality_choice == "0":
-        configure_execution(sim_parameters)
+        return navigation.goto(configure_execution, sim_parameters)
     # Invalid input
     else:
         print("invalid input")
-        select_mode(sim_parameters)
\ No newline at end of file
+        return navigation.goto(select_mode, sim_parameters)
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Moving between the menus of the application, and recording and replaying the answers typed into them.
+
+A menu (a screen) is a function that shows its options, handles one choice and returns the next screen to show, made
+with goto, or None to exit. The screens are shown one after the other by run, in a loop, so however long a session is,
+the call stack does not grow.
+
+The answers to every prompt of a session (menus, simulation and reporting) can be recorded to a text file and replayed
+later, to set up and run the same simulations again without typing. A script holds one answer per line; lines
+starting with "#" are comments, and the recorder writes the prompt of every answer as a comment above it.
+A script replays the same session only if the run cache (see runcache) holds the same runs as when it was recorded:
+reopening an earlier run picks it by its number in the cache. Running is safe either way, as only batch runs are
+cached and they ask the same questions whether they are found in the cache or not.
+"""
+import builtins
+import contextlib
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+Screen = Tuple[Callable[..., Optional["Screen"]], Tuple[Any, ...]]
+
+
+def goto(screen: Callable[..., Optional[Screen]], *args: Any) -> Screen:
+    """Returns the screen to show next, with the arguments to show it with.
+
+    Example
+    -------
+    >>> return goto(configure_world, sim_parameters)
+    """
+    return screen, args
+
+
+def run(screen: Callable[..., Optional[Screen]], *args: Any) -> None:
+    """Shows a screen and every screen it leads to, until one of them returns None.
+    Input ending (e.g. at the end of a replayed script read from a pipe) also ends the session.
+    """
+    current = goto(screen, *args)
+    try:
+        while current is not None:
+            screen, args = current
+            current = screen(*args)
+    except EOFError:
+        print('\nNo more input, exiting..')
+
+
+@contextlib.contextmanager
+def recording(path: str) -> Iterator[None]:
+    """Appends every answer typed while in the context to a script, with its prompt as a comment above it.
+    """
+    typed = builtins.input
+    with open(path, 'a') as script:
+        def _input(prompt: str = '') -> str:
+            answer = typed(prompt)
+            comment = ' '.join(str(prompt).split())
+            script.write((f'# {comment}\n' if comment else '') + answer + '\n')
+            script.flush() # The script is kept if the session is interrupted
+            return answer
+        builtins.input = _input
+        try:
+            yield
+        finally:
+            builtins.input = typed
+
+
+@contextlib.contextmanager
+def replaying(path: str) -> Iterator[None]:
+    """Answers the prompts shown while in the context from a script, showing every answer after its prompt.
+    Once the script runs out, the answers are typed again.
+    """
+    typed = builtins.input
+    with open(path) as script:
+        answers = [line.rstrip('\n') for line in script if not line.startswith('#')]
+    answers.reverse()
+
+    def _input(prompt: str = '') -> str:
+        if not answers:
+            return typed(prompt)
+        answer = answers.pop()
+        print(f'{prompt}{answer}')
+        return answer
+    builtins.input = _input
+    try:
+        yield
+    finally:
+        builtins.input = typed
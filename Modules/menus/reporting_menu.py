@@ -2,10 +2,11 @@ import os, sys
 
 sys.path.append(os.path.join("..", "..")) # For main menu
 sys.path.append(os.path.join("..", "classes")) # For classes
-import foxes_and_rabbits, reporting, parameters,results
+import foxes_and_rabbits, reporting, parameters,results, export
+import navigation
 import typing
 
-def reporting_menu(params: parameters.Simulation, sim_results: results.SimulationStats) -> None:
+def reporting_menu(params: parameters.Simulation, sim_results: results.SimulationStats) -> typing.Optional[navigation.Screen]:
     """reporting_menu.
 This function displays the menu for reporting and summarizes results from the simulation.
 The module reporting is a mock implementation.
@@ -15,7 +16,7 @@ sim_results: The return values from the function "run" in the module "simulation
 params: An instance of the class "Simulation" from the module "parameters"
 Return
 --------------
-No return values
+The next menu to show (see the module navigation)
 Menu
 --------------
 Pick an option from above:
@@ -29,6 +30,8 @@ Pick an option from above:
     plots the total energy over the life of each individual
 [5] plot kills distribution
     shows the distribution of kills
+[6] save results
+    saves the results to a directory, to be opened later (see the module export)
 [0] Quit
     takes the user back to reporting_menu"""
     
@@ -38,29 +41,36 @@ Pick an option from above:
 [3] Plot lifespan
 [4] plot energy
 [5] plot kills distribution
+[6] Save results
 [0] Quit""")
     
     choice = input("Pick an option from above [?]\n")
     if choice == "1":
         reporting.print_summary(sim_results)
-        reporting_menu(params, sim_results)
+        return navigation.goto(reporting_menu, params, sim_results)
     elif choice == "2":
         reporting.plot_pop_size(sim_results)
-        reporting_menu(params, sim_results)
+        return navigation.goto(reporting_menu, params, sim_results)
     elif choice == "3":
         reporting.plot_lifespan(sim_results)
-        reporting_menu(params, sim_results)
+        return navigation.goto(reporting_menu, params, sim_results)
     elif choice == "4":
         reporting.plot_energy(sim_results)
-        reporting_menu(params, sim_results)
+        return navigation.goto(reporting_menu, params, sim_results)
     elif choice == "5":
         reporting.plot_kills(sim_results)
-        reporting_menu(params, sim_results)
+        return navigation.goto(reporting_menu, params, sim_results)
     elif choice == "6":
-        print(quit)
+        directory = input("Enter a directory to save the results to\n")
+        try:
+            export.save(sim_results, directory)
+            print(f"Results saved to {directory}")
+        except OSError as error:
+            print(f"Could not save the results: {error}")
+        return navigation.goto(reporting_menu, params, sim_results)
     elif choice == "0":
         print('Going back')
-        foxes_and_rabbits.configuration(params)
+        return navigation.goto(foxes_and_rabbits.configuration, params)
     else:
         print("input not valid")
-        reporting_menu(params, sim_results)
\ No newline at end of file
+        return navigation.goto(reporting_menu, params, sim_results)
\ No newline at end of file
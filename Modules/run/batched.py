@@ -0,0 +1,420 @@
+"""
+Many small worlds simulated side by side, for ensembles of replicate runs.
+
+The worlds of a batch are stacked along a leading axis and every phase of a step (grass, ageing, feeding, hunting,
+reproducing, moving) is applied to all of them with the same array operations, instead of visiting patches and
+animals one at a time. A patch holds at most one fox and one rabbit, stored as the age and energy of each species on
+every patch. Every world draws from its own random number generator, so a world runs the same no matter which other
+worlds are in the batch.
+
+The animals of a phase act at the same time: when several animals pick the same patch to move or give birth to,
+one of them is picked at random and the others pick again among the patches still free, for a few rounds. The rabbits act before the foxes, and a fox only
+catches a rabbit that was on its patch before the fox came and did not leave, as in simulation.update_entities where
+the animal that came first to a patch acts first and Patch.has_alive_rabbit only looks at the first animal.
+"""
+import os
+import random
+import sys
+from typing import Optional
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, results as res, entities as ents
+import neighbours, simulation, stopping
+
+_EMPTY = -1 # Age on patches without an animal of the species
+_ROUNDS = 4 # Rounds of picking patches in a phase, for the animals that lost a patch to another animal
+_NEWBORN_ENERGY = {ents.FOX: 0.70, ents.RABBIT: 0.25} # Share of the maximum energy, as in the Fox and Rabbit classes
+
+
+def _neighbour_grids(grid: np.ndarray, offsets: list[tuple[int, int]], is_toroid: bool, fill) -> np.ndarray:
+    """Returns for every offset a grid holding the value of the neighbour at that offset, for every patch of every world.
+    On island worlds the neighbours beyond the border hold the fill value.
+    """
+    grids = []
+    for ns_offset, we_offset in offsets:
+        shifted = np.roll(grid, (-ns_offset, -we_offset), axis = (1, 2))
+        if not is_toroid:
+            if ns_offset:
+                shifted[:, -1 if ns_offset > 0 else 0, :] = fill
+            if we_offset:
+                shifted[:, :, -1 if we_offset > 0 else 0] = fill
+        grids.append(shifted)
+    return np.stack(grids)
+
+
+def _first_per_target(targets: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Picks a single winner among sources with the same target: the one with the highest key.
+
+    Return
+    ------
+    A boolean array telling for every source whether it won its target
+    """
+    order = np.lexsort((keys, targets))
+    ordered = targets[order]
+    last = np.ones(len(order), dtype = bool)
+    last[:-1] = ordered[1:] != ordered[:-1]
+    won = np.zeros(len(order), dtype = bool)
+    won[order[last]] = True
+    return won
+
+
+class _Herd:
+    """
+    The animals of a population in every world of a batch, as the age and energy on every patch.
+    """
+    __slots__ = [
+        "population",
+        "code",
+        "age",
+        "energy",
+        "arrival"
+    ]
+
+    def __init__(self, population: parameters.Population, code: int, shape: tuple[int, int, int]):
+        self.population = population
+        self.code = code
+        self.age = np.full(shape, _EMPTY, dtype = np.int32)
+        self.energy = np.zeros(shape)
+        self.arrival = np.zeros(shape, dtype = np.int64) # When the animal came to its patch (see WorldBatch.step)
+
+    def present(self) -> np.ndarray:
+        """Returns a mask of the patches holding an animal of the population.
+        """
+        return self.age != _EMPTY
+
+    def newborn_energy(self) -> int:
+        """Returns the energy an animal of the population starts with.
+        """
+        return int(self.population.max_energy * _NEWBORN_ENERGY[self.code])
+
+    def remove(self, mask: np.ndarray) -> None:
+        self.age[mask] = _EMPTY
+        self.energy[mask] = 0
+
+
+class _StepStats:
+    """
+    The deaths, births and energy of a population in every world during one step.
+    """
+    __slots__ = [
+        "visited",
+        "old_age",
+        "starvation",
+        "predation",
+        "births",
+        "dead_energy",
+        "ages"
+    ]
+
+    def __init__(self, visited: np.ndarray):
+        worlds = len(visited)
+        self.visited = visited # Animals present at the start of the step, per world
+        self.old_age = np.zeros(worlds, dtype = np.int64)
+        self.starvation = np.zeros(worlds, dtype = np.int64)
+        self.predation = np.zeros(worlds, dtype = np.int64)
+        self.births = np.zeros(worlds, dtype = np.int64)
+        self.dead_energy = np.zeros(worlds) # Energy of the animals that died, at their death
+        self.ages = [[] for _ in range(worlds)] # Ages at death, per world
+
+    def record_deaths(self, herd: _Herd, mask: np.ndarray, cause: np.ndarray) -> None:
+        """Records the death of the animals on the masked patches, adding their number to the given counts.
+        """
+        cause += mask.sum(axis = (1, 2))
+        self.dead_energy += np.where(mask, herd.energy, 0).sum(axis = (1, 2))
+        for world in np.flatnonzero(mask.any(axis = (1, 2))):
+            self.ages[world].extend(herd.age[world][mask[world]].tolist())
+
+
+class WorldBatch:
+    """
+    A batch of independent worlds with the same parameters, stepped together.
+
+    Parameters
+    ----------
+    - params: An instance of the class "Simulation" from the module "parameters"
+    - rngs: One generator per world, for the random draws of that world
+    - movement: Movement that defines neighbours (see simulation.update_entities)
+    """
+    __slots__ = [
+        "_params",
+        "_rngs",
+        "_movement",
+        "_grass",
+        "_kills",
+        "_clock",
+        "foxes",
+        "rabbits"
+    ]
+
+    def __init__(self, params: parameters.Simulation, rngs: list[np.random.Generator], movement: str):
+        nsl = params.world.north_south_length
+        wel = params.world.west_east_length
+        shape = (len(rngs), nsl, wel)
+        self._params = params
+        self._rngs = rngs
+        self._movement = movement
+        self._grass = np.stack([rng.integers(0, ents.Patch.max_grass_amount + 1, size = (nsl, wel)) for rng in rngs])
+        self._kills = np.zeros(shape, dtype = np.int64)
+        self._clock = 0
+        self.foxes = _Herd(params.foxes, ents.FOX, shape)
+        self.rabbits = _Herd(params.rabbits, ents.RABBIT, shape)
+        # Animals on random patches with random ages, as in simulation.populate_world
+        for herd in (self.foxes, self.rabbits):
+            population = herd.population
+            for world, rng in enumerate(rngs):
+                fields = rng.choice(nsl * wel, size = population.initial_size, replace = False)
+                ages = rng.integers(0, population.max_age + 1, size = population.initial_size)
+                herd.age[world].flat[fields] = ages
+                herd.energy[world].flat[fields] = herd.newborn_energy()
+            herd.arrival[:] = self._stamp(herd)
+
+    def kills(self) -> np.ndarray:
+        """Returns the number of rabbits killed on every patch of every world so far.
+        """
+        return self._kills
+
+    def _uniform(self) -> np.ndarray:
+        """Draws a number in [0, 1) for every patch of every world, each world from its own generator.
+        """
+        return np.stack([rng.random(self._grass.shape[1:]) for rng in self._rngs])
+
+    def _stamp(self, herd: _Herd) -> int:
+        """Returns the time at which animals of the herd coming to a patch in the current step arrive. The rabbits act
+        before the foxes in a step, so they arrive earlier.
+        """
+        return 2 * self._clock + (0 if herd.code == ents.RABBIT else 1)
+
+    def step(self) -> tuple[_StepStats, _StepStats]:
+        """Runs a step of the simulation in every world.
+
+        Return
+        ------
+        The statistics of the step for the foxes and the rabbits
+        """
+        self._clock += 1
+        foxes = self.foxes
+        rabbits = self.rabbits
+        f_stats = _StepStats(foxes.present().sum(axis = (1, 2)))
+        r_stats = _StepStats(rabbits.present().sum(axis = (1, 2)))
+
+        # Grass grows on every patch not above the maximum (see entities.Patch.tick)
+        growth = np.stack([rng.integers(ents.Patch.min_grass_growth, ents.Patch.max_grass_growth + 1,
+                                        size = self._grass.shape[1:]) for rng in self._rngs])
+        self._grass = np.where(self._grass <= ents.Patch.max_grass_amount, self._grass + growth, self._grass)
+
+        for herd, stats in ((foxes, f_stats), (rabbits, r_stats)):
+            self._tick(herd, stats)
+        self._graze()
+        self._move(rabbits, self._reproduce(rabbits, r_stats))
+        self._hunt(r_stats)
+        self._move(foxes, self._reproduce(foxes, f_stats))
+        return f_stats, r_stats
+
+    def _tick(self, herd: _Herd, stats: _StepStats) -> None:
+        """Ages the animals and consumes their energy. Animals too old or without energy die (see entities.Animal.tick).
+        """
+        present = herd.present()
+        herd.age[present] += 1
+        herd.energy[present] -= herd.population.metabolism
+        old = present & (herd.age >= herd.population.max_age)
+        starved = present & ~old & (herd.energy <= 0)
+        stats.record_deaths(herd, old, stats.old_age)
+        stats.record_deaths(herd, starved, stats.starvation)
+        herd.remove(old | starved)
+
+    def _graze(self) -> None:
+        """Feeds the rabbits with the grass of their patch (see entities.Rabbit.feed).
+        """
+        rabbits = self.rabbits
+        population = rabbits.population
+        eaten = np.minimum(ents.Rabbit.feeding_metabolism_rate * population.metabolism, self._grass)
+        eaten = np.minimum(eaten, population.max_energy - rabbits.energy)
+        eaten = np.where(rabbits.present(), eaten, 0)
+        rabbits.energy += eaten
+        self._grass = self._grass - eaten
+
+    def _hunt(self, r_stats: _StepStats) -> None:
+        """Lets every fox with room for food eat the rabbit on its patch, if the rabbit was there before the fox
+        (see entities.Fox.feed).
+        """
+        foxes = self.foxes
+        rabbits = self.rabbits
+        max_energy = foxes.population.max_energy
+        eating = (foxes.present() & (foxes.energy < max_energy) & rabbits.present()
+                  & (rabbits.arrival < foxes.arrival))
+        r_stats.record_deaths(rabbits, eating, r_stats.predation)
+        rabbits.remove(eating)
+        foxes.energy[eating] = np.minimum(foxes.energy[eating] + ents.Fox.food_energy_per_unit, max_energy)
+        self._kills += eating
+
+    def _pick(self,
+              free: np.ndarray,
+              wanting: np.ndarray,
+              offsets: list[tuple[int, int]]) -> tuple[tuple[np.ndarray, ...], tuple[np.ndarray, ...]]:
+        """Picks one of the free neighbours at random for the animals on the wanting patches.
+        On island worlds the patches beyond the border are never picked.
+
+        Parameters
+        ----------
+        free: A mask of the patches that can be picked, for every world
+        wanting: A mask of the patches of the animals picking a neighbour
+        offsets: The offsets (north-south, west-east) of the neighbours
+
+        Return
+        ------
+        The coordinates (world, north-south, west-east) of the wanting patches with any free neighbour, and the
+        coordinates of the picked neighbours
+        """
+        draw = self._uniform()
+        nsl, wel = free.shape[1:]
+        worlds, ns_pos, we_pos = np.nonzero(wanting)
+        ns_offsets, we_offsets = np.array(offsets).T
+        ns_near = ns_pos + ns_offsets[:, None]
+        we_near = we_pos + we_offsets[:, None]
+        candidates = free[worlds, ns_near % nsl, we_near % wel]
+        if not self._params.world.is_toroid:
+            candidates &= (ns_near >= 0) & (ns_near < nsl) & (we_near >= 0) & (we_near < wel)
+        count = candidates.sum(axis = 0)
+        picked = (np.cumsum(candidates, axis = 0) > np.floor(draw[worlds, ns_pos, we_pos] * count)).argmax(axis = 0)
+        found = np.flatnonzero(count > 0)
+        picked = picked[found]
+        sources = (worlds[found], ns_pos[found], we_pos[found])
+        targets = (worlds[found], ns_near[picked, found] % nsl, we_near[picked, found] % wel)
+        return sources, targets
+
+    def _claim(self, sources: tuple[np.ndarray, ...], targets: tuple[np.ndarray, ...]) -> np.ndarray:
+        """Returns a mask of the sources that get their target, one at random among the sources sharing a target.
+        """
+        keys = self._uniform()[sources]
+        return _first_per_target(np.ravel_multi_index(targets, self._grass.shape), keys)
+
+    def _reproduce(self, herd: _Herd, stats: _StepStats) -> np.ndarray:
+        """Lets the animals reproduce (see simulation.reproduce_animal): an animal that can reproduce needs a mate on a
+        neighbouring patch without predators, and an empty neighbouring patch for the newborn.
+
+        Return
+        ------
+        A mask of the patches of the parents
+        """
+        population = herd.population
+        is_toroid = self._params.world.is_toroid
+        offsets = neighbours.movement_offsets("q")
+        present = herd.present()
+        foxes = self.foxes.present()
+        mates = present if herd.code == ents.FOX else present & ~foxes
+        has_mate = _neighbour_grids(mates, offsets, is_toroid, False).any(axis = 0)
+        willing = (present & has_mate
+                   & (herd.age >= population.reproduction_min_age)
+                   & (herd.energy >= population.reproduction_min_energy)
+                   & (self._uniform() <= population.reproduction_probability))
+        parents = np.zeros(present.shape, dtype = bool)
+        newborns = np.zeros(present.shape, dtype = bool)
+        for _ in range(_ROUNDS):
+            sources, targets = self._pick(~foxes & ~self.rabbits.present(), willing, offsets)
+            if not len(sources[0]):
+                break
+            won = self._claim(sources, targets)
+            sources = tuple(axis[won] for axis in sources)
+            targets = tuple(axis[won] for axis in targets)
+            herd.age[targets] = 0
+            herd.energy[targets] = herd.newborn_energy()
+            herd.arrival[targets] = self._stamp(herd)
+            parents[sources] = True
+            newborns[targets] = True
+            willing[sources] = False
+
+        herd.energy[parents] -= population.reproduction_min_energy * _cost_rate(herd.code)
+        stats.births += newborns.sum(axis = (1, 2))
+        starved = parents & (herd.energy <= 0)
+        stats.record_deaths(herd, starved, stats.starvation)
+        herd.remove(starved)
+        return parents | newborns
+
+    def _move(self, herd: _Herd, resting: np.ndarray) -> None:
+        """Moves the animals that did not reproduce to a random neighbouring patch without an animal of their species
+        (see simulation.move_animal).
+        """
+        offsets = neighbours.movement_offsets(self._movement)
+        movers = herd.present() & ~resting
+        for _ in range(_ROUNDS):
+            sources, targets = self._pick(~herd.present(), movers, offsets)
+            if not len(sources[0]):
+                break
+            won = self._claim(sources, targets)
+            sources = tuple(axis[won] for axis in sources)
+            targets = tuple(axis[won] for axis in targets)
+            ages = herd.age[sources]
+            energies = herd.energy[sources]
+            herd.remove(sources)
+            herd.age[targets] = ages
+            herd.energy[targets] = energies
+            herd.arrival[targets] = self._stamp(herd)
+            movers[sources] = False
+
+
+def _cost_rate(code: int) -> float:
+    """Returns the reproduction cost rate of a species (see entities.Fox.reproduction_cost_rate).
+    """
+    return ents.Fox.reproduction_cost_rate if code == ents.FOX else ents.Rabbit.reproduction_cost_rate
+
+
+def run(params: parameters.Simulation,
+        worlds: int,
+        movement: str = "q",
+        seed: Optional[int] = None) -> list[res.SimulationStats]:
+    """Runs the simulation in a batch of independent worlds (see WorldBatch) and collects statistics for each world,
+    without a visualiser. A world stops when it has no animals left, as in simulation.run, while the others go on.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    worlds: The number of worlds in the batch
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    seed: Seed for the random number generators. A different batch every time if not given.
+
+    Return
+    ----------
+    A list with an instance of the class "SimulationStats" from the module "results" for every world, with the number
+    of steps the world ran and the reason it stopped
+    """
+    if seed is not None:
+        random.seed(seed)
+    streams = np.random.SeedSequence(random.getrandbits(64)).spawn(worlds)
+    batch = WorldBatch(params, [np.random.default_rng(stream) for stream in streams], movement)
+    all_stats = [simulation.create_stats(params) for _ in range(worlds)]
+
+    active = np.ones(worlds, dtype = bool)
+    step = 0
+    while active.any() and step <= params.execution.max_steps:
+        f_step, r_step = batch.step()
+        for herd, step_stats, species in ((batch.foxes, f_step, "foxes"), (batch.rabbits, r_step, "rabbits")):
+            # Animals alive at the end of the step, without the newborns (as in simulation.update_entities)
+            present = herd.present()
+            newborns = present & (herd.age == 0)
+            survivors = (present & ~newborns).sum(axis = (1, 2))
+            energy = np.where(present & ~newborns, herd.energy, 0).sum(axis = (1, 2)) + step_stats.dead_energy
+            for world in np.flatnonzero(active):
+                pop_stats = getattr(all_stats[world], species)
+                pop_stats.total += int(step_stats.births[world])
+                pop_stats.dead_by_old_age += int(step_stats.old_age[world])
+                pop_stats.dead_by_starvation += int(step_stats.starvation[world])
+                pop_stats.dead_by_predation += int(step_stats.predation[world])
+                pop_stats.age_at_death.extend(step_stats.ages[world])
+                pop_stats.size_per_step.append(int(survivors[world]))
+                visited = step_stats.visited[world]
+                pop_stats.avg_energy_per_step.append(float(energy[world]) / visited if visited > 0 else 0)
+        # A world stops after a step that started without animals and had no births
+        active &= (f_step.visited + r_step.visited + f_step.births + r_step.births) > 0
+        step += 1
+
+    kills = batch.kills()
+    for world, sim_stats in enumerate(all_stats):
+        sim_stats.kills_per_patch = kills[world].tolist()
+        sim_stats.steps = len(sim_stats.rabbits.size_per_step)
+        sim_stats.stop_reason = stopping.MAX_STEPS if active[world] else stopping.EXTINCTION
+        r_energy = sim_stats.rabbits.avg_energy_per_step
+        f_energy = sim_stats.foxes.avg_energy_per_step
+        sim_stats.avg_energy_per_step = [f_energy[i] + r_energy[i] for i in range(len(r_energy))]
+    return all_stats
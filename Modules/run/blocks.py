@@ -0,0 +1,427 @@
+"""
+A coarse-grained run of the simulation, following the populations block by block instead of animal by animal.
+
+The world is split into blocks of k x k patches. A block holds the number of foxes and rabbits of every age and energy
+level on it, and its total amount of grass. Every step the animals of a block age, graze, hunt, reproduce and migrate
+to the neighbouring blocks in numbers drawn from these counts, following the rules of the entities module on average:
+the animals of a block are taken to be spread evenly over its patches. The cost of a step grows with the number of
+blocks, not with the number of animals.
+"""
+import math
+import os
+import random
+import sys
+from typing import Optional
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, results as res, entities as ents
+import neighbours, simulation, stopping
+
+_MAX_ENERGY_LEVELS = 16 # Energy levels kept per population; wider levels than the metabolism above this
+_NEWBORN_ENERGY = {ents.FOX: 0.70, ents.RABBIT: 0.25} # Share of the maximum energy, as in the Fox and Rabbit classes
+
+
+def _thin(rng: np.random.Generator, counts: np.ndarray, probability) -> np.ndarray:
+    """Picks every animal with the given probability, broadcastable against the counts.
+    Only the non-empty cells of the counts are drawn for.
+
+    Return
+    ------
+    The counts of the picked animals
+    """
+    picked = np.zeros_like(counts)
+    cells = np.nonzero(counts)
+    picked[cells] = rng.binomial(counts[cells], np.broadcast_to(probability, counts.shape)[cells])
+    return picked
+
+
+def _block_sums(grid: np.ndarray, block_size: int) -> np.ndarray:
+    """Sums a grid with the dimensions of the world over blocks of block_size x block_size patches.
+    Blocks on the south and east borders are smaller if the lengths of the world are not multiples of the block size.
+    """
+    grid = np.add.reduceat(grid, np.arange(0, grid.shape[0], block_size), axis = 0)
+    return np.add.reduceat(grid, np.arange(0, grid.shape[1], block_size), axis = 1)
+
+
+class _Species:
+    """
+    The animals of a population, as counts per age, energy level and block (in that order of the axes).
+    Level l holds the animals with (l + 1) times the level width of energy, capped at the maximum energy.
+    """
+    __slots__ = [
+        "population",
+        "code",
+        "counts",
+        "width",
+        "energies"
+    ]
+
+    def __init__(self, population: parameters.Population, code: int, blocks_shape: tuple[int, int]):
+        self.population = population
+        self.code = code
+        self.width = max(population.metabolism, population.max_energy / _MAX_ENERGY_LEVELS)
+        levels = math.ceil(population.max_energy / self.width)
+        self.energies = np.minimum(np.arange(1, levels + 1) * self.width, population.max_energy)
+        shape = (population.max_age + 1, levels) + blocks_shape
+        self.counts = np.zeros(shape, dtype = np.int64)
+
+    def level(self, energy: float) -> float:
+        """Returns the (fractional) energy level of the given energy.
+        """
+        return energy / self.width - 1
+
+    def sizes(self) -> np.ndarray:
+        """Returns the number of animals on every block.
+        """
+        return self.counts.sum(axis = (0, 1))
+
+    def shift(self, rng: np.random.Generator, counts: np.ndarray, delta) -> tuple[np.ndarray, np.ndarray]:
+        """Moves animals up or down by the given number of energy levels.
+        Fractional shifts send each animal to one of the two nearest levels at random, keeping the expected energy.
+        Animals above the highest level stay at the maximum energy.
+
+        Parameters
+        ----------
+        rng: The generator for the random draws
+        counts: Counts of animals per age, energy level and block
+        delta: The shift in energy levels, broadcastable against the levels and blocks (e.g. one value per level)
+
+        Return
+        ------
+        The shifted counts, and the number of animals per age and block whose energy ran out
+        """
+        ages, levels, ns_pos, we_pos = cells = np.nonzero(counts)
+        animals = counts[cells]
+        target = levels + np.broadcast_to(delta, counts.shape[1:])[cells[1:]]
+        low = np.floor(target)
+        up = rng.binomial(animals, target - low)
+        low = low.astype(np.int64)
+        shifted = np.zeros_like(counts)
+        starved = np.zeros((counts.shape[0],) + counts.shape[2:], dtype = np.int64)
+        for part, level in ((animals - up, low), (up, low + 1)):
+            dead = level < 0
+            np.add.at(starved, (ages[dead], ns_pos[dead], we_pos[dead]), part[dead])
+            alive = ~dead
+            np.add.at(shifted,
+                      (ages[alive], np.minimum(level[alive], counts.shape[1] - 1), ns_pos[alive], we_pos[alive]),
+                      part[alive])
+        return shifted, starved
+
+    def add(self, rng: np.random.Generator, counts: np.ndarray) -> None:
+        """Adds animals with the starting energy of the species (see entities.Fox and entities.Rabbit).
+
+        Parameters
+        ----------
+        rng: The generator for the random draws
+        counts: Counts of the animals to add per age and block, starting from age zero
+        """
+        level = self.level(int(self.population.max_energy * _NEWBORN_ENERGY[self.code]))
+        low = max(0, math.floor(level))
+        up = rng.binomial(counts, level - low) if level > low else np.zeros_like(counts)
+        ages = len(counts)
+        self.counts[:ages, low] += counts - up
+        self.counts[:ages, min(low + 1, self.counts.shape[1] - 1)] += up
+
+
+class BlockWorld:
+    """
+    The state of a coarse-grained run: the animals and grass of every block of the world.
+
+    Parameters
+    ----------
+    - params: An instance of the class "Simulation" from the module "parameters"
+    - block_size: The side length of a block in patches
+    - movement: Movement that defines neighbours (see simulation.update_entities)
+    - rng: The generator for the random draws
+    """
+    __slots__ = [
+        "_params",
+        "_block_size",
+        "_movement",
+        "_rng",
+        "_patches",
+        "_grass",
+        "_resting_rabbits",
+        "foxes",
+        "rabbits"
+    ]
+
+    def __init__(self, params: parameters.Simulation, block_size: int, movement: str, rng: np.random.Generator):
+        nsl = params.world.north_south_length
+        wel = params.world.west_east_length
+        self._params = params
+        self._block_size = block_size
+        self._movement = movement
+        self._rng = rng
+        self._patches = _block_sums(np.ones((nsl, wel)), block_size)
+        grass = rng.integers(0, ents.Patch.max_grass_amount + 1, size = (nsl, wel))
+        self._grass = _block_sums(grass, block_size).astype(float)
+        self.foxes = _Species(params.foxes, ents.FOX, self._patches.shape)
+        self.rabbits = _Species(params.rabbits, ents.RABBIT, self._patches.shape)
+        for species in (self.foxes, self.rabbits):
+            # Animals on random patches with random ages, as in simulation.populate_world
+            population = species.population
+            shares = (self._patches / self._patches.sum()).ravel()
+            sizes = rng.multinomial(population.initial_size, shares).reshape(self._patches.shape)
+            ages = rng.multinomial(sizes, np.full(population.max_age + 1, 1 / (population.max_age + 1)))
+            species.add(rng, np.moveaxis(ages, -1, 0))
+        self._resting_rabbits = self.rabbits.sizes() # Rabbits that did not move in the last step, on every block
+
+    def patches(self) -> np.ndarray:
+        """Returns the number of patches of every block.
+        """
+        return self._patches
+
+    def _density(self, species: _Species) -> np.ndarray:
+        """Returns the share of the patches of every block holding an animal of the species.
+        """
+        return np.minimum(1, species.sizes() / self._patches)
+
+    def step(self, sim_stats: res.SimulationStats) -> bool:
+        """Runs a step of the simulation and appends its statistics.
+
+        Return
+        ------
+        False if both populations have died out, True otherwise
+        """
+        rng = self._rng
+        deaths = {species.code: {"old_age": 0, "starvation": 0, "predation": 0, "ages": []}
+                  for species in (self.foxes, self.rabbits)}
+        births = {}
+
+        # Grass grows by the mean growth on every patch, up to the maximum on every patch
+        mean_growth = (ents.Patch.min_grass_growth + ents.Patch.max_grass_growth) / 2
+        self._grass = np.minimum(self._grass + mean_growth * self._patches, ents.Patch.max_grass_amount * self._patches)
+
+        for species in (self.foxes, self.rabbits):
+            self._tick(species, deaths[species.code])
+        self._graze()
+        kills = self._hunt(deaths[ents.RABBIT])
+        parents = {}
+        for species in (self.foxes, self.rabbits):
+            parents[species.code], births[species.code] = self._pick_parents(species)
+        for species in (self.foxes, self.rabbits):
+            moving = self._migrate(species)
+            if species.code == ents.RABBIT:
+                # Parents stay on their patch, as do the other rabbits without a free patch to move to
+                self._resting_rabbits = (1 - moving) * species.sizes() + births[species.code]
+            shifted, starved = species.shift(rng, parents[species.code],
+                                             -species.population.reproduction_min_energy
+                                             * _cost_rate(species.code) / species.width)
+            species.counts += shifted
+            self._record_starvation(starved, deaths[species.code])
+            species.add(rng, births[species.code][None])
+
+        # Statistics
+        sim_stats.kills_per_patch += kills # Kills per block while running (see run)
+        for species, pop_stats in ((self.rabbits, sim_stats.rabbits), (self.foxes, sim_stats.foxes)):
+            counts = deaths[species.code]
+            pop_stats.total += int(births[species.code].sum())
+            pop_stats.dead_by_old_age += counts["old_age"]
+            pop_stats.dead_by_starvation += counts["starvation"]
+            pop_stats.dead_by_predation += counts["predation"]
+            pop_stats.age_at_death.extend(counts["ages"])
+            per_level = species.counts.sum(axis = (0, 2, 3))
+            size = int(per_level.sum())
+            pop_stats.size_per_step.append(size)
+            pop_stats.avg_energy_per_step.append(float(per_level @ species.energies) / size if size > 0 else 0)
+        return bool(self.foxes.counts.any() or self.rabbits.counts.any())
+
+    def _tick(self, species: _Species, deaths: dict) -> None:
+        """Ages the animals and consumes their energy (see entities.Animal.tick).
+        """
+        counts = species.counts
+        max_age = species.population.max_age
+        old = int(counts[max_age - 1:].sum())
+        deaths["old_age"] += old
+        deaths["ages"].extend([max_age] * old)
+        counts[1:] = counts[:-1].copy()
+        counts[0] = 0
+        counts[max_age] = 0
+        species.counts, starved = species.shift(self._rng, counts, -species.population.metabolism / species.width)
+        self._record_starvation(starved, deaths)
+
+    @staticmethod
+    def _record_starvation(starved: np.ndarray, deaths: dict) -> None:
+        per_age = starved.sum(axis = (1, 2))
+        deaths["starvation"] += int(per_age.sum())
+        deaths["ages"].extend(np.repeat(np.arange(len(per_age)), per_age).tolist())
+
+    def _graze(self) -> None:
+        """Feeds the rabbits with the grass of their block (see entities.Rabbit.feed).
+        A rabbit eats at most the mean grass of a patch of its block. When the grass runs short, every rabbit of the
+        block gets the same share of what it would eat.
+        """
+        rabbits = self.rabbits
+        population = rabbits.population
+        wanted = np.minimum(ents.Rabbit.feeding_metabolism_rate * population.metabolism,
+                            population.max_energy - rabbits.energies)
+        wanted = np.minimum(wanted[:, None, None], self._grass / self._patches)
+        demand = (wanted * rabbits.counts.sum(axis = 0)).sum(axis = 0)
+        share = np.divide(self._grass, demand, out = np.zeros_like(demand), where = demand > 0)
+        share = np.minimum(share, 1)
+        self._grass -= share * demand
+        rabbits.counts, _ = rabbits.shift(self._rng, rabbits.counts, wanted * share / rabbits.width)
+
+    def _hunt(self, deaths: dict) -> np.ndarray:
+        """Lets every hungry fox kill the rabbit on its patch, if there is one (see entities.Fox.feed).
+        Rabbits that moved in the last step have usually moved on before a fox gets to them, so the foxes only catch
+        the rabbits that stayed on their patch.
+
+        Return
+        ------
+        The number of rabbits killed on every block
+        """
+        rng = self._rng
+        foxes = self.foxes
+        rabbits = self.rabbits
+        hungry_levels = foxes.energies < foxes.population.max_energy
+        hungry = foxes.counts[:, hungry_levels].sum(axis = (0, 1))
+        sizes = rabbits.sizes()
+        resting = np.minimum(self._resting_rabbits, sizes)
+        kills = np.minimum(rng.binomial(hungry, np.minimum(1, resting / self._patches)), sizes)
+        killed = _thin(rng, rabbits.counts, np.divide(kills, sizes, out = np.zeros(sizes.shape), where = sizes > 0))
+        rabbits.counts -= killed
+        kills = killed.sum(axis = (0, 1))
+        per_age = killed.sum(axis = (1, 2, 3))
+        deaths["predation"] += int(per_age.sum())
+        deaths["ages"].extend(np.repeat(np.arange(len(per_age)), per_age).tolist())
+
+        eating = np.divide(kills, hungry, out = np.zeros(kills.shape), where = hungry > 0)
+        eaters = _thin(rng, foxes.counts, np.minimum(1, eating) * hungry_levels[:, None, None])
+        fed, _ = foxes.shift(rng, eaters, ents.Fox.food_energy_per_unit / foxes.width)
+        foxes.counts += fed - eaters
+        return kills
+
+    def _pick_parents(self, species: _Species) -> tuple[np.ndarray, np.ndarray]:
+        """Picks the animals reproducing in this step (see simulation.reproduce_animal) and takes them out of the counts.
+        A parent needs a mate of its species on a neighbouring patch without predators and an empty neighbouring patch.
+
+        Return
+        ------
+        The counts of the parents, and the number of newborns on every block
+        """
+        population = species.population
+        neighbours_count = len(neighbours.movement_offsets("q"))
+        fox_density = self._density(self.foxes)
+        rabbit_density = self._density(self.rabbits)
+        if species.code == ents.FOX:
+            mate_density = fox_density
+        else:
+            mate_density = rabbit_density * (1 - fox_density)
+        has_mate = 1 - (1 - mate_density) ** neighbours_count
+        has_empty = 1 - (1 - (1 - fox_density) * (1 - rabbit_density)) ** neighbours_count
+        ages = np.arange(species.counts.shape[0]) >= population.reproduction_min_age
+        levels = species.energies >= population.reproduction_min_energy
+        probability = population.reproduction_probability * has_mate * has_empty
+        parents = _thin(self._rng, species.counts, (ages[:, None] & levels[None, :])[:, :, None, None] * probability)
+        births = parents.sum(axis = (0, 1))
+        # Newborns need a patch of their own
+        free = np.maximum(self._patches - species.sizes(), 0)
+        crowded = births > free
+        if crowded.any():
+            parents = _thin(self._rng, parents, np.where(crowded, free / np.maximum(births, 1), 1))
+            births = parents.sum(axis = (0, 1))
+        species.counts -= parents
+        return parents, births
+
+    def _migrate(self, species: _Species) -> np.ndarray:
+        """Moves animals to the neighbouring blocks (see simulation.move_animal).
+        An animal on a random patch of a block moves off the block along an axis when it is on the border of the block
+        in that direction. It only moves if a neighbouring patch is free of its species. On an island the animals that
+        would leave the world stay where they are.
+
+        Return
+        ------
+        The share of the animals that moved on every block
+        """
+        rng = self._rng
+        offsets = neighbours.movement_offsets(self._movement)
+        crossing = 1 / self._block_size
+        flows = {}
+        for ns_offset, we_offset in offsets:
+            for ns_cross in ((0, 1) if ns_offset else (0,)):
+                for we_cross in ((0, 1) if we_offset else (0,)):
+                    if not (ns_cross or we_cross):
+                        continue
+                    share = ((crossing if ns_cross else 1 - crossing) if ns_offset else 1)
+                    share *= ((crossing if we_cross else 1 - crossing) if we_offset else 1)
+                    direction = (ns_offset * ns_cross, we_offset * we_cross)
+                    flows[direction] = flows.get(direction, 0) + share / len(offsets)
+
+        moving_share = 1 - self._density(species) ** len(offsets)
+        ages, levels, ns_pos, we_pos = cells = np.nonzero(species.counts)
+        staying = species.counts[cells]
+        moving = moving_share[ns_pos, we_pos]
+        left = np.ones(moving.shape)
+        counts = np.zeros_like(species.counts)
+        blocks_ns, blocks_we = self._patches.shape
+        is_toroid = self._params.world.is_toroid
+        for (ns_dir, we_dir), share in flows.items():
+            probability = np.minimum(1, np.divide(share * moving, left, out = np.zeros(left.shape), where = left > 0))
+            movers = rng.binomial(staying, probability)
+            left = left - share * moving
+            to_ns = ns_pos + ns_dir
+            to_we = we_pos + we_dir
+            if not is_toroid:
+                movers[(to_ns < 0) | (to_ns >= blocks_ns) | (to_we < 0) | (to_we >= blocks_we)] = 0
+            staying = staying - movers
+            np.add.at(counts, (ages, levels, to_ns % blocks_ns, to_we % blocks_we), movers)
+        np.add.at(counts, cells, staying)
+        species.counts = counts
+        return moving_share
+
+
+def _cost_rate(code: int) -> float:
+    """Returns the reproduction cost rate of a species (see entities.Fox.reproduction_cost_rate).
+    """
+    return ents.Fox.reproduction_cost_rate if code == ents.FOX else ents.Rabbit.reproduction_cost_rate
+
+
+def run(params: parameters.Simulation,
+        block_size: int = 10,
+        movement: str = "q",
+        seed: Optional[int] = None) -> res.SimulationStats:
+    """Runs the simulation on blocks of patches (see BlockWorld) and collects statistics, without a visualiser.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    block_size: The side length of a block in patches
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    seed: Seed for the random number generators. A different run every time if not given.
+
+    Return
+    ----------
+    An instance of the class "SimulationStats" from the module "results", as returned by simulation.run, with the
+    number of steps run and the reason the run stopped. The kills per patch are the kills of each block spread evenly over its patches.
+    """
+    if seed is not None:
+        random.seed(seed)
+    rng = np.random.default_rng(random.getrandbits(64))
+    world = BlockWorld(params, block_size, movement, rng)
+
+    sim_stats = simulation.create_stats(params)
+    sim_stats.kills_per_patch = np.zeros(world.patches().shape, dtype = np.int64) # Kills per block while running
+    step = 0
+    alive_animals = True
+    while alive_animals and step <= params.execution.max_steps:
+        alive_animals = world.step(sim_stats)
+        step += 1
+
+    # Spread the kills of each block over its patches
+    nsl = params.world.north_south_length
+    wel = params.world.west_east_length
+    per_patch = sim_stats.kills_per_patch / world.patches()
+    ns_sizes = np.diff(np.append(np.arange(0, nsl, block_size), nsl))
+    we_sizes = np.diff(np.append(np.arange(0, wel, block_size), wel))
+    sim_stats.kills_per_patch = np.repeat(np.repeat(per_patch, ns_sizes, axis = 0), we_sizes, axis = 1).tolist()
+
+    sim_stats.steps = len(sim_stats.rabbits.size_per_step)
+    sim_stats.stop_reason = stopping.MAX_STEPS if alive_animals else stopping.EXTINCTION
+    r_energy = sim_stats.rabbits.avg_energy_per_step
+    f_energy = sim_stats.foxes.avg_energy_per_step
+    sim_stats.avg_energy_per_step = [f_energy[i] + r_energy[i] for i in range(step)]
+    return sim_stats
@@ -0,0 +1,142 @@
+"""
+Report bundles rendered without a display, for the results of many runs at once.
+
+A bundle is a directory holding the summary table of reporting.print_summary as text, the same summary as JSON, and the
+figures of the reporting module (population sizes, lifespans, energy and kills) as PNG or SVG files. The figures are
+drawn with the Agg backend of matplotlib, without pyplot, so no display is needed. Bundles for many saved results
+(see the module export) are built concurrently in a pool of processes; every process draws all its bundles on the same
+figures, cleared in between, instead of setting up new ones each time.
+"""
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import sys
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import results as res, worlds
+import reporting, export
+
+# The figures of a bundle, by file name
+FIGURES = {
+    "pop_size": reporting.draw_pop_size,
+    "lifespan": reporting.draw_lifespan,
+    "energy": reporting.draw_energy,
+    "kills": reporting.draw_kills
+}
+
+
+def summary(sim_stats: res.SimulationStats) -> dict[str, Any]:
+    """Returns the figures of the summary table (see reporting.print_summary) and a few more, ready for JSON.
+    """
+    result = {"steps": sim_stats.steps, "stop_reason": sim_stats.stop_reason}
+    for species in ("foxes", "rabbits"):
+        pop_stats = getattr(sim_stats, species)
+        sizes = np.asarray(pop_stats.size_per_step)
+        energy = np.asarray(pop_stats.avg_energy_per_step)
+        result[species] = {
+            "total": int(pop_stats.total),
+            "dead_by_old_age": int(pop_stats.dead_by_old_age),
+            "dead_by_starvation": int(pop_stats.dead_by_starvation),
+            "dead_by_predation": int(pop_stats.dead_by_predation),
+            "min_size": int(sizes.min()) if len(sizes) else None,
+            "max_size": int(sizes.max()) if len(sizes) else None,
+            "avg_size": float(sizes.mean()) if len(sizes) else None,
+            "avg_energy": float(energy.mean()) if len(energy) else None
+        }
+    kills = sim_stats.kills_per_patch
+    if isinstance(kills, worlds.SparseCounts):
+        result["kills"] = float(sum(count for _, count in kills.items()))
+    else:
+        result["kills"] = float(np.asarray(kills).sum())
+    return result
+
+
+class ReportRenderer:
+    """
+    Writes report bundles, drawing every bundle on the same figures.
+
+    Parameters
+    ----------
+    - formats: The file formats of the figures, e.g. ("png", "svg")
+    - dpi: The resolution of the PNG figures
+    """
+    __slots__ = [
+        "_formats",
+        "_dpi",
+        "_figures"
+    ]
+
+    def __init__(self, formats: Sequence[str] = ("png",), dpi: int = 100):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self._formats = tuple(formats)
+        self._dpi = dpi
+        self._figures = {}
+        for name in FIGURES:
+            figure = Figure()
+            FigureCanvasAgg(figure)
+            self._figures[name] = figure
+
+    def render(self, sim_stats: res.SimulationStats, directory: Union[str, os.PathLike]) -> None:
+        """Writes the bundle of a run to a directory, which is created if needed.
+        """
+        os.makedirs(directory, exist_ok = True)
+        table = io.StringIO()
+        with contextlib.redirect_stdout(table):
+            reporting.print_summary(sim_stats)
+        with open(os.path.join(directory, "summary.txt"), "w") as file:
+            file.write(table.getvalue())
+        with open(os.path.join(directory, "summary.json"), "w") as file:
+            json.dump(summary(sim_stats), file, indent = 2)
+        for name, draw in FIGURES.items():
+            figure = self._figures[name]
+            figure.clear()
+            draw(figure, sim_stats)
+            for extension in self._formats:
+                figure.savefig(os.path.join(directory, f"{name}.{extension}"), dpi = self._dpi)
+
+
+_renderer = None # The renderer of a worker process, set up once by _start_worker
+
+
+def _start_worker(formats: Sequence[str], dpi: int) -> None:
+    global _renderer
+    _renderer = ReportRenderer(formats, dpi)
+
+
+def _build(source: str, directory: str) -> str:
+    _renderer.render(export.load(source), directory)
+    return directory
+
+
+def build_bundles(sources: Sequence[Union[str, os.PathLike]],
+                  directory: Union[str, os.PathLike],
+                  formats: Sequence[str] = ("png",),
+                  dpi: int = 100,
+                  workers: Optional[int] = None) -> list[str]:
+    """Builds the bundles of many saved results (see export.save) in a pool of processes.
+
+    Parameters
+    ----------
+    sources: The directories the results were saved to
+    directory: Where to write the bundles, one directory per result named after its source directory
+    formats: The file formats of the figures, e.g. ("png", "svg")
+    dpi: The resolution of the PNG figures
+    workers: The number of processes. As many as the machine has processors if not given.
+
+    Return
+    ----------
+    The directories of the bundles, in the order of the sources
+    """
+    targets = [os.path.join(directory, os.path.basename(os.path.normpath(source))) for source in sources]
+    if len(set(targets)) < len(targets):
+        raise ValueError("The source directories must have different names")
+    with concurrent.futures.ProcessPoolExecutor(max_workers = workers,
+                                                initializer = _start_worker,
+                                                initargs = (tuple(formats), dpi)) as pool:
+        return list(pool.map(_build, [os.fspath(source) for source in sources], targets))
@@ -0,0 +1,149 @@
+"""
+A log of the births and deaths of a run, with the step, place, species, age and energy of every event.
+
+The events are appended to a preallocated NumPy structured array, which grows by a chunk of rows whenever it is full.
+As the events come in step order, the rows of a range of steps are found by binary search. The world is also cut
+into square tiles, and for queries by region a copy of the rows is kept sorted by tile, and by step within every tile,
+so such a query only looks at the rows of the tiles overlapping the region in the range of steps.
+"""
+from typing import Optional
+
+import numpy as np
+
+# Event types
+BIRTH = 0
+OLD_AGE = 1
+STARVATION = 2
+PREDATION = 3
+
+EVENT_DTYPE = np.dtype([
+    ("step", np.int32), # Index of the step in PopulationStats.size_per_step
+    ("ns_pos", np.int32), # North-south position of the patch
+    ("we_pos", np.int32), # West-east position of the patch
+    ("species", np.int8), # entities.FOX or entities.RABBIT
+    ("event", np.int8), # BIRTH, OLD_AGE, STARVATION or PREDATION
+    ("age", np.int32),
+    ("energy", np.float32)
+])
+
+
+class EventLog:
+    """
+    The events of a run, in the order they happened, indexed by step and by tile.
+
+    Parameters
+    ----------
+    - tile_size: The side length of the square tiles of the spatial index, in patches
+    - chunk_size: The number of rows the log grows by when it is full
+    """
+    __slots__ = [
+        "_rows",
+        "_length",
+        "_tile_size",
+        "_chunk_size",
+        "_order",
+        "_by_tile",
+        "_tiles",
+        "_indexed"
+    ]
+
+    def __init__(self, tile_size: int = 16, chunk_size: int = 65536):
+        self._rows = np.empty(chunk_size, dtype = EVENT_DTYPE)
+        self._length = 0
+        self._tile_size = tile_size
+        self._chunk_size = chunk_size
+        self._order = None # Row numbers sorted by tile, and by step within every tile
+        self._by_tile = None # The rows in that order
+        self._tiles = {} # Tile (north-south, west-east) -> (start, stop) of its rows in _by_tile
+        self._indexed = 0 # Rows in the tile index
+
+    def __len__(self) -> int:
+        return self._length
+
+    def extend(self, rows: list[tuple]) -> None:
+        """Appends events, given as tuples with the fields of EVENT_DTYPE, after the events of earlier steps.
+        """
+        if not rows:
+            return
+        end = self._length + len(rows)
+        if end > len(self._rows):
+            chunks = -(-(end - len(self._rows)) // self._chunk_size) # Rounded up
+            grown = np.empty(len(self._rows) + chunks * self._chunk_size, dtype = EVENT_DTYPE)
+            grown[:self._length] = self._rows[:self._length]
+            self._rows = grown
+        self._rows[self._length:end] = rows
+        self._length = end
+
+    def events(self) -> np.ndarray:
+        """Returns all events as a structured array (a view, not a copy).
+        """
+        return self._rows[:self._length]
+
+    def _update_index(self) -> None:
+        """Sorts the rows by tile again if rows were appended since the last query for a region.
+        """
+        if self._indexed == self._length:
+            return
+        events = self.events()
+        ns_tiles = events["ns_pos"] // self._tile_size
+        we_tiles = events["we_pos"] // self._tile_size
+        self._order = np.lexsort((we_tiles, ns_tiles)) # Stable, so the rows of every tile stay in step order
+        self._by_tile = events[self._order]
+        ns_tiles, we_tiles = ns_tiles[self._order], we_tiles[self._order]
+        starts = np.flatnonzero((ns_tiles[1:] != ns_tiles[:-1]) | (we_tiles[1:] != we_tiles[:-1])) + 1
+        bounds = np.concatenate(([0], starts, [self._length])).tolist()
+        self._tiles = {tile: (start, stop) for tile, start, stop
+                       in zip(zip(ns_tiles[bounds[:-1]].tolist(), we_tiles[bounds[:-1]].tolist()),
+                              bounds[:-1], bounds[1:])}
+        self._indexed = self._length
+
+    def query(self,
+              steps: Optional[tuple[int, int]] = None,
+              region: Optional[tuple[int, int, int, int]] = None,
+              event: Optional[int] = None,
+              species: Optional[int] = None) -> np.ndarray:
+        """Returns the events matching all the given filters, in the order they happened.
+
+        Parameters
+        ----------
+        steps: The range of steps (start, stop), stop excluded
+        region: The patches (ns_start, ns_stop, we_start, we_stop), stops excluded
+        event: The type of event (e.g. PREDATION)
+        species: The species (entities.FOX or entities.RABBIT)
+
+        Return
+        ------
+        A structured array with the fields of EVENT_DTYPE
+        """
+        events = self.events()
+
+        def _matching(rows: np.ndarray) -> np.ndarray:
+            keep = np.ones(len(rows), dtype = bool)
+            if region is not None:
+                keep &= ((rows["ns_pos"] >= region[0]) & (rows["ns_pos"] < region[1])
+                         & (rows["we_pos"] >= region[2]) & (rows["we_pos"] < region[3]))
+            if event is not None:
+                keep &= rows["event"] == event
+            if species is not None:
+                keep &= rows["species"] == species
+            return keep
+
+        if region is None:
+            if steps is not None:
+                first, last = np.searchsorted(events["step"], steps)
+                events = events[first:last]
+            return events[_matching(events)]
+        self._update_index()
+        ns_start, ns_stop, we_start, we_stop = region
+        size = self._tile_size
+        found = []
+        for ns_tile in range(max(0, ns_start) // size, (ns_stop - 1) // size + 1):
+            for we_tile in range(max(0, we_start) // size, (we_stop - 1) // size + 1):
+                if (ns_tile, we_tile) not in self._tiles:
+                    continue
+                start, stop = self._tiles[(ns_tile, we_tile)]
+                if steps is not None:
+                    start, stop = start + np.searchsorted(self._by_tile["step"][start:stop], steps)
+                rows = self._by_tile[start:stop]
+                found.append(self._order[start:stop][_matching(rows)])
+        return events[np.sort(np.concatenate(found))] if found else events[:0]
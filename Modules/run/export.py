@@ -0,0 +1,111 @@
+"""
+Saving the statistics of a run to disk and opening them again, e.g. in a notebook or the reporting menu.
+
+The statistics are saved to a directory holding one NumPy .npy file per series (population sizes and energy per step,
+ages at death, deaths per age and the kills per patch) and a small JSON file with the counters. The series are opened
+as memory maps, so even very large results open at once and only the parts read are loaded from disk. Kills stored
+sparsely (see worlds.SparseCounts) are saved as the position and count of every patch with kills.
+"""
+import json
+import os
+import sys
+from typing import Union
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import results as res
+import worlds
+
+_FORMAT = 1 # Version of the layout of the directory
+_COUNTERS = ["total", "dead_by_old_age", "dead_by_starvation", "dead_by_predation"]
+
+
+def _population_series(pop_stats: res.PopulationStats) -> dict[str, np.ndarray]:
+    ages = np.asarray(pop_stats.age_at_death, dtype = np.int64)
+    return {
+        "size_per_step": np.asarray(pop_stats.size_per_step, dtype = np.int64),
+        "avg_energy_per_step": np.asarray(pop_stats.avg_energy_per_step, dtype = np.float64),
+        "age_at_death": ages,
+        "deaths_per_age": np.bincount(ages) # Histogram of the ages at death, for plotting without the single deaths
+    }
+
+
+def save(sim_stats: res.SimulationStats, directory: Union[str, os.PathLike]) -> None:
+    """Saves the statistics of a run to a directory, which is created if needed. Files of an earlier save to the same
+    directory are overwritten.
+
+    Parameters
+    ----------
+    sim_stats: An instance of the class "SimulationStats" from the module "results"
+    directory: Where to save the statistics
+    """
+    os.makedirs(directory, exist_ok = True)
+    series = {"avg_energy_per_step": np.asarray(sim_stats.avg_energy_per_step, dtype = np.float64)}
+    meta = {"format": _FORMAT, "steps": sim_stats.steps, "stop_reason": sim_stats.stop_reason}
+    kills = sim_stats.kills_per_patch
+    if isinstance(kills, worlds.SparseCounts):
+        # Rows of (ns_pos, we_pos, count), as a full grid of a huge world would not fit in memory
+        series["kills_sparse"] = np.array([(ns_pos, we_pos, count) for (ns_pos, we_pos), count in kills.items()
+                                           if count], dtype = np.int64).reshape(-1, 3)
+        meta["kills_shape"] = [len(kills), len(kills[0])]
+    else:
+        series["kills_per_patch"] = np.asarray(kills)
+    for species in ("foxes", "rabbits"):
+        pop_stats = getattr(sim_stats, species)
+        for name, values in _population_series(pop_stats).items():
+            series[f"{species}.{name}"] = values
+        meta[species] = {counter: int(getattr(pop_stats, counter)) for counter in _COUNTERS}
+    for name, values in series.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    # Written last, so a directory is only complete once it has a meta.json
+    with open(os.path.join(directory, "meta.json"), "w") as file:
+        json.dump(meta, file, indent = 2)
+
+
+def load(directory: Union[str, os.PathLike], mmap: bool = True) -> res.SimulationStats:
+    """Opens the statistics saved to a directory (see save).
+
+    Parameters
+    ----------
+    directory: Where the statistics were saved
+    mmap: If True (Default), the series are memory-mapped read-only instead of read into memory
+
+    Return
+    ----------
+    An instance of the class "SimulationStats" from the module "results", holding NumPy arrays instead of lists.
+    Kills saved sparsely are read into a worlds.SparseCounts. The deaths per age are not part of it; they are read
+    with deaths_per_age.
+    """
+    with open(os.path.join(directory, "meta.json")) as file:
+        meta = json.load(file)
+    if meta["format"] != _FORMAT:
+        raise ValueError(f"Unknown format {meta['format']} of the statistics in {directory}")
+
+    def _series(name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode = "r" if mmap else None)
+
+    sim_stats = res.SimulationStats()
+    sim_stats.steps = meta["steps"]
+    sim_stats.stop_reason = meta["stop_reason"]
+    sim_stats.avg_energy_per_step = _series("avg_energy_per_step")
+    if "kills_shape" in meta:
+        kills = worlds.SparseCounts(*meta["kills_shape"])
+        for ns_pos, we_pos, count in _series("kills_sparse").tolist():
+            kills[ns_pos][we_pos] = count
+        sim_stats.kills_per_patch = kills
+    else:
+        sim_stats.kills_per_patch = _series("kills_per_patch")
+    for species in ("foxes", "rabbits"):
+        pop_stats = getattr(sim_stats, species)
+        for counter in _COUNTERS:
+            setattr(pop_stats, counter, meta[species][counter])
+        for name in ("size_per_step", "avg_energy_per_step", "age_at_death"):
+            setattr(pop_stats, name, _series(f"{species}.{name}"))
+    return sim_stats
+
+
+def deaths_per_age(directory: Union[str, os.PathLike], species: str) -> np.ndarray:
+    """Returns the number of deaths at every age of a population ("foxes" or "rabbits") saved to a directory.
+    """
+    return np.load(os.path.join(directory, f"{species}.deaths_per_age.npy"), mmap_mode = "r")
@@ -0,0 +1,363 @@
+"""
+Checking that faster ways of running the simulation give the same results as simulation.update_entities.
+
+Exact mode: a seeded run is recorded as a trace, a digest of the world after every step (the total grass, the
+positions, ages and energy of the animals, and the statistics). Two traces, e.g. of the same run with different options
+of simulation.run, or of a run and a golden trace saved earlier, are compared step by step, and the first step where
+they diverge is reported.
+
+Statistical mode: engines drawing different random numbers (e.g. the module batched) cannot match step by step.
+Instead, the population sizes of many seeded runs of both engines are compared step by step with Welch's t-test, and
+the distributions of the average population sizes of the runs with the two-sample Kolmogorov-Smirnov test.
+"""
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, results as res, entities as ents
+import simulation, batched, neighbours
+
+_STAT_COUNTERS = ("total", "dead_by_old_age", "dead_by_starvation", "dead_by_predation")
+
+
+class StepDigest(NamedTuple):
+    """
+    The state of a run after a number of steps.
+
+    Attributes
+    ----------
+    - step: The number of steps completed (0 for the world before the first step)
+    - grass: The total amount of grass in the world
+    - rabbits: The number of live rabbits in the world
+    - foxes: The number of live foxes in the world
+    - animals: A hash of the sorted (north-south position, west-east position, species, age, energy) of the live animals
+    - stats: A hash of the statistics collected so far (see results.SimulationStats)
+    """
+    step: int
+    grass: int
+    rabbits: int
+    foxes: int
+    animals: str
+    stats: str
+
+
+class Divergence(NamedTuple):
+    """
+    The first step where two traces differ.
+
+    Attributes
+    ----------
+    - step: The number of steps completed
+    - fields: The names of the fields of StepDigest that differ
+    - expected: The digest of the first trace, or None if it ended before this step
+    - actual: The digest of the second trace, or None if it ended before this step
+    """
+    step: int
+    fields: tuple[str, ...]
+    expected: Optional[StepDigest]
+    actual: Optional[StepDigest]
+
+    def __str__(self) -> str:
+        if self.expected is None or self.actual is None:
+            ended = "first" if self.expected is None else "second"
+            return f"the {ended} trace ends before step {self.step}"
+        changes = ", ".join(f"{field} {getattr(self.expected, field)} -> {getattr(self.actual, field)}"
+                            for field in self.fields)
+        return f"diverges at step {self.step}: {changes}"
+
+
+def digest(step: int, world: Any, sim_stats: res.SimulationStats) -> StepDigest:
+    """Returns the digest of a world and the statistics of its run after a number of steps.
+    The world can be stored in any way simulation.run supports; a sparse world only counts the patches it created.
+    Reading lazy grass does not change the run (see entities.Patch.grass_seed).
+    """
+    grass = 0
+    animals = []
+    for group in world: # Rows of patches, or tiles of a tiled world
+        for patch in group:
+            grass += patch.grass()
+            for animal in patch.animals():
+                if animal.is_alive():
+                    animals.append((*patch.coordinates(), animal.species_code, animal.age(), animal.energy()))
+    animals.sort()
+    stats = [sim_stats.steps]
+    for pop_stats in (sim_stats.rabbits, sim_stats.foxes):
+        stats += [getattr(pop_stats, counter) for counter in _STAT_COUNTERS]
+        stats += [list(pop_stats.size_per_step[-1:]), list(pop_stats.avg_energy_per_step[-1:]),
+                  len(pop_stats.age_at_death)]
+    rabbits = sum(1 for animal in animals if animal[2] == ents.RABBIT)
+    return StepDigest(step, grass, rabbits, len(animals) - rabbits,
+                      hashlib.sha256(repr(animals).encode()).hexdigest()[:16],
+                      hashlib.sha256(repr(stats).encode()).hexdigest()[:16])
+
+
+def record(params: parameters.Simulation, seed: int, movement: str = "q", **options: Any) -> list[StepDigest]:
+    """Runs the simulation in batch mode (see simulation.run) and returns the digest of every step.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    seed: Seed for the random number generators
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    options: Further keyword arguments of simulation.run (e.g. backend = "tiled")
+
+    Return
+    ----------
+    The digests of the world before the first step and after every step
+    """
+    trace = []
+    batch = params.execution.batch
+    params.execution.batch = True
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation.run(params, movement = movement, seed = seed,
+                           observe = lambda step, world, sim_stats: trace.append(digest(step, world, sim_stats)),
+                           **options)
+    finally:
+        params.execution.batch = batch
+    return trace
+
+
+def first_divergence(expected: Sequence[StepDigest], actual: Sequence[StepDigest]) -> Optional[Divergence]:
+    """Returns the first step where two traces differ, or None if they are the same.
+    """
+    for expected_step, actual_step in zip(expected, actual):
+        if expected_step != actual_step:
+            fields = tuple(field for field in StepDigest._fields
+                           if getattr(expected_step, field) != getattr(actual_step, field))
+            return Divergence(expected_step.step, fields, expected_step, actual_step)
+    if len(expected) != len(actual):
+        step = min(len(expected), len(actual))
+        return Divergence(step, (), expected[step] if step < len(expected) else None,
+                          actual[step] if step < len(actual) else None)
+    return None
+
+
+def compare(params: parameters.Simulation,
+            seed: int,
+            expected_options: dict[str, Any],
+            actual_options: dict[str, Any],
+            movement: str = "q") -> Optional[Divergence]:
+    """Runs the simulation twice with the same seed and different options of simulation.run and returns the first
+    step where the runs diverge, or None if they are the same.
+
+    Example
+    -------
+    >>> compare(params, 1, {}, {"backend": "tiled", "scheduling": "active"})
+    """
+    return first_divergence(record(params, seed, movement, **expected_options),
+                            record(params, seed, movement, **actual_options))
+
+
+def gate_misses(params: parameters.Simulation, seed: int, movement: str = "q", **options: Any) -> int:
+    """Runs the simulation in batch mode and checks the answers of neighbours.NeighbourFields against looking at the
+    neighbouring patches (see simulation.get_near_by_fields), for every animal before every step.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    seed: Seed for the random number generators
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    options: Further keyword arguments of simulation.run
+
+    Return
+    ----------
+    The number of times an animal would have been stopped from reproducing or moving although one of its neighbouring
+    patches allowed it. It is 0 if the neighbour counts are right.
+    """
+    misses = 0
+
+    def _check(step: int, world: Any, sim_stats: res.SimulationStats) -> None:
+        nonlocal misses
+        counts = neighbours.NeighbourFields(world, params, movement)
+        for row in world:
+            for patch in row:
+                for animal in patch.animals():
+                    fields = simulation.get_near_by_fields(animal, world, params, movement = "q")
+                    mates = any(animal.same_species_in(field) and not animal.predators_in(field) for field in fields)
+                    empty = any(len(field.animals()) == 0 for field in fields)
+                    if mates and empty and not counts.may_reproduce(animal):
+                        misses += 1
+                    fields = simulation.get_near_by_fields(animal, world, params, movement)
+                    if any(not animal.same_species_in(field) for field in fields) and not counts.may_move(animal):
+                        misses += 1
+
+    batch = params.execution.batch
+    params.execution.batch = True
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation.run(params, movement = movement, seed = seed, observe = _check, **options)
+    finally:
+        params.execution.batch = batch
+    return misses
+
+
+def save(trace: Sequence[StepDigest], path: Union[str, os.PathLike]) -> None:
+    """Saves a trace as a golden trace, one JSON line per step.
+    """
+    with open(path, "w") as file:
+        for step_digest in trace:
+            file.write(json.dumps(step_digest._asdict()) + "\n")
+
+
+def load(path: Union[str, os.PathLike]) -> list[StepDigest]:
+    """Opens a trace saved with save.
+    """
+    with open(path) as file:
+        return [StepDigest(**json.loads(line)) for line in file if line.strip()]
+
+
+# ---------- Statistical mode ----------
+
+Engine = Callable[[parameters.Simulation, Sequence[int]], list[res.SimulationStats]]
+
+
+def agent_engine(movement: str = "q", **options: Any) -> Engine:
+    """Returns an engine running simulation.run once per seed in batch mode, with the given options.
+    """
+    def _run(params: parameters.Simulation, seeds: Sequence[int]) -> list[res.SimulationStats]:
+        batch = params.execution.batch
+        params.execution.batch = True
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [simulation.run(params, movement = movement, seed = seed, **options) for seed in seeds]
+        finally:
+            params.execution.batch = batch
+    return _run
+
+
+def batched_engine(movement: str = "q") -> Engine:
+    """Returns an engine running a batch of worlds (see batched.run), one per seed, seeded with the first seed.
+    """
+    def _run(params: parameters.Simulation, seeds: Sequence[int]) -> list[res.SimulationStats]:
+        return batched.run(params, len(seeds), movement = movement, seed = seeds[0])
+    return _run
+
+
+def trajectories(all_stats: Sequence[res.SimulationStats], species: str, steps: int) -> np.ndarray:
+    """Returns the population sizes of the runs as an array (runs x steps). Steps after the end of a run count as 0.
+    """
+    sizes = np.zeros((len(all_stats), steps))
+    for row, sim_stats in zip(sizes, all_stats):
+        size_per_step = np.asarray(getattr(sim_stats, species).size_per_step, dtype = float)[:steps]
+        row[:len(size_per_step)] = size_per_step
+    return sizes
+
+
+def _welch_t(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Returns Welch's t statistic of every column of two samples (runs x steps). Columns without variance and
+    with equal means count as 0; without variance and different means as infinite.
+    """
+    difference = first.mean(axis = 0) - second.mean(axis = 0)
+    error = np.sqrt(first.var(axis = 0, ddof = 1) / len(first) + second.var(axis = 0, ddof = 1) / len(second))
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        return np.where(error > 0, difference / error, np.where(difference == 0, 0.0, np.inf))
+
+
+def _ks_test(first: np.ndarray, second: np.ndarray) -> tuple[float, float]:
+    """Returns the two-sample Kolmogorov-Smirnov statistic of two samples and its asymptotic p-value.
+    """
+    values = np.concatenate([first, second])
+    statistic = float(np.max(np.abs(np.searchsorted(np.sort(first), values, side = "right") / len(first)
+                                    - np.searchsorted(np.sort(second), values, side = "right") / len(second))))
+    size = len(first) * len(second) / (len(first) + len(second))
+    scale = (math.sqrt(size) + 0.12 + 0.11 / math.sqrt(size)) * statistic
+    if scale < 0.2: # The series below converges too slowly; the p-value is 1 to many digits
+        return statistic, 1.0
+    p_value = 2 * sum((-1) ** (k - 1) * math.exp(-2 * k * k * scale * scale) for k in range(1, 101))
+    return statistic, min(1.0, max(0.0, p_value))
+
+
+class SpeciesEquivalence(NamedTuple):
+    """
+    How the population sizes of one species differ between two engines.
+
+    Attributes
+    ----------
+    - max_t: The largest Welch's t statistic (absolute) of the sizes over the steps
+    - max_t_step: The step with the largest t statistic
+    - relative_difference: The mean absolute difference of the mean sizes per step, relative to the mean size
+    - ks_statistic: The Kolmogorov-Smirnov statistic of the average sizes of the runs
+    - ks_p_value: The p-value of the Kolmogorov-Smirnov test
+    """
+    max_t: float
+    max_t_step: int
+    relative_difference: float
+    ks_statistic: float
+    ks_p_value: float
+
+
+class EquivalenceReport(NamedTuple):
+    """
+    The result of comparing two engines over many seeds (see equivalence).
+
+    Attributes
+    ----------
+    - runs: The number of runs of each engine
+    - steps: The number of steps compared
+    - species: A SpeciesEquivalence for "rabbits" and for "foxes"
+    - equivalent: True if no step has a t statistic above the threshold and no Kolmogorov-Smirnov test rejects at
+      the significance level
+    """
+    runs: int
+    steps: int
+    species: dict[str, SpeciesEquivalence]
+    equivalent: bool
+
+    def __str__(self) -> str:
+        lines = [f"{self.runs} runs of {self.steps} steps per engine: "
+                 f"{'equivalent' if self.equivalent else 'NOT equivalent'}"]
+        for name, result in self.species.items():
+            lines.append(f"  {name}: max |t| {result.max_t:.2f} at step {result.max_t_step}, "
+                         f"mean difference {result.relative_difference:.1%}, "
+                         f"KS {result.ks_statistic:.3f} (p = {result.ks_p_value:.3f})")
+        return "\n".join(lines)
+
+
+def equivalence(params: parameters.Simulation,
+                expected: Engine,
+                actual: Engine,
+                seeds: Sequence[int],
+                threshold: float = 4.0,
+                alpha: float = 0.01) -> EquivalenceReport:
+    """Compares the population sizes of two engines over many seeded runs.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    expected: The engine to compare against, e.g. agent_engine()
+    actual: The engine being checked, e.g. batched_engine()
+    seeds: The seeds of the runs of each engine (at least 2)
+    threshold: The largest Welch's t statistic accepted at any step. The default of 4 keeps false alarms rare even
+        over thousands of steps.
+    alpha: The significance level of the Kolmogorov-Smirnov tests
+
+    Return
+    ----------
+    An instance of the class EquivalenceReport
+    """
+    if len(seeds) < 2:
+        raise ValueError("At least two seeds are needed for comparing engines statistically")
+    expected_stats = expected(params, seeds)
+    actual_stats = actual(params, seeds)
+    steps = max(len(sim_stats.rabbits.size_per_step) for sim_stats in expected_stats + actual_stats)
+    species = {}
+    for name in ("rabbits", "foxes"):
+        first = trajectories(expected_stats, name, steps)
+        second = trajectories(actual_stats, name, steps)
+        t = np.abs(_welch_t(first, second))
+        mean = first.mean()
+        difference = np.abs(first.mean(axis = 0) - second.mean(axis = 0)).mean()
+        species[name] = SpeciesEquivalence(float(t.max()), int(t.argmax()),
+                                           float(difference / mean) if mean > 0 else float(difference),
+                                           *_ks_test(first.mean(axis = 1), second.mean(axis = 1)))
+    equivalent = all(result.max_t <= threshold and result.ks_p_value >= alpha for result in species.values())
+    return EquivalenceReport(len(seeds), steps, species, equivalent)
@@ -0,0 +1,412 @@
+"""
+A hybrid run of the simulation, skipping ahead with a mean-field model once the populations are large.
+
+The agent-based steps of update_entities are run over a window of steps, from which aggregate rates are fitted:
+births, deaths by old age and starvation, and predation. The population sizes are then advanced with a
+Lotka-Volterra-style model for a number of steps without looking at a single patch, after which the world is
+re-seeded with animals matching the aggregates, and the agent-based steps take over again.
+
+The model treats the world as well mixed: every rabbit is as likely to meet every fox. Use compare to measure the
+error against full runs before relying on the shortcut for a scenario.
+"""
+import math
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, results as res, entities as ents
+import simulation, stopping
+
+
+class Rates:
+    """
+    Aggregate rates of the populations, per animal and step, fitted from a window of agent-based steps.
+
+    With R rabbits, F foxes and A patches, one step of the model changes the sizes by
+        - rabbits: (rabbit_birth - rabbit_crowding_birth * R) * R - (rabbit_death + rabbit_crowding_death * R) * R
+          - predation * R * F / A
+        - foxes: fox_birth * R * F / A - fox_death * F
+    The crowding terms stand for the grass running short as the rabbits grow in number, which the model does not
+    follow patch by patch. The mean energies of the populations are held at their averages over the window.
+    """
+    __slots__ = [
+        "rabbit_birth",
+        "rabbit_crowding_birth",
+        "rabbit_death",
+        "rabbit_crowding_death",
+        "predation",
+        "fox_birth",
+        "fox_death",
+        "rabbit_energy",
+        "fox_energy"
+    ]
+
+    def __init__(self):
+        self.rabbit_birth = 0.0
+        self.rabbit_crowding_birth = 0.0
+        self.rabbit_death = 0.0
+        self.rabbit_crowding_death = 0.0
+        self.predation = 0.0
+        self.fox_birth = 0.0
+        self.fox_death = 0.0
+        self.rabbit_energy = 0.0
+        self.fox_energy = 0.0
+
+    def rabbit_births(self, rabbits: float) -> float:
+        """Returns the expected rabbit births in a step with the given number of rabbits.
+        """
+        return max(0.0, self.rabbit_birth - self.rabbit_crowding_birth * rabbits) * rabbits
+
+    def rabbit_deaths(self, rabbits: float) -> float:
+        """Returns the expected rabbit deaths by old age and starvation in a step with the given number of rabbits.
+        """
+        return max(0.0, self.rabbit_death + self.rabbit_crowding_death * rabbits) * rabbits
+
+
+def _fit_line(sizes: np.ndarray, rates: np.ndarray, rising: bool) -> tuple[float, float]:
+    """Fits a per-capita rate as a straight line of the population size, weighing every step by its size.
+    The slope is only kept if the rate rises (or falls, if not rising) with the size, otherwise the rate is constant.
+
+    Return
+    ------
+    The intercept and the slope of the line
+    """
+    weights = sizes / sizes.sum()
+    mean = float((weights * rates).sum())
+    if np.ptp(sizes) == 0:
+        return mean, 0.0
+    slope, intercept = np.polyfit(sizes, rates, 1, w = np.sqrt(weights))
+    if (slope > 0) != rising:
+        return mean, 0.0
+    return float(intercept), float(slope)
+
+
+class _Window:
+    """
+    The counts of a window of agent-based steps, from which the rates are fitted.
+    Every step holds the population sizes at its start and the births and deaths during the step.
+    """
+    __slots__ = [
+        "_steps",
+        "_last_counts"
+    ]
+
+    def __init__(self, sim_stats: res.SimulationStats):
+        self._steps = []
+        self._last_counts = _counts(sim_stats)
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def add(self, rabbits: int, foxes: int, sim_stats: res.SimulationStats) -> None:
+        """Adds a step that started with the given population sizes and has just been run.
+        """
+        counts = _counts(sim_stats)
+        self._steps.append((rabbits, foxes) + tuple(end - start for start, end in zip(self._last_counts, counts)))
+        self._last_counts = counts
+
+    def drift(self) -> float:
+        """Returns the largest change of a population size over the window, relative to its mean size.
+        """
+        sizes = np.array(self._steps, dtype = float)[:, :2]
+        means = sizes.mean(axis = 0)
+        changes = np.abs(sizes[-1] - sizes[0])
+        return float(max(change / mean if mean > 0 else 0.0 for change, mean in zip(changes, means)))
+
+    def fit(self, sim_stats: res.SimulationStats, area: int) -> Rates:
+        """Fits the rates to the steps of the window.
+        """
+        def _per(count: np.ndarray, exposure: np.ndarray) -> float:
+            return float(count.sum() / exposure.sum()) if exposure.sum() > 0 else 0.0
+
+        rabbits, foxes, r_births, r_natural, r_predation, f_births, f_natural = np.array(self._steps, dtype = float).T
+        encounters = rabbits * foxes / area
+        rates = Rates()
+        living = rabbits > 0
+        if living.any():
+            rates.rabbit_birth, slope = _fit_line(rabbits[living], r_births[living] / rabbits[living], rising = False)
+            rates.rabbit_crowding_birth = -slope
+            rates.rabbit_death, rates.rabbit_crowding_death = _fit_line(rabbits[living],
+                                                                        r_natural[living] / rabbits[living],
+                                                                        rising = True)
+        rates.predation = _per(r_predation, encounters)
+        rates.fox_birth = _per(f_births, encounters)
+        rates.fox_death = _per(f_natural, foxes)
+        window = slice(-len(self), None)
+        rates.rabbit_energy = sum(sim_stats.rabbits.avg_energy_per_step[window]) / len(self)
+        rates.fox_energy = sum(sim_stats.foxes.avg_energy_per_step[window]) / len(self)
+        return rates
+
+
+def _counts(sim_stats: res.SimulationStats) -> tuple[int, int, int, int, int]:
+    """Returns the rabbit births (as the total), natural deaths and deaths by predation, and the fox births and natural
+    deaths so far.
+    """
+    rabbits = sim_stats.rabbits
+    foxes = sim_stats.foxes
+    return (rabbits.total, rabbits.dead_by_old_age + rabbits.dead_by_starvation, rabbits.dead_by_predation,
+            foxes.total, foxes.dead_by_old_age + foxes.dead_by_starvation)
+
+
+def _current_sizes(sim_stats: res.SimulationStats, params: parameters.Simulation) -> tuple[int, int]:
+    """Returns the sizes of the rabbit and fox populations reached at the last step (the initial sizes before any step).
+    """
+    rabbit_sizes = sim_stats.rabbits.size_per_step
+    fox_sizes = sim_stats.foxes.size_per_step
+    if not rabbit_sizes:
+        return params.rabbits.initial_size, params.foxes.initial_size
+    return rabbit_sizes[-1], fox_sizes[-1]
+
+
+def fast_forward(rates: Rates,
+                 rabbits: float,
+                 foxes: float,
+                 area: int,
+                 steps: int,
+                 sim_stats: res.SimulationStats) -> tuple[float, float]:
+    """Advances the population sizes with the mean-field model (see Rates) and records every step in the statistics.
+    The births and deaths of the model are added to the counts of the statistics, rounded to whole animals.
+
+    Parameters
+    ----------
+    rates: The fitted rates
+    rabbits: The number of rabbits to start from
+    foxes: The number of foxes to start from
+    area: The number of patches in the world
+    steps: The number of steps to advance
+    sim_stats: An instance of the class "SimulationStats" from the module "results", which the steps are appended to
+
+    Return
+    ----------
+    The number of rabbits and foxes after the last step, as real numbers
+    """
+    r_stats = sim_stats.rabbits
+    f_stats = sim_stats.foxes
+    r_births = r_natural = r_predation = f_births = f_natural = 0.0
+    for _ in range(steps):
+        encounters = rabbits * foxes / area
+        step_r_births = rates.rabbit_births(rabbits)
+        step_r_natural = rates.rabbit_deaths(rabbits)
+        step_r_predation = min(rates.predation * encounters, rabbits)
+        step_f_births = rates.fox_birth * encounters
+        step_f_natural = rates.fox_death * foxes
+        r_births += step_r_births
+        r_natural += step_r_natural
+        r_predation += step_r_predation
+        f_births += step_f_births
+        f_natural += step_f_natural
+        rabbits += step_r_births - step_r_natural - step_r_predation
+        foxes += step_f_births - step_f_natural
+        # Neither population can be negative, and no more animals of a species than patches fit in the world
+        rabbits = min(max(rabbits, 0.0), area)
+        foxes = min(max(foxes, 0.0), area)
+        r_stats.size_per_step.append(round(rabbits))
+        f_stats.size_per_step.append(round(foxes))
+        r_stats.avg_energy_per_step.append(rates.rabbit_energy if round(rabbits) > 0 else 0)
+        f_stats.avg_energy_per_step.append(rates.fox_energy if round(foxes) > 0 else 0)
+    r_stats.total += round(r_births)
+    r_stats.dead_by_old_age += round(r_natural) # The model does not tell old age from starvation
+    r_stats.dead_by_predation += round(r_predation)
+    f_stats.total += round(f_births)
+    f_stats.dead_by_old_age += round(f_natural)
+    return rabbits, foxes
+
+
+def reseed(world: list[list[ents.Patch]], params: parameters.Simulation, rabbits: int, foxes: int, rates: Rates) -> None:
+    """Replaces the animals of the world with the given numbers of rabbits and foxes on random patches.
+    The new animals have the mean energies of the rates and ages drawn evenly below the maximum age.
+
+    Parameters
+    ----------
+    world: A matrix representing the simulated world filled with patch entities
+    params: An instance of the class "Simulation" from the module "parameters"
+    rabbits: The number of rabbits to place
+    foxes: The number of foxes to place
+    rates: The fitted rates, giving the mean energies
+    """
+    for row in world:
+        for patch in row:
+            for animal in list(patch.animals()):
+                patch.remove(animal)
+    area = len(world) * len(world[0])
+    for population, size, animal_class, energy in ((params.foxes, foxes, ents.Fox, rates.fox_energy),
+                                                   (params.rabbits, rabbits, ents.Rabbit, rates.rabbit_energy)):
+        energy = min(max(1, round(energy)), population.max_energy)
+        for field in sorted(random.sample(range(area), size)):
+            ns_pos, we_pos = divmod(field, len(world[0]))
+            animal_class(population, world[ns_pos][we_pos], random.randint(0, population.max_age - 1), energy)
+
+
+def run_hybrid(params: parameters.Simulation,
+               movement: str = "q",
+               seed: Optional[int] = None,
+               fit_steps: int = 20,
+               skip_steps: int = 50,
+               min_population: int = 50,
+               max_drift: float = 0.2) -> tuple[res.SimulationStats, int]:
+    """Runs the simulation, alternating windows of agent-based steps with steps of the mean-field model.
+    The simulation runs in batch mode on a dense world, without a visualiser. The statistics hold a value for every
+    step as in a full run, but kills per patch and ages at death are only collected in the agent-based steps.
+    The grass is left as it was at the end of the window while skipping ahead, as the populations grazing it are
+    steady.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    seed: Seed for the random number generators. A different run every time if not given.
+    fit_steps: The number of agent-based steps the rates are fitted from
+    skip_steps: The number of steps advanced by the mean-field model after each window
+    min_population: Both populations need at least this many animals (or none, for the foxes) at the end of a window
+        to skip ahead, as the model is unfit for small populations
+    max_drift: Neither population may change by more than this share of its mean size over a window to skip ahead,
+        as the rates fitted while the populations rise or fall do not carry over to other sizes
+
+    Return
+    ----------
+    An instance of the class "SimulationStats" from the module "results", with the number of steps run (skipped ones
+    included) and the reason the run stopped, and the number of skipped steps
+    """
+    if seed is not None:
+        random.seed(seed)
+    ents.Patch.current_step = 0
+    ents.Patch.lazy_grass = False
+    ents.Patch.occupied = None
+    ents.Animal.calendar = None
+
+    world = simulation.create_world(params)
+    simulation.fill_world(world)
+    simulation.populate_world(params, world)
+    area = len(world) * len(world[0])
+
+    sim_stats = simulation.create_stats(params)
+    max_steps = params.execution.max_steps
+    step = 0
+    skipped = 0
+    alive_animals = True
+    window = _Window(sim_stats)
+    while alive_animals and step <= max_steps:
+        rabbits, foxes = _current_sizes(sim_stats, params)
+        alive_animals = simulation.update_entities(world, params,
+                                                   sim_stats.rabbits, sim_stats.foxes,
+                                                   sim_stats, movement)
+        window.add(rabbits, foxes, sim_stats)
+        step += 1
+        if len(window) < fit_steps or step > max_steps:
+            continue
+        rabbits, foxes = _current_sizes(sim_stats, params)
+        large = rabbits >= min_population and (foxes == 0 or foxes >= min_population)
+        if large and window.drift() <= max_drift:
+            steps = min(skip_steps, max_steps + 1 - step)
+            rates = window.fit(sim_stats, area)
+            rabbits, foxes = fast_forward(rates, rabbits, foxes, area, steps, sim_stats)
+            ents.Patch.current_step += steps
+            reseed(world, params, round(rabbits), round(foxes), rates)
+            step += steps
+            skipped += steps
+            alive_animals = round(rabbits) > 0 or round(foxes) > 0
+        window = _Window(sim_stats)
+
+    sim_stats.steps = len(sim_stats.rabbits.size_per_step)
+    sim_stats.stop_reason = stopping.MAX_STEPS if alive_animals else stopping.EXTINCTION
+    r_energy = sim_stats.rabbits.avg_energy_per_step
+    f_energy = sim_stats.foxes.avg_energy_per_step
+    sim_stats.avg_energy_per_step = [f_energy[i] + r_energy[i] for i in range(len(r_energy))]
+    return sim_stats, skipped
+
+
+class ErrorReport:
+    """
+    The error of hybrid runs (see run_hybrid) against full runs with the same seeds, averaged over the seeds.
+
+    Attributes
+    ----------
+    - rabbits_error: The root-mean-square difference in rabbits per step, relative to the mean rabbits of the full runs
+    - foxes_error: The same for the foxes
+    - energy_error: The same for the average energy per step of both populations
+    - skipped_share: The share of the steps advanced by the mean-field model
+    - full_seconds: The time taken by the full runs
+    - hybrid_seconds: The time taken by the hybrid runs
+    """
+    __slots__ = [
+        "rabbits_error",
+        "foxes_error",
+        "energy_error",
+        "skipped_share",
+        "full_seconds",
+        "hybrid_seconds"
+    ]
+
+    def __init__(self):
+        self.rabbits_error = 0.0
+        self.foxes_error = 0.0
+        self.energy_error = 0.0
+        self.skipped_share = 0.0
+        self.full_seconds = 0.0
+        self.hybrid_seconds = 0.0
+
+    def __str__(self) -> str:
+        return (f"rabbits error {self.rabbits_error:.1%}, foxes error {self.foxes_error:.1%}, "
+                f"energy error {self.energy_error:.1%}, {self.skipped_share:.0%} of steps skipped, "
+                f"{self.full_seconds:.2f}s full against {self.hybrid_seconds:.2f}s hybrid")
+
+
+def _relative_error(full: list[float], hybrid: list[float]) -> float:
+    """Returns the root-mean-square difference of two series relative to the mean of the first.
+    Steps after the end of the shorter series count as zero.
+    """
+    length = max(len(full), len(hybrid))
+    if length == 0:
+        return 0.0
+    full = list(full) + [0] * (length - len(full))
+    hybrid = list(hybrid) + [0] * (length - len(hybrid))
+    rms = math.sqrt(sum((f - h) ** 2 for f, h in zip(full, hybrid)) / length)
+    mean = sum(full) / length
+    return rms / mean if mean > 0 else rms
+
+
+def compare(params: parameters.Simulation,
+            seeds: list[int],
+            movement: str = "q",
+            **options) -> ErrorReport:
+    """Runs the simulation fully and as a hybrid for every seed and reports the error of the hybrid runs.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters"
+    seeds: The seeds of the runs
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    options: Options of the hybrid runs (see run_hybrid)
+
+    Return
+    ----------
+    An instance of the class ErrorReport
+    """
+    batch = params.execution.batch
+    params.execution.batch = True
+    report = ErrorReport()
+    try:
+        for seed in seeds:
+            start = time.perf_counter()
+            full = simulation.run(params, movement = movement, seed = seed)
+            report.full_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            hybrid, skipped = run_hybrid(params, movement = movement, seed = seed, **options)
+            report.hybrid_seconds += time.perf_counter() - start
+
+            report.rabbits_error += _relative_error(full.rabbits.size_per_step, hybrid.rabbits.size_per_step)
+            report.foxes_error += _relative_error(full.foxes.size_per_step, hybrid.foxes.size_per_step)
+            report.energy_error += _relative_error(full.avg_energy_per_step, hybrid.avg_energy_per_step)
+            report.skipped_share += skipped / max(1, len(hybrid.rabbits.size_per_step))
+    finally:
+        params.execution.batch = batch
+    report.rabbits_error /= len(seeds)
+    report.foxes_error /= len(seeds)
+    report.energy_error /= len(seeds)
+    report.skipped_share /= len(seeds)
+    return report
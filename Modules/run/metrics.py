@@ -0,0 +1,237 @@
+"""
+Live metrics of a running simulation, served over HTTP on the loopback interface.
+
+A MetricsServer runs an asyncio event loop on a background thread. The simulation publishes a snapshot of the run
+(see MetricsServer.publish_step), at most once per interval, which only hands the snapshot to the event loop, so the
+simulation never waits for clients. The server answers:
+    GET /metrics       the latest snapshot in the Prometheus text format
+    GET /metrics.json  the latest snapshot as JSON
+    GET /stream        every following snapshot as a line of JSON, until the client disconnects
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Optional
+
+PREFIX = "foxes_rabbits" # Prefix of the Prometheus metrics
+
+# Phases of a step timed by simulation.run
+PHASES = ("visualiser", "update", "stopping")
+
+
+def prometheus_text(snapshot: dict[str, Any]) -> str:
+    """Formats a snapshot (see MetricsServer.publish_step) in the Prometheus text format.
+    """
+    lines = []
+
+    def _metric(name: str, kind: str, help_text: str, samples: list[tuple[str, Any]]) -> None:
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{PREFIX}_{name}{labels} {value}")
+
+    _metric("step", "gauge", "Steps completed", [("", snapshot["step"])])
+    _metric("max_steps", "gauge", "Maximum number of steps of the run", [("", snapshot["max_steps"])])
+    _metric("steps_per_second", "gauge", "Steps completed per second since the previous snapshot",
+            [("", snapshot["steps_per_second"])])
+    _metric("eta_seconds", "gauge", "Estimated seconds until the maximum number of steps is reached",
+            [("", snapshot["eta_seconds"])])
+    _metric("elapsed_seconds", "gauge", "Seconds since the run started", [("", snapshot["elapsed_seconds"])])
+    _metric("population", "gauge", "Animals alive after the latest step",
+            [(f'{{species="{species}"}}', value) for species, value in snapshot["population"].items()])
+    _metric("average_energy", "gauge", "Average energy of the animals in the latest step",
+            [(f'{{species="{species}"}}', value) for species, value in snapshot["average_energy"].items()])
+    _metric("phase_seconds_total", "counter", "Seconds spent in every phase of the steps",
+            [(f'{{phase="{phase}"}}', value) for phase, value in snapshot["phase_seconds"].items()])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    A local HTTP server publishing the progress of a run (see simulation.run).
+
+    Parameters
+    ----------
+    - port: The port to listen on. A free port is picked if 0 (Default); see the property port.
+    - interval: The shortest time in seconds between two snapshots
+    - host: The address to listen on. Only loopback addresses should be used, as there is no authentication.
+    """
+    __slots__ = [
+        "_host",
+        "_requested_port",
+        "_port",
+        "_interval",
+        "_loop",
+        "_thread",
+        "_server",
+        "_streams",
+        "_snapshot",
+        "_max_steps",
+        "_started",
+        "_last_time",
+        "_last_step",
+        "_error"
+    ]
+
+    def __init__(self, port: int = 0, interval: float = 1.0, host: str = "127.0.0.1"):
+        self._host = host
+        self._requested_port = port
+        self._port = None
+        self._interval = interval
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._streams = set() # Queues of the clients of /stream
+        self._snapshot = None
+        self._max_steps = 0
+        self._started = self._last_time = 0.0
+        self._last_step = 0
+        self._error = None # Raised by start if the server could not listen
+
+    @property
+    def port(self) -> Optional[int]:
+        """The port the server listens on, once started."""
+        return self._port
+
+    def start(self) -> None:
+        """Starts serving on a background thread. Returns once the server listens.
+        Raises the error of the server (an OSError, e.g. if the port is in use) if it could not listen.
+        """
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._error = None
+        ready = threading.Event()
+        self._thread = threading.Thread(target = self._serve, args = (ready,), name = "metrics", daemon = True)
+        self._thread.start()
+        ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._loop.close()
+            self._thread = self._loop = None
+            raise self._error
+
+    def stop(self) -> None:
+        """Stops serving and ends open streams.
+        """
+        if self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = self._loop = self._server = None
+
+    def _serve(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self._host, self._requested_port))
+            self._port = self._server.sockets[0].getsockname()[1]
+        except Exception as error: # Handed to start, as nothing would see it on this thread
+            self._error = error
+            return
+        finally:
+            ready.set()
+        self._loop.run_forever()
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        self._broadcast(None) # Ends the streams
+        others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if others:
+            await asyncio.wait(others, timeout = 1)
+        for task in others:
+            task.cancel()
+        await asyncio.gather(*others, return_exceptions = True)
+
+    def start_run(self, max_steps: int) -> None:
+        """Resets the metrics for a new run with the given maximum number of steps.
+        """
+        self._max_steps = max_steps
+        self._started = self._last_time = time.perf_counter()
+        self._last_step = 0
+
+    def publish_step(self, step: int, sim_stats: Any, phase_seconds: dict[str, float], force: bool = False) -> None:
+        """Publishes a snapshot of the run after a step, unless one was published less than an interval ago.
+
+        Parameters
+        ----------
+        step: The number of steps completed
+        sim_stats: An instance of the class "SimulationStats" from the module "results" being filled by the run
+        phase_seconds: The seconds spent so far in every phase of the steps (see PHASES)
+        force: If True, the snapshot is published even if the interval has not passed, e.g. after the last step
+        """
+        now = time.perf_counter()
+        if not force and now - self._last_time < self._interval:
+            return
+        rate = (step - self._last_step) / (now - self._last_time) if now > self._last_time else None
+        snapshot = {
+            "step": step,
+            "max_steps": self._max_steps,
+            "steps_per_second": rate,
+            "eta_seconds": max(0, self._max_steps - step) / rate if rate else None,
+            "elapsed_seconds": now - self._started,
+            "population": {},
+            "average_energy": {},
+            "phase_seconds": dict(phase_seconds)
+        }
+        for species in ("foxes", "rabbits"):
+            pop_stats = getattr(sim_stats, species)
+            if len(pop_stats.size_per_step):
+                snapshot["population"][species] = pop_stats.size_per_step[-1]
+                snapshot["average_energy"][species] = pop_stats.avg_energy_per_step[-1]
+        self._last_time = now
+        self._last_step = step
+        self._snapshot = snapshot # Read by the event loop; replacing a reference needs no lock
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._broadcast, snapshot)
+
+    def _broadcast(self, snapshot: Optional[dict[str, Any]]) -> None:
+        for queue in self._streams:
+            if queue.full(): # A slow client misses snapshots instead of holding them in memory
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip(): # Headers are not used
+                pass
+            parts = request.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else ""
+            if path == "/stream":
+                await self._stream(writer)
+                return
+            if path == "/metrics" and self._snapshot is not None:
+                status, kind, body = "200 OK", "text/plain; version=0.0.4", prometheus_text(self._snapshot)
+            elif path == "/metrics.json" and self._snapshot is not None:
+                status, kind, body = "200 OK", "application/json", json.dumps(self._snapshot)
+            elif path in ("/metrics", "/metrics.json"):
+                status, kind, body = "503 Service Unavailable", "text/plain", "No step finished yet\n"
+            else:
+                status, kind, body = "404 Not Found", "text/plain", "Not found\n"
+            data = body.encode()
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {kind}\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        queue = asyncio.Queue(maxsize = 16)
+        self._streams.add(queue)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+            if self._snapshot is not None:
+                writer.write(json.dumps(self._snapshot).encode() + b"\n")
+            await writer.drain()
+            while (snapshot := await queue.get()) is not None:
+                writer.write(json.dumps(snapshot).encode() + b"\n")
+                await writer.drain()
+        finally:
+            self._streams.discard(queue)
@@ -0,0 +1,258 @@
+"""
+Neighbour counts and densities computed once per step for the whole world.
+
+Instead of looking at the neighbouring patches of every animal, the foxes and rabbits are put on occupancy grids and
+the neighbours of every patch are counted at once by summing shifted copies of the grids. Densities over larger square
+windows are answered from summed-area tables of the grids. Toroid worlds wrap around at the borders. On island worlds
+the neighbours of a patch on the border are those of the next patch inwards, as in simulation.get_near_by_fields,
+while the windows of the summed-area tables are cut off at the border.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, entities as ents
+
+# Offsets (north-south, west-east) of the neighbours for each movement
+_OFFSETS = {
+    "rook": [(-1, 0), (0, -1), (0, 1), (1, 0)],
+    "bishop": [(-1, -1), (-1, 1), (1, -1), (1, 1)],
+    "queen": [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+}
+_MOVEMENTS = {"r": "rook", "b": "bishop", "q": "queen"}
+
+
+def movement_offsets(movement: str) -> list[tuple[int, int]]:
+    """Returns the offsets (north-south, west-east) of the neighbours for a movement ("queen" or "q", "rook" or "r",
+    "bishop" or "b").
+    """
+    movement = movement.lower()
+    return _OFFSETS[_MOVEMENTS.get(movement, movement)]
+
+
+def occupancy(world: list[list[ents.Patch]]) -> tuple[np.ndarray, np.ndarray]:
+    """Count the foxes and rabbits on every patch of the world.
+    The occupied patches are taken from entities.Patch.occupied if they are tracked, instead of looking through the world.
+
+    Parameters
+    ----------
+    world: A matrix representing the simulated world filled with patch entities
+
+    Return
+    ------
+    Two integer grids with the dimensions of the world, holding the number of foxes and of rabbits on each patch
+    """
+    foxes = np.zeros((len(world), len(world[0])), dtype = np.int32)
+    rabbits = np.zeros_like(foxes)
+    patches = ents.Patch.occupied
+    if patches is None:
+        patches = (patch for row in world for patch in row if patch.animals())
+    for patch in patches:
+        ns_pos, we_pos = patch.coordinates()
+        for animal in patch.animals():
+            if animal.species_code == ents.FOX:
+                foxes[ns_pos, we_pos] += 1
+            else:
+                rabbits[ns_pos, we_pos] += 1
+    return foxes, rabbits
+
+
+def first_animals(world: list[list[ents.Patch]]) -> tuple[np.ndarray, np.ndarray]:
+    """Find the patches whose first animal is a fox or a rabbit.
+    Animals only look at the first animal of a patch when they check it for mates or predators
+    (see entities.Animal.same_species_in).
+
+    Parameters
+    ----------
+    world: A matrix representing the simulated world filled with patch entities
+
+    Return
+    ------
+    Two boolean grids with the dimensions of the world, flagging the patches whose first animal is a fox and those whose
+    first animal is a rabbit
+    """
+    foxes = np.zeros((len(world), len(world[0])), dtype = bool)
+    rabbits = np.zeros_like(foxes)
+    patches = ents.Patch.occupied
+    if patches is None:
+        patches = (patch for row in world for patch in row if patch.animals())
+    for patch in patches:
+        animals = patch.animals()
+        if animals:
+            if animals[0].species_code == ents.FOX:
+                foxes[patch.coordinates()] = True
+            else:
+                rabbits[patch.coordinates()] = True
+    return foxes, rabbits
+
+
+def _island_centres(length: int) -> np.ndarray:
+    """Returns the position along one axis of an island world whose neighbours every position takes.
+    Positions on the border take the neighbours of the next position inwards, as in simulation.get_near_by_fields.
+    """
+    centres = np.arange(length)
+    centres[centres == 0] = 1
+    centres[centres == length - 1] = length - 2
+    return centres
+
+
+def neighbour_sum(grid: np.ndarray, movement: str, is_toroid: bool) -> np.ndarray:
+    """Count for every patch the neighbours flagged in a grid.
+
+    Parameters
+    ----------
+    grid: A boolean or integer grid with the dimensions of the world
+    movement: Movement that defines neighbours can be either
+        - Queen: "queen" or "q"
+        - Rook: "rook" or "r"
+        - Bishop: "bishop" or "b"
+    is_toroid: Whether the world wraps around at its borders (toroid) or not (island). On island worlds the
+        neighbours of a patch on the border are those of the next patch inwards (see simulation.get_near_by_fields).
+
+    Return
+    ------
+    An integer grid holding the sum over the neighbours of every patch
+    """
+    movement = movement.lower()
+    offsets = movement_offsets(movement)
+    nsl, wel = grid.shape
+    grid = grid.astype(np.int32)
+    total = np.zeros((nsl, wel), dtype = np.int32)
+    for ns_offset, we_offset in offsets:
+        total += np.roll(grid, (-ns_offset, -we_offset), axis = (0, 1))
+    if not is_toroid:
+        total = total[np.ix_(_island_centres(nsl), _island_centres(wel))]
+    return total
+
+
+class NeighbourFields:
+    """
+    Neighbour counts of every patch, taken at the moment the instance is created.
+
+    Answers the questions asked by reproduce_animal and move_animal in the module simulation with a single lookup.
+    At the moment the instance is created, the answers are those of looking at the neighbouring patches
+    (see gate_misses in the module golden). The counts are not updated when animals move, are born or die later in the
+    same step.
+
+    Parameters
+    ----------
+    - world: A matrix representing the simulated world filled with patch entities
+    - params: An instance of the class "Simulation" from the module "parameters"
+    - movement: Movement that defines neighbours when moving (reproduction always uses queen movement)
+    """
+    __slots__ = [
+        "_mates",
+        "_predators",
+        "_empty",
+        "_free",
+        "_may_reproduce",
+        "_may_move"
+    ]
+
+    def __init__(self, world: list[list[ents.Patch]], params: parameters.Simulation, movement: str):
+        is_toroid = params.world.is_toroid
+        # Like the animals themselves, only the first animal of every patch is looked at
+        foxes, rabbits = first_animals(world)
+
+        # Reproduction: mates are on patches without predators, newborns go to empty patches
+        self._mates = {ents.FOX: neighbour_sum(foxes, "q", is_toroid),
+                       ents.RABBIT: neighbour_sum(rabbits, "q", is_toroid)}
+        self._predators = {ents.FOX: np.zeros_like(self._mates[ents.FOX]),
+                           ents.RABBIT: neighbour_sum(foxes, "q", is_toroid)}
+        self._empty = neighbour_sum(~(foxes | rabbits), "q", is_toroid)
+        # Moving: animals move to patches whose first animal is not of their own species
+        self._free = {ents.FOX: neighbour_sum(~foxes, movement, is_toroid),
+                      ents.RABBIT: neighbour_sum(~rabbits, movement, is_toroid)}
+        # The combined answers as nested lists, which are faster to index one patch at a time than arrays
+        self._may_reproduce = {code: ((self._mates[code] > 0) & (self._empty > 0)).tolist() for code in self._mates}
+        self._may_move = {code: (self._free[code] > 0).tolist() for code in self._free}
+
+    def has_mate(self, animal: ents.Animal) -> bool:
+        """Returns True if a neighbouring patch holds an animal of the same species and no predator, False otherwise.
+        """
+        return self._mates[animal.species_code][animal.patch().coordinates()] > 0
+
+    def may_reproduce(self, animal: ents.Animal) -> bool:
+        """Returns True if the animal has a mate nearby and an empty neighbouring patch for a newborn, False otherwise.
+        """
+        ns_pos, we_pos = animal.patch().coordinates()
+        return self._may_reproduce[animal.species_code][ns_pos][we_pos]
+
+    def may_move(self, animal: ents.Animal) -> bool:
+        """Returns True if the animal has a neighbouring patch to move to, False otherwise.
+        """
+        ns_pos, we_pos = animal.patch().coordinates()
+        return self._may_move[animal.species_code][ns_pos][we_pos]
+
+    def has_predator(self, animal: ents.Animal) -> bool:
+        """Returns True if a neighbouring patch holds a predator of the animal, False otherwise.
+        """
+        return self._predators[animal.species_code][animal.patch().coordinates()] > 0
+
+    def empty_neighbours(self, animal: ents.Animal) -> int:
+        """Returns the number of neighbouring patches without any animal.
+        """
+        return int(self._empty[animal.patch().coordinates()])
+
+    def free_neighbours(self, animal: ents.Animal) -> int:
+        """Returns the number of neighbouring patches (by movement) without an animal of the same species.
+        """
+        return int(self._free[animal.species_code][animal.patch().coordinates()])
+
+
+def _window_ranges(center: int, radius: int, length: int, wrap: bool) -> list[tuple[int, int]]:
+    """Returns the half-open ranges covered by a window of the given radius along one axis of the world.
+    A window wrapping around a toroid world is split in two ranges. A window longer than the world covers it once.
+    """
+    start = center - radius
+    end = center + radius + 1
+    if not wrap:
+        return [(max(0, start), min(length, end))]
+    if end - start >= length:
+        return [(0, length)]
+    if start < 0:
+        return [(start + length, length), (0, end)]
+    if end > length:
+        return [(start, length), (0, end - length)]
+    return [(start, end)]
+
+
+class SummedAreaTable:
+    """
+    A summed-area table of a grid, answering the sum over any square window of the grid in constant time.
+
+    Parameters
+    ----------
+    - grid: An integer grid with the dimensions of the world (e.g. from occupancy)
+    - is_toroid: Whether windows wrap around the borders of the world (toroid) or are cut off at them (island)
+    """
+    __slots__ = [
+        "_table",
+        "_north_south_length",
+        "_west_east_length",
+        "_is_toroid"
+    ]
+
+    def __init__(self, grid: np.ndarray, is_toroid: bool):
+        nsl, wel = grid.shape
+        table = np.zeros((nsl + 1, wel + 1), dtype = np.int64)
+        table[1:, 1:] = grid.cumsum(axis = 0).cumsum(axis = 1)
+        self._table = table.tolist() # Nested lists are faster to index one value at a time than arrays
+        self._north_south_length = nsl
+        self._west_east_length = wel
+        self._is_toroid = is_toroid
+
+    def _rectangle(self, ns_start: int, ns_end: int, we_start: int, we_end: int) -> int:
+        table = self._table
+        return table[ns_end][we_end] - table[ns_start][we_end] - table[ns_end][we_start] + table[ns_start][we_start]
+
+    def window(self, ns_pos: int, we_pos: int, radius: int) -> int:
+        """Returns the sum over the square window of the given radius centred on a patch.
+        """
+        total = 0
+        for ns_start, ns_end in _window_ranges(ns_pos, radius, self._north_south_length, self._is_toroid):
+            for we_start, we_end in _window_ranges(we_pos, radius, self._west_east_length, self._is_toroid):
+                total += self._rectangle(ns_start, ns_end, we_start, we_end)
+        return total
@@ -2,8 +2,11 @@ import sys
 import os
 sys.path.append(os.path.join("..", "classes"))
 from results import SimulationStats
-from matplotlib import pyplot as plt
-import numpy as np
+import worlds
+# NumPy and matplotlib are imported by the functions using them, so importing this module loads neither
+
+PLOT_POINTS = 4000 # The largest number of points drawn for a series, however long the run (see module series)
+KILL_CELLS = 500 # The largest number of cells drawn along a side of the map of kills; larger maps are drawn in blocks
 
 def print_summary(results: SimulationStats) -> None:
   """
@@ -48,9 +51,12 @@ def print_summary(results: SimulationStats) -> None:
     """
     print(_format_cell(cell_1, col_1, padding= "r") + _format_cell(cell_2, col_2) + _format_cell(cell_3, col_3) + _format_cell(cell_4, col_4))
   
+  import numpy as np
   # Save objecs on variables for readability
   fox_stats = results.foxes
   rabbit_stats = results.rabbits
+  fox_sizes = np.asarray(fox_stats.size_per_step)
+  rabbit_sizes = np.asarray(rabbit_stats.size_per_step)
   
   #------- Print table -------
   # Header
@@ -61,18 +67,18 @@ def print_summary(results: SimulationStats) -> None:
   __print_row("Individuals", str(fox_stats.total), str(rabbit_stats.total),
                 str(fox_stats.total + rabbit_stats.total))
   # Row 2
-  step_fewest_foxes = min(fox_stats.size_per_step)
-  step_fewest_rabbits = min(rabbit_stats.size_per_step)
+  step_fewest_foxes = int(fox_sizes.min())
+  step_fewest_rabbits = int(rabbit_sizes.min())
   __print_row(" min. energy", str(step_fewest_foxes), str(step_fewest_rabbits),
               str(step_fewest_foxes + step_fewest_rabbits))
   # Row 3
-  step_most_foxes = max(fox_stats.size_per_step)
-  step_most_rabbits = max(rabbit_stats.size_per_step)
+  step_most_foxes = int(fox_sizes.max())
+  step_most_rabbits = int(rabbit_sizes.max())
   __print_row(" max. energy", str(step_most_foxes), str(step_most_rabbits),
               str(step_most_foxes + step_most_rabbits))
   # Row 4
-  avg_foxes = round(sum(fox_stats.size_per_step)/len(fox_stats.size_per_step), 2)
-  avg_rabbits = round(sum(rabbit_stats.size_per_step)/len(rabbit_stats.size_per_step), 2)
+  avg_foxes = round(float(fox_sizes.mean()), 2)
+  avg_rabbits = round(float(rabbit_sizes.mean()), 2)
   avg_total = round(avg_foxes + avg_rabbits, 2)
   __print_row(" avg. energy", str(avg_foxes), str(avg_rabbits),
               str(avg_total))        
@@ -97,91 +103,169 @@ def print_summary(results: SimulationStats) -> None:
   # Line break
   _line_break(col_1, col_2, col_3, col_4)  
 
-def plot_pop_size(results: SimulationStats) -> None:
+def _plot_series(ax, values_per_line, labels, colors) -> None:
   """
-  Plots population sizes against time. 
+  Draws long per-step series with at most PLOT_POINTS points each, keeping their peaks and troughs
+  (see series.SeriesPyramid). Zooming in redraws the visible steps in more detail.
+  """
+  import series
+  pyramids = [series.SeriesPyramid(values) for values in values_per_line]
+  lines = []
+  for pyramid, label, color in zip(pyramids, labels, colors):
+    steps, values = pyramid.view(0, len(pyramid), PLOT_POINTS)
+    lines += ax.plot(steps, values, label = label, color = color)
+
+  def _on_zoom(ax):
+    start, stop = ax.get_xlim()
+    for pyramid, line in zip(pyramids, lines):
+      line.set_data(*pyramid.view(start - 1, stop + 2, PLOT_POINTS))
+  ax.callbacks.connect("xlim_changed", _on_zoom)
+
+def draw_pop_size(fig, results: SimulationStats) -> None:
   """
-  # Plot
-  plt.figure()
-  combined_pop = [r_size + f_size for r_size, f_size in zip(results.rabbits.size_per_step, results.foxes.size_per_step)]
-  plt.plot(results.rabbits.size_per_step, label = "Rabbits", color="cyan")
-  plt.plot(results.foxes.size_per_step, label = "Foxes", color="orange")
-  plt.plot(combined_pop, label = "Combined population", color = "green")
+  Draws population sizes against time on an empty matplotlib figure.
+  """
+  import numpy as np
+  ax = fig.add_subplot()
+  rabbit_sizes = np.asarray(results.rabbits.size_per_step)
+  fox_sizes = np.asarray(results.foxes.size_per_step)
+  _plot_series(ax, [rabbit_sizes, fox_sizes, rabbit_sizes + fox_sizes],
+               ["Rabbits", "Foxes", "Combined population"], ["cyan", "orange", "green"])
   # Legend and labels
-  plt.legend()
-  plt.ylabel("Population Size")
-  plt.xlabel("Simulation Step")
-  plt.title("Population Size pr. step")
-  plt.show()
+  ax.legend()
+  ax.set_ylabel("Population Size")
+  ax.set_xlabel("Simulation Step")
+  ax.set_title("Population Size pr. step")
 
-def plot_lifespan(results: SimulationStats) -> None:
+def draw_lifespan(fig, results: SimulationStats) -> None:
   """
-  Plots lifespans across population idividuals. 
+  Draws lifespans across population idividuals on an empty matplotlib figure.
   """
-   # Plot
-  fig, (ax1, ax2) = plt.subplots(2,1)
+  import numpy as np
+  ax1, ax2 = fig.subplots(2,1)
   fig.suptitle('Lifespan Foxes and Rabbits')
 
   # Rabbits plot
-  bin_r = np.arange(0, max(results.rabbits.age_at_death) + 1) + 0.5
+  # The deaths at every age are counted once and drawn as bars, instead of binning every death
+  deaths_r = np.bincount(np.asarray(results.rabbits.age_at_death, dtype = np.int64))
   # Plot and ticks
-  ax1.hist(results.rabbits.age_at_death, bins = bin_r, ec="grey", color="cyan")
-  ax1.set_xticks(range(max(results.rabbits.age_at_death) + 1))
+  ax1.bar(np.arange(1, len(deaths_r)), deaths_r[1:], width = 1, ec="grey", color="cyan")
+  ax1.set_xticks(range(len(deaths_r)))
   # Labels and title
   ax1.set_ylabel("Frequency")
   ax1.title.set_text("Rabbits")
 
   # Foxes plot
-  bin_f = np.arange(0, max(results.foxes.age_at_death) + 1) + 0.5
+  deaths_f = np.bincount(np.asarray(results.foxes.age_at_death, dtype = np.int64))
   # Plot and ticks
-  ax2.hist(results.foxes.age_at_death, bins = bin_f, ec="grey", color="orange")
-  ax2.set_xticks(range(max(results.foxes.age_at_death) + 1))
+  ax2.bar(np.arange(1, len(deaths_f)), deaths_f[1:], width = 1, ec="grey", color="orange")
+  ax2.set_xticks(range(len(deaths_f)))
   # Labels and title
   ax2.set_ylabel("Frequency")
   ax2.set_xlabel("Age at death")
   ax2.title.set_text("Foxes")
-  plt.show()
 
-  
+def draw_energy(fig, results: SimulationStats) -> None:
+  """
+  Draws the average energy per step on an empty matplotlib figure.
+  """
+  ax = fig.add_subplot()
+  _plot_series(ax, [results.foxes.avg_energy_per_step, results.rabbits.avg_energy_per_step,
+                    results.avg_energy_per_step],
+               ["Foxes", "Rabbits", "Total"], ["orange", "cyan", "green"])
+  # Legend and labels
+  ax.legend()
+  ax.set_ylabel("Average Energy")
+  ax.set_xlabel("Simulation Step")
+  ax.set_title("Energy per step")
 
-def plot_energy(results: SimulationStats) -> None:
+def _kills_grid(kills_per_patch) -> tuple:
   """
-  Plots the total energry over the life of eah individual. 
+  Returns the kills as a grid of at most KILL_CELLS cells along each side, the size of the square block of patches
+  summed in every cell, and the north-south and west-east positions of the edges of the cells.
+  Kills stored sparsely (see worlds.SparseCounts) are only drawn over the patches around the stored kills, without
+  building a grid of the whole world.
   """
+  import numpy as np
+  if isinstance(kills_per_patch, worlds.SparseCounts):
+    stored = np.array([(ns_pos, we_pos, count) for (ns_pos, we_pos), count in kills_per_patch.items() if count],
+                      dtype = np.int64).reshape(-1, 3)
+    if not len(stored):
+      return np.zeros((1, 1)), 1, np.arange(2), np.arange(2)
+    ns_first, we_first = stored[:, 0].min(), stored[:, 1].min()
+    height = stored[:, 0].max() - ns_first + 1
+    width = stored[:, 1].max() - we_first + 1
+    block = -(-max(height, width) // KILL_CELLS) # Rounded up
+    grid = np.zeros((-(-height // block), -(-width // block)), dtype = np.int64)
+    np.add.at(grid, ((stored[:, 0] - ns_first) // block, (stored[:, 1] - we_first) // block), stored[:, 2])
+  else:
+    grid = np.asarray(kills_per_patch)
+    ns_first = we_first = 0
+    block = -(-max(grid.shape) // KILL_CELLS)
+    if block > 1:
+      grid = np.add.reduceat(grid, np.arange(0, grid.shape[0], block), axis = 0)
+      grid = np.add.reduceat(grid, np.arange(0, grid.shape[1], block), axis = 1)
+  ns_edges = ns_first + block * np.arange(grid.shape[0] + 1)
+  we_edges = we_first + block * np.arange(grid.shape[1] + 1)
+  return grid, block, ns_edges, we_edges
 
-  #Plot
-  plt.figure()
-  plt.plot(results.foxes.avg_energy_per_step, label = "Foxes", color="orange")
-  plt.plot(results.rabbits.avg_energy_per_step, label = "Rabbits", color="cyan")
-  plt.plot(results.avg_energy_per_step, label = "Total", color = "green")
-  # Legend and labels
-  plt.legend()
-  plt.ylabel("Average Energy")
-  plt.xlabel("Simulation Step")
-  plt.title("Energy per step")
-  plt.show()
-  
-def plot_kills(results: SimulationStats) -> None:
+def draw_kills(fig, results: SimulationStats) -> None:
   """
-  Displays the distribution of kills
+  Draws the distribution of kills on an empty matplotlib figure.
+  Big worlds are drawn in square blocks of patches, and kills stored sparsely only around the patches with kills.
   """
+  ax = fig.add_subplot()
   # Colormap and Colobar
-  max_kills = max([max(row) for row in results.kills_per_patch]) # Used for setting the ticks in the colorbar
-  min_kills = min([min(row) for row in results.kills_per_patch])
-  plt.figure() # Initialize
-  plt.pcolormesh(results.kills_per_patch, cmap="binary") # Colormap
-  plt.colorbar(ticks = range(min_kills, max_kills + 1), label = "Amount of Kills")
+  kills, block, ns_edges, we_edges = _kills_grid(results.kills_per_patch)
+  max_kills = int(kills.max()) # Used for setting the ticks in the colorbar
+  min_kills = int(kills.min())
+  mesh = ax.pcolormesh(we_edges, ns_edges, kills, cmap="binary") # Colormap
+  if block == 1:
+    fig.colorbar(mesh, ax = ax, ticks = range(min_kills, max_kills + 1), label = "Amount of Kills")
+  else:
+    fig.colorbar(mesh, ax = ax, label = f"Amount of Kills per {block}x{block} patches")
   
   # Title and labels
-  plt.title("Spatial distribution of deaths by predation")
-  plt.ylabel("South <---------------> North")
-  plt.xlabel("West <---------------> East")
+  ax.set_title("Spatial distribution of deaths by predation")
+  ax.set_ylabel("South <---------------> North")
+  ax.set_xlabel("West <---------------> East")
   
   # Ticks - remove them
-  plt.xticks(ticks = [])
-  plt.yticks(ticks = [])
+  ax.set_xticks([])
+  ax.set_yticks([])
+
+def _show(draw, results: SimulationStats) -> None:
+  """
+  Draws on a new figure and shows it in a window.
+  """
+  from matplotlib import pyplot as plt
+  draw(plt.figure(), results)
   plt.show()
 
+def plot_pop_size(results: SimulationStats) -> None:
+  """
+  Plots population sizes against time. 
+  """
+  _show(draw_pop_size, results)
+
+def plot_lifespan(results: SimulationStats) -> None:
+  """
+  Plots lifespans across population idividuals. 
+  """
+  _show(draw_lifespan, results)
+
+def plot_energy(results: SimulationStats) -> None:
+  """
+  Plots the total energry over the life of eah individual. 
+  """
+  _show(draw_energy, results)
+  
+def plot_kills(results: SimulationStats) -> None:
+  """
+  Displays the distribution of kills
+  """
+  _show(draw_kills, results)
+
 if __name__ == "__main__":
   pass
 
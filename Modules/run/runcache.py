@@ -0,0 +1,202 @@
+"""
+A local cache of completed runs of the simulation, shared between the menu and batch jobs.
+
+A run is addressed by a hash of everything that decides its outcome: the world and population parameters, the maximum
+number of steps, the seed, the movement, the options of simulation.run and the model constants of the entity classes.
+Running again with the same values loads the statistics from the cache instead of simulating. Runs without a seed
+differ every time and are never cached.
+
+Every run is stored as a pickle of its statistics next to a small JSON description, used for listing the runs to
+reopen them later. When the cache grows beyond its size limit, the runs used least recently are removed first.
+Several processes may use the same directory at once, so runs removed by another process while listing them are
+skipped.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import time
+from typing import Any, Optional
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, results as res, entities as ents
+import neighbours, simulation, stopping
+
+_FORMAT = 2 # Changes whenever the stored statistics or the key change, so old runs are not loaded
+# Options of simulation.run that watch or speed up a run without changing its statistics
+_OBSERVERS = ("metrics", "progress_file", "observe", "pooling", "gc_freeze", "template")
+# The default options of simulation.run, so leaving an option out and passing its default give the same key
+_DEFAULTS = {name: parameter.default for name, parameter in inspect.signature(simulation.run).parameters.items()
+             if parameter.default is not inspect.Parameter.empty and name not in ("movement", "seed")}
+
+
+def _model_constants() -> dict[str, Any]:
+    """Returns the constants of the entity classes that change the outcome of a run (see entities.Fox).
+    """
+    return {
+        "grass": (ents.Patch.min_grass_growth, ents.Patch.max_grass_growth, ents.Patch.max_grass_amount),
+        "foxes": (ents.Fox.food_energy_per_unit, ents.Fox.reproduction_cost_rate),
+        "rabbits": (ents.Rabbit.feeding_metabolism_rate, ents.Rabbit.reproduction_cost_rate)
+    }
+
+
+class RunCache:
+    """
+    A directory of completed runs with a size limit, evicting the runs used least recently.
+
+    Parameters
+    ----------
+    - directory: Where the runs are stored. Created when the first run is stored.
+    - max_bytes: The largest total size of the stored runs
+    """
+    __slots__ = [
+        "_directory",
+        "_max_bytes"
+    ]
+
+    def __init__(self, directory: str = "run_cache", max_bytes: int = 200 * 2**20):
+        self._directory = directory
+        self._max_bytes = max_bytes
+
+    def key(self, params: parameters.Simulation, seed: int, movement: str, **options: Any) -> str:
+        """Returns the address of a run: a hash of the parameters, seed, movement and options of simulation.run.
+        The step delay and the execution mode are left out, as they do not change the statistics. Options not given
+        are taken at their defaults.
+        """
+        options = {**_DEFAULTS, **options}
+        options["stop"] = options["stop"] or None # No conditions, however they are given
+        content = repr((
+            _FORMAT,
+            repr(params.world),
+            repr(params.rabbits),
+            repr(params.foxes),
+            params.execution.max_steps,
+            seed,
+            neighbours.movement_offsets(movement),
+            sorted((name, repr(value)) for name, value in options.items() if name not in _OBSERVERS),
+            _model_constants()
+        ))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self._directory, f"{key}.{extension}")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key, "pickle"))
+
+    def load(self, key: str) -> Optional[res.SimulationStats]:
+        """Returns the statistics of a stored run, None if the run is not in the cache.
+        The run counts as used, which keeps it from being evicted.
+        """
+        path = self._path(key, "pickle")
+        try:
+            with open(path, "rb") as file:
+                sim_stats = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError: # Evicted by another process meanwhile
+            pass
+        return sim_stats
+
+    def store(self, key: str, sim_stats: res.SimulationStats, description: dict[str, Any]) -> None:
+        """Stores the statistics of a run with a description of it, then evicts the runs used least recently until the
+        cache fits its size limit again.
+        """
+        os.makedirs(self._directory, exist_ok = True)
+        with open(self._path(key, "json"), "w") as file:
+            json.dump(description, file)
+        # Written under another name first, so a run is never loaded half written
+        path = self._path(key, "pickle")
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(sim_stats, file, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        self._evict(keep = key)
+
+    def _evict(self, keep: str) -> None:
+        """Removes the runs used least recently until the cache fits its size limit. The given run is kept.
+        """
+        runs = []
+        total = 0
+        for name in os.listdir(self._directory):
+            key, extension = os.path.splitext(name)
+            if extension != ".pickle":
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                size = os.path.getsize(path) + os.path.getsize(self._path(key, "json"))
+                runs.append((os.path.getmtime(path), size, key))
+            except FileNotFoundError: # Evicted by another process meanwhile
+                continue
+            total += size
+        for _, size, key in sorted(runs):
+            if total <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            for extension in ("pickle", "json"):
+                try:
+                    os.remove(self._path(key, extension))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def entries(self) -> list[tuple[str, dict[str, Any]]]:
+        """Returns the key and description of every stored run, the runs used most recently first.
+        """
+        if not os.path.isdir(self._directory):
+            return []
+        runs = []
+        for name in os.listdir(self._directory):
+            key, extension = os.path.splitext(name)
+            if extension != ".pickle":
+                continue
+            try:
+                with open(self._path(key, "json")) as file:
+                    description = json.load(file)
+                runs.append((os.path.getmtime(os.path.join(self._directory, name)), key, description))
+            except FileNotFoundError: # Evicted by another process meanwhile
+                continue
+        return [(key, description) for _, key, description in sorted(runs, reverse = True)]
+
+    def run(self,
+            params: parameters.Simulation,
+            seed: Optional[int],
+            movement: str,
+            **options: Any) -> res.SimulationStats:
+        """Runs the simulation (see simulation.run), or loads the run from the cache if it was run before.
+
+        Parameters
+        ----------
+        params: An instance of the class "Simulation" from the module "parameters"
+        seed: Seed for the random number generators. Runs without a seed are not cached.
+        movement: Movement that defines neighbours (see simulation.update_entities)
+        options: Further keyword arguments of simulation.run. Runs stopped by a time budget are not cached, as their
+            length depends on the speed of the machine, nor runs filling an event log or observed step by step, which a
+            cached run would leave empty or never call. Live metrics are only published when the run is not loaded from the cache.
+
+        Return
+        ----------
+        An instance of the class "SimulationStats" from the module "results".
+        """
+        stop = options.get("stop") or []
+        if (seed is None or options.get("event_log") is not None or options.get("observe") is not None
+                or any(isinstance(condition, stopping.TimeBudget) for condition in stop)):
+            return simulation.run(params, movement = movement, seed = seed, **options)
+        key = self.key(params, seed, movement, **options)
+        sim_stats = self.load(key)
+        if sim_stats is None:
+            sim_stats = simulation.run(params, movement = movement, seed = seed, **options)
+            self.store(key, sim_stats, {
+                "parameters": str(params),
+                "seed": seed,
+                "movement": movement,
+                "options": {name: repr(value) for name, value in options.items() if name not in _OBSERVERS},
+                "steps": sim_stats.steps,
+                "stop_reason": sim_stats.stop_reason
+            })
+        return sim_stats
@@ -0,0 +1,109 @@
+"""
+Long per-step series reduced to a few points for plotting, keeping their shape.
+
+A series is cut into buckets of consecutive steps and every bucket is drawn by its lowest and its highest value, in the
+order they occur, so the peaks and troughs of the populations stay visible however long the run was. A pyramid keeps
+the series at resolutions halving from one level to the next, so a zoomed-in view is drawn from the coarsest level
+that still shows enough detail instead of going through every step again.
+"""
+from typing import Sequence
+
+import numpy as np
+
+
+def _interleave(min_steps: np.ndarray, min_values: np.ndarray,
+                max_steps: np.ndarray, max_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the lowest and highest points of every bucket as a single series, in the order they occur.
+    """
+    steps = np.stack([min_steps, max_steps], axis = 1)
+    values = np.stack([min_values, max_values], axis = 1)
+    order = np.argsort(steps, axis = 1, kind = "stable")
+    return np.take_along_axis(steps, order, axis = 1).ravel(), np.take_along_axis(values, order, axis = 1).ravel()
+
+
+def downsample(values: Sequence[float], points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reduces a series to at most the given number of points by keeping the lowest and the highest value of every
+    bucket of consecutive steps.
+
+    Parameters
+    ----------
+    values: A value for every step (e.g. PopulationStats.size_per_step)
+    points: The largest number of points to keep (at least 2)
+
+    Return
+    ------
+    The steps and the values of the points kept, in order of steps. Series with no more than the given number of
+    points are kept whole.
+    """
+    values = np.asarray(values, dtype = float)
+    length = len(values)
+    if length <= points:
+        return np.arange(length), values
+    size = -(-length // (points // 2)) # Steps per bucket, rounded up
+    padded = np.full(-(-length // size) * size, np.nan) # The last bucket is filled up with NaN, which is ignored
+    padded[:length] = values
+    buckets = padded.reshape(-1, size)
+    starts = np.arange(len(buckets)) * size
+    min_steps = starts + np.nanargmin(buckets, axis = 1)
+    max_steps = starts + np.nanargmax(buckets, axis = 1)
+    return _interleave(min_steps, values[min_steps], max_steps, values[max_steps])
+
+
+class SeriesPyramid:
+    """
+    A series kept at several resolutions, for drawing any range of steps with few points.
+
+    Level 0 holds every step. Every following level has buckets twice as long, each holding the lowest and the highest
+    value of the two buckets below it with their steps.
+
+    Parameters
+    ----------
+    - values: A value for every step (e.g. PopulationStats.size_per_step)
+    """
+    __slots__ = [
+        "_levels",
+        "_length"
+    ]
+
+    def __init__(self, values: Sequence[float]):
+        values = np.asarray(values, dtype = float)
+        steps = np.arange(len(values))
+        self._length = len(values)
+        self._levels = [(steps, values, steps, values)]
+        while len(self._levels[-1][0]) > 1:
+            merged = []
+            for steps, values, pick_lower in ((self._levels[-1][0], self._levels[-1][1], True),
+                                              (self._levels[-1][2], self._levels[-1][3], False)):
+                if len(steps) % 2:
+                    steps = np.append(steps, steps[-1])
+                    values = np.append(values, values[-1])
+                first, second = values[0::2], values[1::2]
+                take_second = second < first if pick_lower else second > first
+                merged += [np.where(take_second, steps[1::2], steps[0::2]), np.where(take_second, second, first)]
+            self._levels.append(tuple(merged))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def view(self, start: int, stop: int, points: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns at most about the given number of points drawing the steps from start up to stop.
+
+        Return
+        ------
+        The steps and the values of the points, in order of steps
+        """
+        start = max(0, int(start))
+        stop = min(self._length, int(stop))
+        if stop <= start:
+            return np.arange(0), np.arange(0, dtype = float)
+        # The finest level drawing the range with at most the given number of points: one point per bucket on level 0,
+        # two on the levels above it
+        level = 0
+        while level + 1 < len(self._levels) and (stop - start) >> level > (points if level == 0 else points // 2):
+            level += 1
+        first = start >> level
+        last = -(-stop >> level) # Rounded up
+        min_steps, min_values, max_steps, max_values = (array[first:last] for array in self._levels[level])
+        if level == 0:
+            return min_steps, min_values
+        return _interleave(min_steps, min_values, max_steps, max_values)
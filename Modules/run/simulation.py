@@ -1,13 +1,19 @@
 """
 Authors: @Merete, @Christoffer, @Andreas
 """
+import contextlib
+import gc
 import os
 import sys
 import random
-from typing import Any, Tuple
+import time
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+import numpy as np
 
 sys.path.append(os.path.join("..", "classes"))
-import parameters, visualiser, results as res, entities as ents
+import parameters, visualiser, results as res, entities as ents, worlds, calendars
+import neighbours, stopping, eventlog, metrics as mtr
 
 
 # Creating an empty world using parameters for 
@@ -26,12 +32,40 @@ def create_world(params: parameters.Simulation) -> list[list[0]]:
     nsl = params.world.north_south_length
     wel = params.world.west_east_length
     
-    return [[field for col in range(wel)] for row in range(nsl)]
+    return [[field] * wel for row in range(nsl)]
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pauses the cyclic garbage collector while many objects are created at once.
+    Otherwise the collector runs over the growing world again and again.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _no_clock() -> float:
+    """Stands in for time.perf_counter in the steps of runs whose phases are not timed (see run).
+    """
+    return 0.0
+
+
+def _bulk_rng() -> np.random.Generator:
+    """Returns a NumPy generator for drawing values in bulk.
+    It is seeded from the random module, so random.seed() also fixes the bulk draws.
+    """
+    return np.random.default_rng(random.getrandbits(64))
 
 
 # Filling the empty world with patches
 def fill_world(empty_world: list[list[0]]) -> None:
     """Fill an empty world with Patches
+    The grass of every patch is drawn in one go and each row is built in a single pass.
     
     Parameters
     ----------
@@ -41,15 +75,38 @@ def fill_world(empty_world: list[list[0]]) -> None:
     ---------
     No return value
     """
-    ns_pos = 0 #North-South position
-    for row in empty_world:
-        we_pos = 0 #West-East position
-        for field in row:
-            empty_world[ns_pos][we_pos] = ents.Patch(ns_pos, we_pos)
-            we_pos += 1     
-        ns_pos +=1
+    nsl = len(empty_world)
+    wel = len(empty_world[0])
+    grass = _bulk_rng().integers(0, ents.Patch.max_grass_amount + 1, size = nsl * wel).tolist()
+    we_positions = list(range(wel)) # Reused by every row, so the coordinates are shared between patches
+    with _gc_paused():
+        for ns_pos in range(nsl):
+            row_grass = grass[ns_pos * wel:(ns_pos + 1) * wel]
+            empty_world[ns_pos] = [ents.Patch(ns_pos, we_pos, patch_grass)
+                                   for we_pos, patch_grass in zip(we_positions, row_grass)]
+
+
+def refill_world(world: list[list[ents.Patch]]) -> None:
+    """Empties the patches of a world filled earlier and draws their grass again, for reusing the world in another
+    run instead of creating new patches (see the module templates).
+    The grass is drawn exactly as by fill_world, so after the same seed both worlds are the same.
+
+    Parameters
+    ----------
+    world: A matrix representing the simulated world filled with patch entities.
+
+    Return
+    ---------
+    No return value
+    """
+    nsl = len(world)
+    wel = len(world[0])
+    grass = _bulk_rng().integers(0, ents.Patch.max_grass_amount + 1, size = nsl * wel).tolist()
+    for ns_pos, row in enumerate(world):
+        for patch, patch_grass in zip(row, grass[ns_pos * wel:(ns_pos + 1) * wel]):
+            patch.reset(patch_grass)
+
 
-        
 # Get random field in world
 def get_rand_field(world: list[list[ents.Patch]]) -> tuple:
     """Returns a random field from the world and its coordinates.
@@ -72,6 +129,8 @@ def get_rand_field(world: list[list[ents.Patch]]) -> tuple:
 # Filling the patches with entities
 def populate_world(params: parameters.Simulation, world: list[list[ents.Patch]]) -> None:
     """Function to populate an empty world with patches
+    The fields of each population are drawn in one go by sampling without replacement over the flattened world,
+    so no two animals of the same species start on the same field.
 
     Parameters
     ------------
@@ -83,24 +142,26 @@ def populate_world(params: parameters.Simulation, world: list[list[ents.Patch]])
     No return value 
     """
     # Helper function for creating new animals
-    def _create_animals(population: str, world: list[list[ents.Patch]]) -> None:
-        coords_animals = []
-        for animal in range(population.initial_size):
-            # Get empty coordinate for animal
-            field_animal = get_rand_field(world)
-            while field_animal.coordinates() in coords_animals:
-                field_animal = get_rand_field(world)        
-            # Create animal depending on population
-            if population.species == "foxes":
-                fox = ents.Fox(population, field_animal, random.randint(0, population.max_age))
-            else: 
-                rabbit = ents.Rabbit(population, field_animal, random.randint(0, population.max_age))
-            coords_animals.append(field_animal.coordinates())
+    def _create_animals(population: parameters.Population, world: list[list[ents.Patch]]) -> None:
+        wel = len(world[0])
+        rng = _bulk_rng()
+        fields = rng.choice(len(world) * wel, size = population.initial_size, replace = False)
+        fields = np.sort(fields).tolist() # Visit the world in row-major order
+        ages = rng.integers(0, population.max_age + 1, size = population.initial_size).tolist()
+        # Create animals depending on population
+        if population.species == "foxes":
+            animal_class = ents.Fox
+        else:
+            animal_class = ents.Rabbit
+        for field, age in zip(fields, ages):
+            ns_pos, we_pos = divmod(field, wel)
+            animal_class(population, world[ns_pos][we_pos], age)
       
-    foxes = params.foxes
-    _create_animals(foxes, world)
-    rabbits = params.rabbits
-    _create_animals(rabbits, world)
+    with _gc_paused():
+        foxes = params.foxes
+        _create_animals(foxes, world)
+        rabbits = params.rabbits
+        _create_animals(rabbits, world)
 
 def _nearest_coords(world: list[list[ents.Patch]],
                     ns_pos: int,
@@ -230,13 +291,18 @@ def reproduce_animal(animal: ents.Animal, nearby_fields: list[ents.Patch]) -> bo
     return False, None # This will only execute if the above if-statements evaluates to False
 
 
-def move_animal(animal: ents.Animal, nearby_fields: list[ents.Patch]) -> None:
+def move_animal(animal: ents.Animal,
+                nearby_fields: list[ents.Patch],
+                sensed: Optional[neighbours.SummedAreaTable] = None) -> None:
     """Move animal to random valid empty field nearby if it is possible
+    If the animal has a sensing radius (see parameters.Population.sensing_radius), it only picks among the fields with
+    the most (foxes) or fewest (rabbits) sensed animals within that radius.
 
     Parameters
     -----------
     animal: An instance of the class "Animal" from the module "entities".
     nearby_fields: A list of nearby fields
+    sensed: A summed-area table of the animals sensed by the animal (rabbits for foxes, foxes for rabbits)
 
     Return
     ---------
@@ -245,6 +311,13 @@ def move_animal(animal: ents.Animal, nearby_fields: list[ents.Patch]) -> None:
     # List of fields without same species
     empty_fields = [patch for patch in nearby_fields if not animal.same_species_in(patch)]
 
+    radius = animal.population().sensing_radius
+    if sensed is not None and radius > 0 and len(empty_fields) > 1:
+        scores = [sensed.window(*patch.coordinates(), radius) for patch in empty_fields]
+        # Foxes move towards the rabbits, rabbits away from the foxes
+        best = max(scores) if animal.species_code == ents.FOX else min(scores)
+        empty_fields = [patch for patch, score in zip(empty_fields, scores) if score == best]
+
     if len(empty_fields) > 0:
         rand_empty_field = empty_fields[random.randint(0,len(empty_fields)-1)] # Random field for spawning
         animal.move_to(rand_empty_field)
@@ -254,7 +327,8 @@ def _collect_stats(animals: ents.Animal,
                    newborns: list[ents.Animal],
                    population: parameters.Population,
                    pop_stats: res.PopulationStats,
-                   sim_stats: res.SimulationStats) -> None:
+                   sim_stats: res.SimulationStats,
+                   event_log: Optional[eventlog.EventLog] = None) -> None:
     """ This function collects statistics and updates the relevant classes
 
     Parameters
@@ -264,6 +338,7 @@ def _collect_stats(animals: ents.Animal,
     population: An instance of the class "Population" from the module "parameters"
     pop_stats: An instance of the class "PopulationStats" from the module "results"
     sim_stats: An instance of the class "SimulationStats" from the module "results"
+    event_log: If given, the births and deaths are appended to it (see the module eventlog)
 
     Preconditions
     -------------
@@ -279,6 +354,16 @@ def _collect_stats(animals: ents.Animal,
     
     # Update total size of population
     pop_stats.total += len(newborns)
+    step = len(pop_stats.size_per_step) # The step being collected
+    events = [] # Rows for the event log
+
+    def _log(animal: ents.Animal, event: int) -> None:
+        if event_log is not None:
+            ns_pos, we_pos = animal.patch().coordinates()
+            events.append((step, ns_pos, we_pos, animal.species_code, event, animal.age(), animal.energy()))
+
+    for newborn in newborns:
+        _log(newborn, eventlog.BIRTH)
 
     # Count stats
     total_energy = 0 #Used for calculating average energy
@@ -294,15 +379,21 @@ def _collect_stats(animals: ents.Animal,
             # Old age
             if animal.age() >= population.max_age:
                 pop_stats.dead_by_old_age += 1
+                _log(animal, eventlog.OLD_AGE)
             # Starvation
             elif animal.energy() <= 0:
                 pop_stats.dead_by_starvation += 1
+                _log(animal, eventlog.STARVATION)
             # Predation and kills on patch
-            elif isinstance(animal, ents.Rabbit) and animal.was_killed():
+            elif animal.species_code == ents.RABBIT and animal.was_killed():
                 pop_stats.dead_by_predation += 1 
                 ns_pos = animal.patch().coordinates()[0]# North South Position
                 we_pos = animal.patch().coordinates()[1]# West East Position
-                sim_stats.kills_per_patch[ns_pos - 1][we_pos - 1] += 1
+                sim_stats.kills_per_patch[ns_pos][we_pos] += 1
+                _log(animal, eventlog.PREDATION)
+            animal.recycle() # Nothing refers to the animal after this step
+    if event_log is not None:
+        event_log.extend(events)
 
     # Update class attributes that expects lists as values
     pop_stats.size_per_step.append(alive_animals)
@@ -317,8 +408,16 @@ def update_entities(world: list[list[ents.Patch]],
                     r_pop_stats: res.PopulationStats, 
                     f_pop_stats: res.PopulationStats,
                     sim_stats: res.SimulationStats, 
-                    movement: str) -> None:   
+                    movement: str,
+                    order: str = "row-major",
+                    neighbour_fields: bool = False,
+                    event_log: Optional[eventlog.EventLog] = None) -> None:   
     """ This function updates each entity in the world and collects relevant statistics
+    If the occupied patches are tracked (see entities.Patch.occupied), only those are visited for updating the animals,
+    while the grass is updated separately, and every animal is updated exactly once. Otherwise an animal moving to a
+    patch visited later in the step is updated again there, and the animal after one leaving a patch is skipped.
+    A tiled world (see worlds.TiledWorld) is visited tile by tile, and the animals of tiles without any animals are not
+    looked for.
 
     Parameters
     ----------
@@ -331,6 +430,14 @@ def update_entities(world: list[list[ents.Patch]],
         - Queen (Default): "queen" or "q"
         - Rook: "rook" or "r"
         - Bishop: "bishop" or "b"   
+    order: The order in which the occupied patches are visited, if they are tracked. Can be either
+        - "row-major" (Default): row by row, as when visiting every patch
+        - "shuffled": in random order
+    neighbour_fields: If True, the neighbours of every patch are counted once at the start of the step
+        (see neighbours.NeighbourFields). Animals without mates, empty or free neighbours then skip looking at them.
+    If foxes or rabbits have a sensing radius (see parameters.Population.sensing_radius), the animals they sense are
+    counted at the start of the step in summed-area tables (see neighbours.SummedAreaTable), which steer their movement.
+    event_log: If given, the births and deaths of the step are appended to it (see the module eventlog)
 
     Return
     ---------
@@ -340,32 +447,91 @@ def update_entities(world: list[list[ents.Patch]],
     newborn_rabbits = []
     foxes = []
     newborn_foxes = []
+    counted = set() # Animals already appended. Without active scheduling, an animal may be updated twice
     alive_animals = True
-
-    for row in world:
-        for patch in row:
-            patch.tick()
-            for animal in patch.animals():          
-                #Append animals
-                if isinstance(animal, ents.Fox) and animal not in foxes:
-                    foxes.append(animal)
-                elif isinstance(animal, ents.Rabbit) and animal not in rabbits:
-                    rabbits.append(animal)
-                
-                #Simulation
-                animal.tick()
-                animal.feed()
-                #Reproduce
+    occupied = ents.Patch.occupied
+    once = occupied is not None # With active scheduling, the animals already counted are not updated again
+
+    calendar = ents.Animal.calendar
+
+    # Helper function for appending an animal to the animals of its species
+    def _count(animal: ents.Animal) -> None:
+        if animal not in counted:
+            counted.add(animal)
+            if animal.species_code == ents.FOX:
+                foxes.append(animal)
+            else:
+                rabbits.append(animal)
+
+    # Helper function for updating the animals on a patch
+    def _update_animals(patch: ents.Patch) -> None:
+        animals = patch.animals()
+        if once:
+            # A copy, so an animal leaving the patch does not make the loop skip the next one
+            animals = [animal for animal in animals if animal not in counted]
+        for animal in animals:          
+            if once and animal not in patch.animals():
+                continue # Killed by a fox on this patch
+            #Append animals
+            _count(animal)
+            
+            #Simulation
+            animal.tick()
+            animal.feed()
+            #Reproduce
+            if counts is None or counts.may_reproduce(animal):
                 near_reproduction = get_near_by_fields(animal, world, params, movement = "q") 
                 reproduction, newborn = reproduce_animal(animal, near_reproduction)
-                if reproduction and isinstance(newborn, ents.Fox): #If fox
-                    newborn_foxes.append(newborn)
-                elif reproduction: #If rabbit
-                    newborn_rabbits.append(newborn)
-                # Move
-                if not reproduction and animal.is_alive():
-                    nearby_movement = get_near_by_fields(animal, world, params, movement)
-                    move_animal(animal, nearby_movement)
+            else:
+                reproduction, newborn = False, None
+            if reproduction and newborn.species_code == ents.FOX: #If fox
+                newborn_foxes.append(newborn)
+            elif reproduction: #If rabbit
+                newborn_rabbits.append(newborn)
+            # Move
+            if not reproduction and animal.is_alive() and (counts is None or counts.may_move(animal)):
+                nearby_movement = get_near_by_fields(animal, world, params, movement)
+                move_animal(animal, nearby_movement, None if sensed is None else sensed[animal.species_code])
+
+    ents.Patch.current_step += 1
+    lazy_grass = ents.Patch.lazy_grass # With lazy grass, patches grow when their grass is read
+    if calendar is not None:
+        # The deaths booked up to this step are dropped from the calendar. The animals are removed by their tick, so
+        # they are still seen by the animals updated before them, as without a calendar
+        calendar.due(ents.Patch.current_step)
+    counts = neighbours.NeighbourFields(world, params, movement) if neighbour_fields else None
+    sensed = None
+    if params.foxes.sensing_radius > 0 or params.rabbits.sensing_radius > 0:
+        fox_grid, rabbit_grid = neighbours.occupancy(world)
+        # Foxes sense rabbits and rabbits sense foxes
+        sensed = {ents.FOX: neighbours.SummedAreaTable(rabbit_grid, params.world.is_toroid),
+                  ents.RABBIT: neighbours.SummedAreaTable(fox_grid, params.world.is_toroid)}
+    if occupied is None and isinstance(world, worlds.TiledWorld):
+        for tile in world:
+            if not lazy_grass:
+                for patch in tile:
+                    patch.tick()
+            if tile.is_empty():
+                continue # No animals on the whole tile
+            for patch in tile:
+                _update_animals(patch)
+    elif occupied is None:
+        for row in world:
+            for patch in row:
+                if not lazy_grass:
+                    patch.tick()
+                _update_animals(patch)
+    else:
+        if not lazy_grass:
+            for row in world:
+                for patch in row:
+                    patch.tick()
+        # Sorting first keeps the order independent of how the set is hashed
+        patches = sorted(occupied, key = ents.Patch.coordinates)
+        if order == "shuffled":
+            random.shuffle(patches)
+        for patch in patches:
+            _update_animals(patch)
 
     # Collect stats on each population
     # Rabbits
@@ -373,68 +539,40 @@ def update_entities(world: list[list[ents.Patch]],
                    newborns = newborn_rabbits,
                    population = params.rabbits,
                    pop_stats = r_pop_stats,
-                   sim_stats = sim_stats)
+                   sim_stats = sim_stats,
+                   event_log = event_log)
     # Foxes
     _collect_stats(animals = foxes,
                    newborns = newborn_foxes, 
                    population = params.foxes,
                    pop_stats = f_pop_stats,
-                   sim_stats = sim_stats)
+                   sim_stats = sim_stats,
+                   event_log = event_log)
     
     # Check if animals are dead
     if (len(rabbits) == 0 
         and len(foxes) == 0
         and len(newborn_rabbits) == 0
-        and len(newborn_rabbits) == 0):
+        and len(newborn_foxes) == 0):
         alive_animals = False
     
     return alive_animals
 
-def run(params: parameters.Simulation) -> res.SimulationStats:
-    """Runs the simulation according to the specified parameters collects statistics
+def create_stats(params: parameters.Simulation, sparse: bool = False) -> res.SimulationStats:
+    """Creates empty statistics for a run of the simulation.
 
     Parameters
     ----------
-    params: params: An instance of the class "Simulation" from the module "parameters"
+    params: An instance of the class "Simulation" from the module "parameters"
+    sparse: If True, the kills per patch are only stored for patches with kills (see worlds.SparseCounts)
 
     Return
     ----------
-    An instance of the class "SimulationStats" from the module "results".
+    An instance of the class "SimulationStats" from the module "results" with zero counts and empty lists.
     """
-    #Initialize world
-    world = create_world(params)
-    fill_world(world)
-    populate_world(params, world)
-    
-    # Configure movement type
-    choice = input("Chose movement style\n['r' or 'rook' for rook; 'b' or 'bishop' for bishop; default style = Queen] ")
-    if choice == "r" or choice == "rook":
-        movement = choice
-    elif choice == "b" or choice == "bishop":
-        movement = choice
-    else:
-        movement = "q"
-    
-    #Create and configure visualiser
-    flat_world = [patch for col in world for patch in col] # Visualíser only works with a flat list
-    if params.execution.batch:
-        vis = visualiser.Batch(total_steps = params.execution.max_steps)
-    else:
-        choice = input("Visualize in colour or grayscale?\n['colour' or 'c' for colourgraphics; default scale = Grayscale] ")
-        if choice == "c" or choice == "colour":
-            vis = visualiser.ColourGraphics(total_steps = params.execution.max_steps,
-                                            patches = flat_world,
-                                            width = len(world),
-                                            height =len(world[0]),
-                                            delay = params.execution.step_delay,
-                                            grass_levels = True)
-        else:
-            vis = visualiser.GrayscaleGraphics(total_steps = params.execution.max_steps,
-                                            patches = flat_world,
-                                            width = len(world),
-                                            height =len(world[0]),
-                                            delay = params.execution.step_delay,
-                                            grass_levels = True)
+    nsl = params.world.north_south_length
+    wel = params.world.west_east_length
+
     # Initialize object for rabbit stats
     r_pop_stats = res.PopulationStats()
     r_pop_stats.age_at_death = []  
@@ -458,21 +596,202 @@ def run(params: parameters.Simulation) -> res.SimulationStats:
     # Initialize object for Simulation stats
     sim_stats = res.SimulationStats()
     sim_stats.foxes = f_pop_stats
-    sim_stats.kills_per_patch = create_world(params)
+    if sparse:
+        sim_stats.kills_per_patch = worlds.SparseCounts(nsl, wel)
+    else:
+        sim_stats.kills_per_patch = create_world(params)
     sim_stats.rabbits = r_pop_stats
     sim_stats.steps = params.execution.max_steps
+    return sim_stats
+
+
+def choose_movement() -> str:
+    """Asks the user for the movement that defines neighbours (see update_entities).
+
+    Return
+    ---------
+    The movement chosen, queen movement by default
+    """
+    choice = input("Chose movement style\n['r' or 'rook' for rook; 'b' or 'bishop' for bishop; default style = Queen] ")
+    if choice == "r" or choice == "rook":
+        return choice
+    elif choice == "b" or choice == "bishop":
+        return choice
+    return "q"
+
+
+def run(params: parameters.Simulation,
+        movement: Optional[str] = None,
+        seed: Optional[int] = None,
+        backend: str = "dense",
+        lazy_grass: bool = False,
+        scheduling: str = "full",
+        order: str = "row-major",
+        deaths: str = "tick",
+        neighbour_fields: bool = False,
+        stop: Optional[list[stopping.StopCondition]] = None,
+        event_log: Optional[eventlog.EventLog] = None,
+        metrics: Optional[mtr.MetricsServer] = None,
+        progress_file: Optional[str] = None,
+        observe: Optional[Callable[[int, Any, res.SimulationStats], None]] = None,
+        pooling: bool = False,
+        gc_freeze: bool = False,
+        template: Optional[list[list[ents.Patch]]] = None) -> res.SimulationStats:
+    """Runs the simulation according to the specified parameters collects statistics
+
+    Parameters
+    ----------
+    params: params: An instance of the class "Simulation" from the module "parameters"
+    movement: Movement that defines neighbours (see update_entities). The user is asked if it is not given.
+    seed: Seed for the random number generators. A different run every time if not given.
+    backend: How the world is stored, either
+        - "dense" (Default): every patch is created up front
+        - "sparse": patches are created when first touched, for huge and mostly empty worlds (see worlds.SparseWorld)
+        - "tiled": patches are stored in 32x32 tiles and empty tiles are skipped (see worlds.TiledWorld)
+    lazy_grass: If True, grass is only grown when it is read instead of ticking every patch (see entities.Patch).
+        The growth is drawn from the seed, so reading the grass (e.g. by the visualiser or by observe) does not change
+        the run.
+    scheduling: Which patches are visited for updating the animals, either
+        - "full" (Default): every patch
+        - "active": only the patches holding animals (see entities.Patch.occupied), updating every animal once.
+          With full scheduling an animal moving to a patch further along is updated again, so the runs differ.
+          Without lazy grass, the grass of every patch is still ticked every step.
+    order: The order in which the occupied patches are visited with active scheduling (see update_entities)
+    deaths: How deaths by old age and starvation are found, either
+        - "tick" (Default): every animal is ticked and checked in every step
+        - "calendar": deaths are booked ahead in a calendar and handled when the animal is ticked (see entities.Animal).
+          With active scheduling the results are the same as ticking (see golden.compare). With full scheduling they
+          differ, since an animal updated twice in a step is aged twice by ticking but only once by the calendar.
+    neighbour_fields: If True, neighbours are counted once per step for the whole world (see update_entities)
+    stop: Conditions for ending the run early, checked in order after every step (see the module stopping).
+        The run always stops when every animal has died or after params.execution.max_steps.
+    event_log: If given, every birth and death is appended to it with its step and patch (see the module eventlog)
+    metrics: If given, the progress of the run and the time spent in every phase of the steps are published to it
+        (see the module metrics). The server is not started or stopped by the run.
+    progress_file: If given, batch runs append their progress to this file as JSON lines (see visualiser.Batch)
+    observe: If given, called with the number of steps completed, the world and the statistics before the first step
+        and after every step, e.g. for recording traces (see the module golden). It must not change the world.
+    pooling: If True, dead animals are kept and re-initialised for newborns instead of creating new objects
+        (see entities.Animal.pool). The results are the same.
+    gc_freeze: If True, the objects existing once the world is populated (mostly patches) are moved out of reach of
+        the garbage collector for the run (see gc.freeze), so its full collections only go through the objects created
+        later. The results are the same.
+    template: A world of the size of params.world, filled earlier (see the module templates), to reuse for this run
+        instead of creating new patches. It is emptied and refilled (see refill_world), so the results are the same.
+        Only for the dense backend.
+
+    Return
+    ----------
+    An instance of the class "SimulationStats" from the module "results", with the number of steps run and the reason
+    the run stopped.
+    """
+    if template is not None and (backend != "dense" or len(template) != params.world.north_south_length
+                                 or len(template[0]) != params.world.west_east_length):
+        raise ValueError("A template must be a dense world of the size given by the parameters")
+    if seed is not None:
+        random.seed(seed)
+    ents.Patch.current_step = 0
+    ents.Patch.lazy_grass = lazy_grass
+    ents.Patch.grass_seed = random.getrandbits(64) if lazy_grass else 0 # Only drawn when used, not to shift the runs
+    ents.Patch.occupied = set() if scheduling == "active" else None
+    ents.Animal.calendar = calendars.DeathCalendar() if deaths == "calendar" else None
+    ents.Animal.pool = {ents.FOX: [], ents.RABBIT: []} if pooling else None
+    frozen = False
+    try: # The pool and the frozen objects are let go even if the run fails or is interrupted
+        #Initialize world
+        nsl = params.world.north_south_length
+        wel = params.world.west_east_length
+        if backend == "sparse":
+            world = worlds.SparseWorld(nsl, wel, seed = random.getrandbits(64))
+        elif backend == "tiled":
+            world = worlds.TiledWorld(nsl, wel)
+        elif template is not None:
+            world = template
+            refill_world(world)
+        else:
+            world = create_world(params)
+            fill_world(world)
+        populate_world(params, world)
+        if gc_freeze:
+            gc.collect()
+            gc.freeze()
+            frozen = True
     
-    # Run simulation
-    vis.start()
-    step = 0
-    alive_animals = True
-    while alive_animals and step <= params.execution.max_steps:
-        vis.update(step)
-        alive_animals = update_entities(world, params,
-                                        r_pop_stats, f_pop_stats,
-                                        sim_stats, movement)
-        step += 1
-    vis.stop()
+        # Configure movement type
+        if movement is None:
+            movement = choose_movement()
+    
+        #Create and configure visualiser
+        if params.execution.batch:
+            vis = visualiser.Batch(total_steps = params.execution.max_steps, json_path = progress_file)
+        else:
+            flat_world = [patch for col in world for patch in col] # Visualíser only works with a flat list
+            tiles = world.tiles() if backend == "tiled" else None # Lets the visualiser skip empty tiles
+            choice = input("Visualize in colour or grayscale?\n['colour' or 'c' for colourgraphics; default scale = Grayscale] ")
+            if choice == "c" or choice == "colour":
+                vis = visualiser.ColourGraphics(total_steps = params.execution.max_steps,
+                                                patches = flat_world,
+                                                width = len(world),
+                                                height =len(world[0]),
+                                                delay = params.execution.step_delay,
+                                                grass_levels = True,
+                                                tiles = tiles)
+            else:
+                vis = visualiser.GrayscaleGraphics(total_steps = params.execution.max_steps,
+                                                patches = flat_world,
+                                                width = len(world),
+                                                height =len(world[0]),
+                                                delay = params.execution.step_delay,
+                                                grass_levels = True,
+                                                tiles = tiles)
+        # Initialize objects for stats
+        sim_stats = create_stats(params, sparse = backend == "sparse")
+        r_pop_stats = sim_stats.rabbits
+        f_pop_stats = sim_stats.foxes
+    
+        # Run simulation
+        conditions = stop or []
+        for condition in conditions:
+            condition.start(sim_stats)
+        vis.start()
+        step = 0
+        reason = None
+        processed = 0 # Animals updated so far, for the speed shown by the visualiser
+        phase_seconds = dict.fromkeys(mtr.PHASES, 0.0) # Time spent in every phase of the steps, when published to metrics
+        clock = time.perf_counter if metrics is not None else _no_clock
+        if metrics is not None:
+            metrics.start_run(params.execution.max_steps)
+        if observe is not None:
+            observe(step, world, sim_stats)
+        while reason is None and step <= params.execution.max_steps:
+            start = clock()
+            vis.update(step, processed)
+            updated = clock()
+            alive_animals = update_entities(world, params,
+                                            r_pop_stats, f_pop_stats,
+                                            sim_stats, movement, order, neighbour_fields, event_log)
+            step += 1
+            processed += r_pop_stats.size_per_step[-1] + f_pop_stats.size_per_step[-1]
+            if observe is not None:
+                observe(step, world, sim_stats)
+            checked = clock()
+            reason = stopping.first_fired(conditions, sim_stats, step) if alive_animals else stopping.EXTINCTION
+            if metrics is not None:
+                end = clock()
+                phase_seconds["visualiser"] += updated - start
+                phase_seconds["update"] += checked - updated
+                phase_seconds["stopping"] += end - checked
+                metrics.publish_step(step, sim_stats, phase_seconds)
+        if metrics is not None:
+            metrics.publish_step(step, sim_stats, phase_seconds, force = True) # The final state of the run
+        vis.update(step, processed)
+        vis.stop()
+    finally:
+        if frozen:
+            gc.unfreeze()
+        ents.Animal.pool = None # The dead animals are not kept after the run
+    sim_stats.steps = step
+    sim_stats.stop_reason = reason if reason is not None else stopping.MAX_STEPS
 
     # Calculate and save total average energy from both populations
     sim_stats.avg_energy_per_step = [f_pop_stats.avg_energy_per_step[i] + r_pop_stats.avg_energy_per_step[i]
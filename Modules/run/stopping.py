@@ -0,0 +1,176 @@
+"""
+Conditions for ending a run of the simulation before the maximum number of steps.
+
+After every step, simulation.run asks its stop conditions in turn whether the run can stop, and records the name of the
+first one that fires in SimulationStats.stop_reason. The conditions only look at the statistics collected so far (the
+size of each population in every step), so asking them costs next to nothing compared with a step.
+"""
+import time
+from typing import Optional
+
+import results as res
+
+MAX_STEPS = "max steps" # The run reached params.execution.max_steps
+EXTINCTION = "extinction" # Every animal died
+
+
+class StopCondition:
+    """
+    A condition for ending a run early, checked after every step.
+
+    The name of the condition is recorded in SimulationStats.stop_reason when it fires.
+    """
+    __slots__ = [
+        "name"
+    ]
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def start(self, sim_stats: res.SimulationStats) -> None:
+        """Called when the run starts, before the first step, with the statistics the run fills (holding the initial
+        population sizes). Conditions used for several runs start over here.
+        """
+        pass
+
+    def check(self, sim_stats: res.SimulationStats, step: int) -> bool:
+        """Returns True if the run can stop after the given number of steps, False otherwise.
+        """
+        raise NotImplementedError # Will be implemented by subclasses
+
+
+class Extinction(StopCondition):
+    """
+    Fires when a single population has died out: no animal of it is alive and none was born in the last step.
+
+    Parameters
+    ----------
+    - species: "foxes" or "rabbits"
+    """
+    __slots__ = [
+        "_species",
+        "_total"
+    ]
+
+    def __init__(self, species: str):
+        super().__init__(f"{species} extinct")
+        self._species = species
+        self._total = None
+
+    def __repr__(self) -> str:
+        return f"Extinction({self._species!r})"
+
+    def start(self, sim_stats: res.SimulationStats) -> None:
+        self._total = getattr(sim_stats, self._species).total # The initial size, so the first step is checked too
+
+    def check(self, sim_stats: res.SimulationStats, step: int) -> bool:
+        pop_stats = getattr(sim_stats, self._species)
+        no_births = pop_stats.total == self._total
+        self._total = pop_stats.total
+        return no_births and pop_stats.size_per_step[-1] == 0
+
+
+class Settled(StopCondition):
+    """
+    Fires when the populations have settled into a steady state or a stable cycle.
+
+    The sizes of each population over the last window of steps are compared with the window before it. The populations
+    have settled when the mean, the minimum and the maximum of every population changed by at most the tolerance, as
+    a share of the largest size in the earlier window. A steady state settles as soon as the noise stays within the
+    tolerance; a cycle settles once the window is long enough to hold a few periods.
+
+    Parameters
+    ----------
+    - window: The number of steps in a window
+    - tolerance: The largest change between the windows, as a share of the largest population size
+    - species: The populations that must have settled
+    """
+    __slots__ = [
+        "_window",
+        "_tolerance",
+        "_species"
+    ]
+
+    def __init__(self, window: int = 100, tolerance: float = 0.05, species: tuple[str, ...] = ("foxes", "rabbits")):
+        super().__init__("settled")
+        self._window = window
+        self._tolerance = tolerance
+        self._species = species
+
+    def __repr__(self) -> str:
+        return f"Settled({self._window}, {self._tolerance}, {self._species!r})"
+
+    def check(self, sim_stats: res.SimulationStats, step: int) -> bool:
+        window = self._window
+        for species in self._species:
+            sizes = getattr(sim_stats, species).size_per_step
+            if len(sizes) < 2 * window:
+                return False
+            earlier = sizes[-2 * window:-window]
+            latest = sizes[-window:]
+            allowed = self._tolerance * max(1, max(earlier))
+            if (abs(sum(latest) - sum(earlier)) / window > allowed
+                or abs(min(latest) - min(earlier)) > allowed
+                or abs(max(latest) - max(earlier)) > allowed):
+                return False
+        return True
+
+
+class StepBudget(StopCondition):
+    """
+    Fires after a number of steps, without changing params.execution.max_steps.
+
+    Parameters
+    ----------
+    - steps: The number of steps allowed
+    """
+    __slots__ = [
+        "_steps"
+    ]
+
+    def __init__(self, steps: int):
+        super().__init__("step budget")
+        self._steps = steps
+
+    def __repr__(self) -> str:
+        return f"StepBudget({self._steps})"
+
+    def check(self, sim_stats: res.SimulationStats, step: int) -> bool:
+        return step >= self._steps
+
+
+class TimeBudget(StopCondition):
+    """
+    Fires once the run has taken a number of seconds of wall-clock time, counted from the start of the first step.
+
+    Parameters
+    ----------
+    - seconds: The wall-clock time allowed
+    """
+    __slots__ = [
+        "_seconds",
+        "_deadline"
+    ]
+
+    def __init__(self, seconds: float):
+        super().__init__("time budget")
+        self._seconds = seconds
+        self._deadline = None
+
+    def __repr__(self) -> str:
+        return f"TimeBudget({self._seconds})"
+
+    def start(self, sim_stats: res.SimulationStats) -> None:
+        self._deadline = time.perf_counter() + self._seconds
+
+    def check(self, sim_stats: res.SimulationStats, step: int) -> bool:
+        return time.perf_counter() >= self._deadline
+
+
+def first_fired(conditions: list[StopCondition], sim_stats: res.SimulationStats, step: int) -> Optional[str]:
+    """Returns the name of the first condition that fires after the given number of steps, None if none does.
+    """
+    for condition in conditions:
+        if condition.check(sim_stats, step):
+            return condition.name
+    return None
@@ -0,0 +1,89 @@
+"""
+Worlds built once and reused by many runs of the same parameters, e.g. the replicate runs of an ensemble.
+
+Creating the patches of a big world (simulation.create_world and fill_world) takes a large share of a short run, when
+the steps themselves are cheap (e.g. with lazy grass and active scheduling, see simulation.run).
+A template is a world whose patches were created once; every run using it empties the patches and draws their grass
+and the animals again from its seed (see simulation.refill_world), which gives the same results as a new world.
+
+The runs of an ensemble are spread over a pool of processes. Where processes are forked (Linux), the workers inherit
+the template of the parent process, sharing its memory until they write to it. Otherwise every worker builds its own
+template once when it starts: a pickled world takes several times longer to load than to build again.
+"""
+import concurrent.futures
+import contextlib
+import copy
+import functools
+import io
+import multiprocessing
+import os
+import sys
+from typing import Any, Optional, Sequence
+
+sys.path.append(os.path.join("..", "classes"))
+import parameters, results as res, entities as ents
+import simulation
+
+
+def build(params: parameters.Simulation) -> list[list[ents.Patch]]:
+    """Returns a world of the size given by the parameters, to be used as a template (see simulation.run).
+    """
+    world = simulation.create_world(params)
+    simulation.fill_world(world) # The grass is drawn again by every run
+    return world
+
+
+_template = None # The template of a worker process, inherited from the parent when forked or built by _start_worker
+
+
+def _start_worker(params: parameters.Simulation, reuse: bool) -> None:
+    global _template
+    if reuse and _template is None:
+        _template = build(params)
+
+
+def _run(params: parameters.Simulation, movement: str, options: dict[str, Any], seed: int) -> res.SimulationStats:
+    with contextlib.redirect_stdout(io.StringIO()): # The progress bars of the workers would be mixed up
+        return simulation.run(params, movement = movement, seed = seed, template = _template, **options)
+
+
+def run_ensemble(params: parameters.Simulation,
+                 seeds: Sequence[int],
+                 movement: str = "q",
+                 workers: Optional[int] = None,
+                 reuse: bool = True,
+                 start_method: Optional[str] = None,
+                 **options: Any) -> list[res.SimulationStats]:
+    """Runs the simulation once for every seed in a pool of processes, every process reusing the same world.
+
+    Parameters
+    ----------
+    params: An instance of the class "Simulation" from the module "parameters". The runs are in batch mode.
+    seeds: The seeds of the runs
+    movement: Movement that defines neighbours (see simulation.update_entities)
+    workers: The number of processes. As many as the machine has processors if not given.
+    reuse: If True (Default), a template is built once and reused by every run. Otherwise every run creates its world.
+    start_method: How the processes are started (see multiprocessing), "fork" if available if not given.
+        Unless forked, every process builds its own template.
+    options: Further options of simulation.run, e.g. deaths = "calendar". They must be picklable; observers of a run
+        (e.g. event_log) are filled in the worker processes, not in this one.
+
+    Return
+    ----------
+    Instances of the class "SimulationStats" from the module "results", in the order of the seeds
+    """
+    global _template
+    params = copy.deepcopy(params)
+    params.execution.batch = True
+    if start_method is None:
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    if reuse and start_method == "fork":
+        _template = build(params) # Inherited by the workers as they are forked
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers,
+                                                    mp_context = multiprocessing.get_context(start_method),
+                                                    initializer = _start_worker,
+                                                    initargs = (params, reuse)) as pool:
+            return list(pool.map(functools.partial(_run, params, movement, options), seeds))
+    finally:
+        _template = None
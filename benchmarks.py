@@ -0,0 +1,610 @@
+"""
+Benchmarks for the simulation.
+
+Run from the root of the repository, e.g.:
+    python benchmarks.py memory
+    python benchmarks.py memory --sizes 50 100 500
+    python benchmarks.py init --sizes 500 2000 --density 0.5
+    python benchmarks.py scheduling --size 300 --densities 0.001 0.01 0.1
+    python benchmarks.py radius --size 100 --radii 1 4 16 64
+    python benchmarks.py meanfield --size 100 --skips 20 50 --seeds 1 2 3
+    python benchmarks.py blocks --sizes 100 300 --block-size 10
+    python benchmarks.py batched --worlds 8 32 128 --size 20
+    python benchmarks.py stopping --window 100 --tolerance 0.1 --seeds 1 2 3
+    python benchmarks.py imports --modules simulation foxes_and_rabbits --repeats 5
+    python benchmarks.py bundles --runs 16 --workers 1 4
+    python benchmarks.py events --size 100 --steps 2000 --region 20
+    python benchmarks.py gc --size 300 --steps 200
+    python benchmarks.py templates --size 1000 --steps 20 --runs 8 --workers 1 4
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Look for modules in other folders
+sys.path.append(os.path.join("Modules", "classes"))
+sys.path.append(os.path.join("Modules", "run"))
+
+import numpy as np
+import parameters, simulation, neighbours, meanfield, blocks, batched, stopping, export, bundles
+import eventlog, templates
+
+
+def _make_params(nsl: int, wel: int, density: float = 0.1) -> parameters.Simulation:
+    """Create simulation parameters for a world of the given size.
+    The rabbit population covers the given share of the world, the fox population a quarter of that.
+    """
+    params = parameters.Simulation()
+    params.world.north_south_length = nsl
+    params.world.west_east_length = wel
+    params.rabbits.initial_size = max(1, int(nsl * wel * density))
+    params.foxes.initial_size = max(1, int(nsl * wel * density / 4))
+    return params
+
+
+def bench_memory(sizes: list[int]) -> None:
+    """Report the traced memory used per patch and per animal for square worlds of the given sizes.
+
+    Parameters
+    ----------
+    sizes: The side lengths of the worlds to measure
+    """
+    print(f"{'world':>12} | {'patches':>10} | {'bytes/patch':>11} | {'animals':>9} | {'bytes/animal':>12}")
+    print("-" * 66)
+    for size in sizes:
+        random.seed(size)
+        params = _make_params(size, size)
+        tracemalloc.start()
+        # Patches
+        start, _ = tracemalloc.get_traced_memory()
+        world = simulation.create_world(params)
+        simulation.fill_world(world)
+        after_patches, _ = tracemalloc.get_traced_memory()
+        # Animals
+        simulation.populate_world(params, world)
+        after_animals, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        patches = size * size
+        animals = params.rabbits.initial_size + params.foxes.initial_size
+        per_patch = (after_patches - start) / patches
+        per_animal = (after_animals - after_patches) / animals
+        print(f"{f'{size}x{size}':>12} | {patches:>10} | {per_patch:>11.1f} | {animals:>9} | {per_animal:>12.1f}")
+        del world
+
+
+def bench_init(sizes: list[int], density: float) -> None:
+    """Report the time it takes to build and populate square worlds of the given sizes.
+
+    Parameters
+    ----------
+    sizes: The side lengths of the worlds to measure
+    density: The share of the world covered by rabbits (foxes cover a quarter of that)
+    """
+    print(f"{'world':>12} | {'animals':>9} | {'build (s)':>9} | {'populate (s)':>12} | {'total (s)':>9}")
+    print("-" * 64)
+    for size in sizes:
+        random.seed(size)
+        params = _make_params(size, size, density)
+        start = time.perf_counter()
+        world = simulation.create_world(params)
+        simulation.fill_world(world)
+        built = time.perf_counter()
+        simulation.populate_world(params, world)
+        populated = time.perf_counter()
+
+        animals = params.rabbits.initial_size + params.foxes.initial_size
+        print(f"{f'{size}x{size}':>12} | {animals:>9} | {built - start:>9.3f} | "
+              f"{populated - built:>12.3f} | {populated - start:>9.3f}")
+        del world
+
+
+def _timed_run(params: parameters.Simulation, **options) -> tuple[float, int]:
+    """Runs the simulation in batch mode without printing the progress bar.
+
+    Return
+    ------
+    The duration of the run in seconds and the number of steps it ran for
+    """
+    params.execution.batch = True
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = simulation.run(params, movement = "q", seed = 1, **options)
+    return time.perf_counter() - start, len(stats.rabbits.size_per_step)
+
+
+def bench_scheduling(size: int, densities: list[float], steps: int) -> None:
+    """Compare visiting every patch against visiting only the occupied patches, for several population densities.
+
+    Parameters
+    ----------
+    size: The side length of the world
+    densities: The share of the world covered by rabbits (foxes cover a quarter of that)
+    steps: The maximum number of steps of each run
+    """
+    print(f"{'density':>8} | {'animals':>8} | {'full (ms/step)':>14} | {'active (ms/step)':>16} | {'speed-up':>8}")
+    print("-" * 67)
+    for density in densities:
+        params = _make_params(size, size, density)
+        params.execution.max_steps = steps
+        full, full_steps = _timed_run(params, scheduling = "full", lazy_grass = True)
+        active, active_steps = _timed_run(params, scheduling = "active", lazy_grass = True)
+        full_ms = 1000 * full / full_steps
+        active_ms = 1000 * active / active_steps
+        animals = params.rabbits.initial_size + params.foxes.initial_size
+        print(f"{density:>8} | {animals:>8} | {full_ms:>14.2f} | {active_ms:>16.2f} | {full_ms / active_ms:>7.1f}x")
+
+
+def _naive_window(grid: list[list[int]], ns_pos: int, we_pos: int, radius: int) -> int:
+    """Sums a square window of a toroid grid cell by cell, for comparison with neighbours.SummedAreaTable.
+    """
+    nsl = len(grid)
+    wel = len(grid[0])
+    ns_range = range(nsl) if 2 * radius + 1 >= nsl else [(ns_pos + i) % nsl for i in range(-radius, radius + 1)]
+    we_range = range(wel) if 2 * radius + 1 >= wel else [(we_pos + i) % wel for i in range(-radius, radius + 1)]
+    return sum(grid[ns][we] for ns in ns_range for we in we_range)
+
+
+def bench_radius(size: int, radii: list[int], steps: int, queries: int = 2000) -> None:
+    """Report the cost of sensing animals within growing radii, both per window query and per step of a run
+    where foxes and rabbits sense each other within the radius.
+
+    Parameters
+    ----------
+    size: The side length of the world
+    radii: The sensing radii to measure
+    steps: The maximum number of steps of each run
+    queries: The number of window queries timed for each radius
+    """
+    random.seed(size)
+    grid = np.array([[random.randint(0, 1) for _ in range(size)] for _ in range(size)])
+    table = neighbours.SummedAreaTable(grid, is_toroid = True)
+    nested = grid.tolist()
+    positions = [(random.randrange(size), random.randrange(size)) for _ in range(queries)]
+
+    print(f"{'radius':>6} | {'table (us/query)':>16} | {'naive (us/query)':>16} | {'run (ms/step)':>13}")
+    print("-" * 62)
+    for radius in radii:
+        start = time.perf_counter()
+        for ns_pos, we_pos in positions:
+            table.window(ns_pos, we_pos, radius)
+        table_us = 1e6 * (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        for ns_pos, we_pos in positions[:max(1, queries // (radius + 1))]: # Fewer queries for the slow large windows
+            _naive_window(nested, ns_pos, we_pos, radius)
+        naive_us = 1e6 * (time.perf_counter() - start) / max(1, queries // (radius + 1))
+
+        params = _make_params(size, size, 0.1)
+        params.execution.max_steps = steps
+        params.foxes.sensing_radius = params.rabbits.sensing_radius = radius
+        duration, run_steps = _timed_run(params)
+        print(f"{radius:>6} | {table_us:>16.2f} | {naive_us:>16.2f} | {1000 * duration / run_steps:>13.2f}")
+
+
+def bench_meanfield(size: int, steps: int, skips: list[int], fit_steps: int, seeds: list[int]) -> None:
+    """Report the error and the speed-up of hybrid runs skipping ahead with the mean-field model, against full runs.
+
+    Parameters
+    ----------
+    size: The side length of the world
+    steps: The maximum number of steps of each run
+    skips: The numbers of steps skipped ahead after each window to measure
+    fit_steps: The number of agent-based steps in each window
+    seeds: The seeds of the compared runs
+    """
+    params = _make_params(size, size, 0.2)
+    params.execution.max_steps = steps
+    print(f"{'skip':>5} | {'skipped':>7} | {'rabbits error':>13} | {'foxes error':>11} | {'energy error':>12} | {'speed-up':>8}")
+    print("-" * 72)
+    for skip_steps in skips:
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = meanfield.compare(params, seeds, fit_steps = fit_steps, skip_steps = skip_steps)
+        print(f"{skip_steps:>5} | {report.skipped_share:>7.0%} | {report.rabbits_error:>13.1%} | "
+              f"{report.foxes_error:>11.1%} | {report.energy_error:>12.1%} | "
+              f"{report.full_seconds / report.hybrid_seconds:>7.1f}x")
+
+
+def bench_blocks(sizes: list[int], block_size: int, steps: int) -> None:
+    """Compare the time per step and the mean population sizes of full runs and coarse-grained block runs.
+
+    Parameters
+    ----------
+    sizes: The side lengths of the worlds to measure
+    block_size: The side length of a block in patches
+    steps: The maximum number of steps of each run
+    """
+    print(f"{'world':>10} | {'full (ms/step)':>14} | {'blocks (ms/step)':>16} | {'share':>6} | "
+          f"{'rabbits full/blocks':>19} | {'foxes full/blocks':>17}")
+    print("-" * 97)
+    for size in sizes:
+        params = _make_params(size, size, 0.2)
+        params.execution.max_steps = steps
+        params.execution.batch = True
+        results = []
+        for engine in (lambda: simulation.run(params, movement = "q", seed = 1),
+                       lambda: blocks.run(params, block_size = block_size, seed = 1)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = engine()
+            duration = time.perf_counter() - start
+            run_steps = len(stats.rabbits.size_per_step)
+            results.append((1000 * duration / run_steps,
+                            sum(stats.rabbits.size_per_step) / run_steps,
+                            sum(stats.foxes.size_per_step) / run_steps))
+        (full_ms, full_rabbits, full_foxes), (block_ms, block_rabbits, block_foxes) = results
+        print(f"{f'{size}x{size}':>10} | {full_ms:>14.1f} | {block_ms:>16.1f} | {block_ms / full_ms:>6.1%} | "
+              f"{f'{full_rabbits:.0f}/{block_rabbits:.0f}':>19} | {f'{full_foxes:.0f}/{block_foxes:.0f}':>17}")
+
+
+def bench_batched(worlds: list[int], size: int, steps: int) -> None:
+    """Compare the time taken and the mean population sizes of sequential runs and of a batch with as many worlds.
+
+    Parameters
+    ----------
+    worlds: The numbers of worlds (replicate runs) to measure
+    size: The side length of every world
+    steps: The maximum number of steps of each run
+    """
+    params = parameters.Simulation()
+    params.world.north_south_length = size
+    params.world.west_east_length = size
+    params.execution.max_steps = steps
+    params.execution.batch = True
+    print(f"{'worlds':>7} | {'sequential (s)':>14} | {'batched (s)':>11} | {'speed-up':>8} | "
+          f"{'rabbits seq/batch':>17} | {'foxes seq/batch':>15}")
+    print("-" * 88)
+    for count in worlds:
+        results = []
+        for engine in (lambda: [simulation.run(params, movement = "q", seed = seed) for seed in range(count)],
+                       lambda: batched.run(params, count, seed = 1)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                all_stats = engine()
+            duration = time.perf_counter() - start
+            results.append((duration,
+                            np.mean([np.mean(stats.rabbits.size_per_step) for stats in all_stats]),
+                            np.mean([np.mean(stats.foxes.size_per_step) for stats in all_stats])))
+        (seq_time, seq_rabbits, seq_foxes), (batch_time, batch_rabbits, batch_foxes) = results
+        print(f"{count:>7} | {seq_time:>14.2f} | {batch_time:>11.2f} | {seq_time / batch_time:>7.1f}x | "
+              f"{f'{seq_rabbits:.0f}/{batch_rabbits:.0f}':>17} | {f'{seq_foxes:.0f}/{batch_foxes:.0f}':>15}")
+
+
+def bench_stopping(window: int, tolerance: float, steps: int, seeds: list[int]) -> None:
+    """Compare the steps and time taken by runs going on to the maximum number of steps and by runs stopping once
+    the populations have settled or the foxes died out.
+
+    Parameters
+    ----------
+    window: The number of steps in a window of the settled condition (see stopping.Settled)
+    tolerance: The tolerance of the settled condition
+    steps: The maximum number of steps of each run
+    seeds: Seeds of the runs to measure
+    """
+    params = parameters.Simulation()
+    params.execution.max_steps = steps
+    params.execution.batch = True
+    print(f"{'seed':>5} | {'full (steps)':>12} | {'full (s)':>8} | {'early (steps)':>13} | {'early (s)':>9} | "
+          f"{'stopped by':>14} | {'rabbits full/early':>18}")
+    print("-" * 100)
+    for seed in seeds:
+        results = []
+        for conditions in ([], [stopping.Settled(window, tolerance), stopping.Extinction("foxes")]):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = simulation.run(params, movement = "q", seed = seed, stop = conditions)
+            results.append((stats, time.perf_counter() - start))
+        (full, full_time), (early, early_time) = results
+        print(f"{seed:>5} | {full.steps:>12} | {full_time:>8.2f} | {early.steps:>13} | {early_time:>9.2f} | "
+              f"{early.stop_reason:>14} | "
+              f"{f'{np.mean(full.rabbits.size_per_step):.0f}/{np.mean(early.rabbits.size_per_step):.0f}':>18}")
+
+
+def bench_imports(modules: list[str], repeats: int) -> None:
+    """Measure the time taken to start a fresh interpreter and import a module, and which heavy libraries it loads.
+
+    Parameters
+    ----------
+    modules: Names of the modules to import (e.g. "simulation" or "foxes_and_rabbits")
+    repeats: The number of fresh interpreters started for each module. The fastest start is reported.
+    """
+    paths = [os.path.abspath(path) for path in (".", os.path.join("Modules", "classes"),
+                                                 os.path.join("Modules", "run"), os.path.join("Modules", "menus"))]
+    baseline = None
+    print(f"{'module':>20} | {'start (ms)':>10} | {'import (ms)':>11} | {'numpy':>5} | {'matplotlib':>10}")
+    print("-" * 70)
+    for module in [""] + modules:
+        code = (f"import sys; sys.path[:0] = {paths!r}; " + (f"import {module}; " if module else "")
+                + "print('numpy' in sys.modules, 'matplotlib' in sys.modules)")
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, check = True)
+            durations.append(time.perf_counter() - start)
+        fastest = 1000 * min(durations)
+        if not module:
+            baseline = fastest # An interpreter importing nothing
+            continue
+        numpy_loaded, matplotlib_loaded = output.stdout.split()
+        print(f"{module:>20} | {fastest:>10.0f} | {fastest - baseline:>11.0f} | "
+              f"{'yes' if numpy_loaded == 'True' else 'no':>5} | {'yes' if matplotlib_loaded == 'True' else 'no':>10}")
+
+
+def bench_bundles(runs: int, workers: list[int], steps: int) -> None:
+    """Compare the time taken to build report bundles one after the other and in pools of processes.
+
+    Parameters
+    ----------
+    runs: The number of runs to build bundles for
+    workers: The numbers of processes to measure
+    steps: The maximum number of steps of each run
+    """
+    params = parameters.Simulation()
+    params.execution.max_steps = steps
+    params.execution.batch = True
+    with tempfile.TemporaryDirectory() as directory:
+        sources = []
+        for seed in range(runs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = simulation.run(params, movement = "q", seed = seed)
+            sources.append(os.path.join(directory, "runs", f"seed_{seed}"))
+            export.save(stats, sources[-1])
+        print(f"{'builder':>24} | {'time (s)':>8} | {'per bundle (ms)':>15}")
+        print("-" * 54)
+        start = time.perf_counter()
+        for source in sources:
+            target = os.path.join(directory, "fresh", os.path.basename(source))
+            bundles.ReportRenderer().render(export.load(source), target)
+        duration = time.perf_counter() - start
+        print(f"{'new figures per bundle':>24} | {duration:>8.2f} | {1000 * duration / runs:>15.0f}")
+        start = time.perf_counter()
+        renderer = bundles.ReportRenderer()
+        for source in sources:
+            target = os.path.join(directory, "reused", os.path.basename(source))
+            renderer.render(export.load(source), target)
+        duration = time.perf_counter() - start
+        print(f"{'reused figures':>24} | {duration:>8.2f} | {1000 * duration / runs:>15.0f}")
+        for count in workers:
+            start = time.perf_counter()
+            bundles.build_bundles(sources, os.path.join(directory, f"pool_{count}"), workers = count)
+            duration = time.perf_counter() - start
+            print(f"{f'pool of {count}':>24} | {duration:>8.2f} | {1000 * duration / runs:>15.0f}")
+
+
+def bench_events(size: int, steps: int, region: int, queries: int) -> None:
+    """Compare the time taken by runs with and without an event log, and by queries for the predation events in a
+    square region and a range of steps answered by the index of the log and by scanning every event.
+
+    Parameters
+    ----------
+    size: The side length of the world
+    steps: The maximum number of steps of each run
+    region: The side length of the queried regions
+    queries: The number of queries to measure
+    """
+    params = _make_params(size, size)
+    params.execution.max_steps = steps
+    log = eventlog.EventLog()
+    durations = []
+    for event_log in (None, log):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation.run(params, movement = "q", seed = 1, event_log = event_log)
+        durations.append(time.perf_counter() - start)
+    print(f"run without log: {durations[0]:.2f} s, with log: {durations[1]:.2f} s, {len(log)} events")
+
+    rng = np.random.default_rng(1)
+    windows = []
+    for _ in range(queries):
+        ns_start, we_start = rng.integers(0, size - region + 1, 2)
+        first = int(rng.integers(0, max(1, steps // 2)))
+        windows.append(((first, first + steps // 2), (ns_start, ns_start + region, we_start, we_start + region)))
+    log.query(region = (0, 1, 0, 1)) # Builds the index
+    events = log.events()
+    found = []
+    start = time.perf_counter()
+    for (first, last), (ns_start, ns_stop, we_start, we_stop) in windows:
+        found.append(len(events[(events["event"] == eventlog.PREDATION)
+                                & (events["step"] >= first) & (events["step"] < last)
+                                & (events["ns_pos"] >= ns_start) & (events["ns_pos"] < ns_stop)
+                                & (events["we_pos"] >= we_start) & (events["we_pos"] < we_stop)]))
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    for (window, area), expected in zip(windows, found):
+        assert len(log.query(steps = window, region = area, event = eventlog.PREDATION)) == expected
+    indexed = time.perf_counter() - start
+    print(f"{'query':>8} | {'per query (ms)':>14}")
+    print("-" * 26)
+    print(f"{'scan':>8} | {1000 * scan / queries:>14.3f}")
+    print(f"{'indexed':>8} | {1000 * indexed / queries:>14.3f}")
+
+
+class _GcPauses:
+    """Records how long every run of the garbage collector takes while in the context."""
+
+    def __init__(self):
+        self.pauses = []
+        self._start = None
+
+    def __call__(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.pauses.append(time.perf_counter() - self._start)
+            self._start = None
+
+    def __enter__(self) -> "_GcPauses":
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        gc.callbacks.remove(self)
+
+
+def bench_gc(size: int, steps: int, seed: int) -> None:
+    """Compare the time taken by runs, the pauses of the garbage collector and the slowest steps with and without
+    recycling dead animals and freezing the world out of reach of the garbage collector (see simulation.run).
+
+    Parameters
+    ----------
+    size: The side length of the world
+    steps: The maximum number of steps of each run
+    seed: Seed of the runs
+    """
+    params = _make_params(size, size)
+    params.execution.max_steps = steps
+    params.execution.batch = True
+    print(f"{'options':>16} | {'run (s)':>7} | {'collections':>11} | {'GC total (s)':>12} | {'GC max (ms)':>11} | "
+          f"{'step p50 (ms)':>13} | {'step max (ms)':>13}")
+    print("-" * 106)
+    for name, options in (("none", {}), ("pooling", {"pooling": True}), ("gc_freeze", {"gc_freeze": True}),
+                          ("both", {"pooling": True, "gc_freeze": True})):
+        step_times = []
+        last = [0.0]
+
+        def _observe(step: int, world, sim_stats) -> None:
+            now = time.perf_counter()
+            if step > 0:
+                step_times.append(now - last[0])
+            last[0] = now
+
+        gc.collect()
+        start = time.perf_counter()
+        with _GcPauses() as pauses, contextlib.redirect_stdout(io.StringIO()):
+            simulation.run(params, movement = "q", seed = seed, observe = _observe, **options)
+        duration = time.perf_counter() - start
+        print(f"{name:>16} | {duration:>7.2f} | {len(pauses.pauses):>11} | {sum(pauses.pauses):>12.3f} | "
+              f"{1000 * max(pauses.pauses, default = 0):>11.1f} | {1000 * np.median(step_times):>13.1f} | "
+              f"{1000 * max(step_times):>13.1f}")
+
+
+def bench_templates(size: int, density: float, steps: int, runs: int, workers: list[int]) -> None:
+    """Compare the runs per minute of ensembles creating a new world for every run and reusing a template, inherited
+    by forked worker processes or built once by every started one (see the module templates).
+    The runs grow grass lazily and only visit occupied patches, so short runs of big worlds are mostly setup.
+
+    Parameters
+    ----------
+    size: The side length of the world
+    density: The share of the world covered by rabbits at the start
+    steps: The maximum number of steps of each run
+    runs: The number of runs of each ensemble
+    workers: The numbers of processes to measure
+    """
+    params = _make_params(size, size, density)
+    params.execution.max_steps = steps
+    seeds = list(range(runs))
+    start = time.perf_counter()
+    templates.build(params)
+    print(f"Building a template of {size}x{size} patches: {time.perf_counter() - start:.2f} s")
+    print(f"{'workers':>7} | {'start':>5} | {'world':>8} | {'time (s)':>8} | {'runs/min':>8} | {'speed-up':>8}")
+    print("-" * 60)
+    for count in workers:
+        for start_method, setup in (("fork", "new"), ("fork", "template"), ("spawn", "new"), ("spawn", "template")):
+            start = time.perf_counter()
+            results = templates.run_ensemble(params, seeds, workers = count, reuse = setup != "new",
+                                             start_method = start_method, lazy_grass = True, scheduling = "active")
+            duration = time.perf_counter() - start
+            if setup == "new":
+                expected, baseline = results, duration
+            elif any(actual.rabbits.size_per_step != wanted.rabbits.size_per_step
+                     or actual.foxes.size_per_step != wanted.foxes.size_per_step
+                     for actual, wanted in zip(results, expected)):
+                raise RuntimeError("Reusing a template changed the results")
+            print(f"{count:>7} | {start_method:>5} | {setup:>8} | {duration:>8.2f} | {60 * runs / duration:>8.1f} | "
+                  f"{baseline / duration:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmarks for the foxes and rabbits simulation")
+    subparsers = parser.add_subparsers(dest = "benchmark", required = True)
+    memory = subparsers.add_parser("memory", help = "memory used per patch and per animal")
+    memory.add_argument("--sizes", type = int, nargs = "+", default = [20, 100, 500, 1000])
+    init = subparsers.add_parser("init", help = "time taken to build and populate a world")
+    init.add_argument("--sizes", type = int, nargs = "+", default = [100, 500, 1000, 2000])
+    init.add_argument("--density", type = float, default = 0.5)
+    scheduling = subparsers.add_parser("scheduling", help = "visiting every patch against only the occupied ones")
+    scheduling.add_argument("--size", type = int, default = 300)
+    scheduling.add_argument("--densities", type = float, nargs = "+", default = [0.001, 0.01, 0.05, 0.2])
+    scheduling.add_argument("--steps", type = int, default = 50)
+    radius = subparsers.add_parser("radius", help = "cost of sensing animals within growing radii")
+    radius.add_argument("--size", type = int, default = 100)
+    radius.add_argument("--radii", type = int, nargs = "+", default = [1, 2, 4, 8, 16, 32])
+    radius.add_argument("--steps", type = int, default = 20)
+    hybrid = subparsers.add_parser("meanfield", help = "error and speed-up of skipping ahead with the mean-field model")
+    hybrid.add_argument("--size", type = int, default = 100)
+    hybrid.add_argument("--steps", type = int, default = 200)
+    hybrid.add_argument("--skips", type = int, nargs = "+", default = [20, 50])
+    hybrid.add_argument("--fit-steps", type = int, default = 20)
+    hybrid.add_argument("--seeds", type = int, nargs = "+", default = [1, 2])
+    coarse = subparsers.add_parser("blocks", help = "full runs against coarse-grained block runs")
+    coarse.add_argument("--sizes", type = int, nargs = "+", default = [100, 300])
+    coarse.add_argument("--block-size", type = int, default = 10)
+    coarse.add_argument("--steps", type = int, default = 30)
+    batch = subparsers.add_parser("batched", help = "sequential replicate runs against a batch of worlds")
+    batch.add_argument("--worlds", type = int, nargs = "+", default = [8, 32, 128])
+    batch.add_argument("--size", type = int, default = 20)
+    batch.add_argument("--steps", type = int, default = 200)
+    early = subparsers.add_parser("stopping", help = "runs to the maximum number of steps against runs stopping early")
+    early.add_argument("--window", type = int, default = 100)
+    early.add_argument("--tolerance", type = float, default = 0.1)
+    early.add_argument("--steps", type = int, default = 1000)
+    early.add_argument("--seeds", type = int, nargs = "+", default = [1, 2, 3])
+    imports = subparsers.add_parser("imports", help = "time taken to start an interpreter and import a module")
+    imports.add_argument("--modules", nargs = "+",
+                         default = ["parameters", "simulation", "reporting", "foxes_and_rabbits"])
+    imports.add_argument("--repeats", type = int, default = 5)
+    report = subparsers.add_parser("bundles", help = "report bundles built one after the other and in process pools")
+    report.add_argument("--runs", type = int, default = 16)
+    report.add_argument("--workers", type = int, nargs = "+", default = [1, 2, 4])
+    report.add_argument("--steps", type = int, default = 500)
+    events = subparsers.add_parser("events", help = "cost of an event log and of indexed queries against full scans")
+    events.add_argument("--size", type = int, default = 100)
+    events.add_argument("--steps", type = int, default = 2000)
+    events.add_argument("--region", type = int, default = 20)
+    events.add_argument("--queries", type = int, default = 200)
+    collector = subparsers.add_parser("gc", help = "garbage collector pauses with and without pooling and freezing")
+    collector.add_argument("--size", type = int, default = 300)
+    collector.add_argument("--steps", type = int, default = 200)
+    collector.add_argument("--seed", type = int, default = 1)
+    template = subparsers.add_parser("templates", help = "runs per minute of ensembles with and without templates")
+    template.add_argument("--size", type = int, default = 1000)
+    template.add_argument("--density", type = float, default = 0.005)
+    template.add_argument("--steps", type = int, default = 20)
+    template.add_argument("--runs", type = int, default = 8)
+    template.add_argument("--workers", type = int, nargs = "+", default = [1, 4])
+    args = parser.parse_args()
+
+    if args.benchmark == "memory":
+        bench_memory(args.sizes)
+    elif args.benchmark == "init":
+        bench_init(args.sizes, args.density)
+    elif args.benchmark == "scheduling":
+        bench_scheduling(args.size, args.densities, args.steps)
+    elif args.benchmark == "radius":
+        bench_radius(args.size, args.radii, args.steps)
+    elif args.benchmark == "meanfield":
+        bench_meanfield(args.size, args.steps, args.skips, args.fit_steps, args.seeds)
+    elif args.benchmark == "blocks":
+        bench_blocks(args.sizes, args.block_size, args.steps)
+    elif args.benchmark == "batched":
+        bench_batched(args.worlds, args.size, args.steps)
+    elif args.benchmark == "stopping":
+        bench_stopping(args.window, args.tolerance, args.steps, args.seeds)
+    elif args.benchmark == "imports":
+        bench_imports(args.modules, args.repeats)
+    elif args.benchmark == "bundles":
+        bench_bundles(args.runs, args.workers, args.steps)
+    elif args.benchmark == "events":
+        bench_events(args.size, args.steps, args.region, args.queries)
+    elif args.benchmark == "gc":
+        bench_gc(args.size, args.steps, args.seed)
+    elif args.benchmark == "templates":
+        bench_templates(args.size, args.density, args.steps, args.runs, args.workers)
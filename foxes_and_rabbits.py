@@ -1,3 +1,5 @@
+import argparse
+import contextlib
 import os
 import sys
 import time
@@ -10,6 +12,10 @@ sys.path.append(os.path.join("Modules", "run"))
 
 # Importing the required modules for the script:
 import parameters, simulation, reporting, reporting_menu as rm, advanced_menu as am, config_menus as cm
+import runcache, export, metrics, navigation
+
+# Completed runs with a seed, reused when running again with the same parameters
+run_cache = runcache.RunCache()
 
 # Visual introduction to the simulation app.
 def ascii_text():
@@ -64,7 +70,7 @@ Execution Method: {params.execution} \n''')
 
 
 # Defining the quick setup menu:
-def quick_setup(params: parameters.Simulation) -> None:
+def quick_setup(params: parameters.Simulation) -> typing.Optional[navigation.Screen]:
     """
     Quick-Setup Function (menu).
     
@@ -78,7 +84,7 @@ def quick_setup(params: parameters.Simulation) -> None:
     
     Return
     ------
-    No Return value.
+    The next menu to show (see the module navigation).
     
     """
     
@@ -105,15 +111,14 @@ def quick_setup(params: parameters.Simulation) -> None:
             if 0 < nsl and 0 < wel and world_size > rabbits_size and world_size > foxes_size:
                 world.north_south_length = nsl
                 world.west_east_length = wel
-                quick_setup(params)
+                return navigation.goto(quick_setup, params)
             else:
                 print("Invalid input: North-South and West-East length must be a positive integer and larger than population size")
-                quick_setup(params)
-            quick_setup(params)
+                return navigation.goto(quick_setup, params)
         
         except ValueError:
             print('Not a valid world size..')
-            quick_setup(params)
+            return navigation.goto(quick_setup, params)
             
             
     # Size of population
@@ -129,14 +134,14 @@ def quick_setup(params: parameters.Simulation) -> None:
             if 0 < size_foxes < world_size and 0 < size_rabbits < world_size:
                 foxes.initial_size = size_foxes
                 rabbits.initial_size = size_rabbits
-                quick_setup(params)
+                return navigation.goto(quick_setup, params)
             else:
                 print("Invalid input. The size of a species must be larger than 0 and less than the size of the world")
-                quick_setup(params)
+                return navigation.goto(quick_setup, params)
                 
         except ValueError:
             print('Not a valid input..')
-            quick_setup(params)
+            return navigation.goto(quick_setup, params)
             
             
     # Max number of simulation steps
@@ -146,14 +151,14 @@ def quick_setup(params: parameters.Simulation) -> None:
             new_max_steps = int(input(f'Enter number of max steps: '))
             if 0 < new_max_steps: 
                 execution.max_steps = new_max_steps
-                quick_setup(params)
+                return navigation.goto(quick_setup, params)
             else:
                 print("Invalid input. Max steps must be a positive integer")
-                quick_setup(params)
+                return navigation.goto(quick_setup, params)
                 
         except ValueError:
             print('Not a valid input..')
-            quick_setup(params)
+            return navigation.goto(quick_setup, params)
              
              
     # Simulation modality  
@@ -170,30 +175,30 @@ def quick_setup(params: parameters.Simulation) -> None:
                 params.execution.batch = False
             else: #invalid
                 print("invalid input")
-            quick_setup(params)
+            return navigation.goto(quick_setup, params)
             
         except ValueError:
             print('Not a valid input..')
-            quick_setup(params)
+            return navigation.goto(quick_setup, params)
             
             
     # Go back  
     elif choice == "0":
         try:
             print('Going back..')
-            configuration(params)
+            return navigation.goto(configuration, params)
             
         except ValueError:
             print('Not a valid input..')
-            quick_setup(params)
+            return navigation.goto(quick_setup, params)
          
     else:
         print('Not a valid input.. Try again')
-        quick_setup(params)
+        return navigation.goto(quick_setup, params)
         
                 
 # Main menu is defined:
-def configuration(params: parameters.Simulation) -> None:
+def configuration(params: parameters.Simulation) -> typing.Optional[navigation.Screen]:
     """
     Configuration function (menu).
     
@@ -210,7 +215,7 @@ def configuration(params: parameters.Simulation) -> None:
     
     Return
     ------
-    No Return value.
+    The next menu to show (see the module navigation), or None when exiting.
     
     """
     
@@ -221,6 +226,8 @@ def configuration(params: parameters.Simulation) -> None:
  [3] - Advanced Setup
  [4] - Run
  [5] - Reset parameters to default
+ [6] - Reopen an earlier run
+ [7] - Open saved results
  [0] - Exit''')
     
     # Prompt user for an integer input to execute one of the four options
@@ -230,49 +237,121 @@ def configuration(params: parameters.Simulation) -> None:
     if choice == "1":
         print(f'You selected menu {choice}.\n')   
         display_parameters(params)
-        configuration(params)
+        return navigation.goto(configuration, params)
         
         
     # Run Quick setup configuration
     elif choice == "2":
         print(f'You selected menu {choice}.')
-        quick_setup(params)
+        return navigation.goto(quick_setup, params)
         
         
     # Run Advanced setup configuration
     elif choice == "3":
         print(f'You selected menu {choice}.')
-        am.advanced_menu(params)
+        return navigation.goto(am.advanced_menu, params)
         
         
     # Running the simulation and running reporting menu
     elif choice == "4":
         print(f'You selected menu {choice}.')
-        sim_results = simulation.run(params)
+        seed = input('Enter a seed for the run (batch runs with a seed are saved and reused; default = random run): ')
+        server = None
+        if params.execution.batch:
+            port = input('Serve live metrics on a local port? (port number, 0 = any free port; default = no): ')
+            if port.isdigit():
+                server = metrics.MetricsServer(port = int(port))
+                try:
+                    server.start()
+                    print(f'Metrics are served at http://127.0.0.1:{server.port}/metrics '
+                          '(also /metrics.json and /stream)')
+                except (OSError, OverflowError) as error: # E.g. the port is in use or out of range
+                    print(f'Could not serve metrics on port {port} ({error}), running without them..')
+                    server = None
+        try:
+            # Visual runs are not cached: their prompts are asked by the run, so a cached run would skip them and
+            # a replayed script (see navigation) would give their answers to the next prompts
+            if seed.isdigit() and params.execution.batch:
+                movement = simulation.choose_movement()
+                key = run_cache.key(params, int(seed), movement)
+                if key in run_cache:
+                    print('This run was done before, loading its results..')
+                sim_results = run_cache.run(params, int(seed), movement, metrics = server)
+            else:
+                sim_results = simulation.run(params, seed = int(seed) if seed.isdigit() else None, metrics = server)
+        finally:
+            if server is not None:
+                server.stop()
             
         # Run reporting menu             
-        rm.reporting_menu(params, sim_results)
+        return navigation.goto(rm.reporting_menu, params, sim_results)
     
     # Reset Parameter Values
     elif choice == "5":
         params = parameters.Simulation()
         print('Parameters were successfully reset!')
-        configuration(params)
+        return navigation.goto(configuration, params)
+        
+    # Reopen a run from the run cache in the reporting menu
+    elif choice == "6":
+        print(f'You selected menu {choice}.')
+        runs = run_cache.entries()
+        sim_results = None
+        for number, (key, description) in enumerate(runs, start = 1):
+            print(f"\n [{number}] - seed {description['seed']}, movement {description['movement']}, "
+                  f"{description['steps']} steps ({description['stop_reason']})\n{description['parameters']}")
+        if runs:
+            try:
+                number = int(input('\n Which run would you like to reopen?: '))
+                if 0 < number <= len(runs):
+                    sim_results = run_cache.load(runs[number - 1][0])
+            except ValueError:
+                pass
+        else:
+            print('There are no earlier runs yet. Runs with a seed are saved.')
+        
+        if sim_results is not None:
+            return navigation.goto(rm.reporting_menu, params, sim_results)
+        else:
+            print('Not a valid run..')
+            return navigation.goto(configuration, params)
+        
+    # Open results saved from the reporting menu (see the module export)
+    elif choice == "7":
+        print(f'You selected menu {choice}.')
+        directory = input('Enter the directory the results were saved to: ')
+        try:
+            sim_results = export.load(directory)
+        except (OSError, ValueError) as error:
+            print(f'Could not open the results: {error}')
+            return navigation.goto(configuration, params)
+        else:
+            return navigation.goto(rm.reporting_menu, params, sim_results)
         
     
         # Terminate Program
     elif choice == "0":
         print(f'Now Exiting...')
         time.sleep(1)
-        quit()
+        return None
         
         
-    else: # If any other input than 1,2,3,4,0
+    else: # If any other input than 1,2,3,4,5,6,7,0
         print('Not a valid entry point..')
-        configuration(params)    
+        return navigation.goto(configuration, params)
 
 if __name__ == '__main__':
-    params = parameters.Simulation()
-    display_parameters(params)
-    ascii_text()
-    configuration(params)
+    parser = argparse.ArgumentParser(description = 'Foxes and rabbits simulation')
+    parser.add_argument('--record', metavar = 'SCRIPT', help = 'save every answer typed to a script')
+    parser.add_argument('--replay', metavar = 'SCRIPT', help = 'answer from a recorded script, then ask as usual '
+                        '(reopened runs are picked from the run cache as it is now)')
+    args = parser.parse_args()
+    with contextlib.ExitStack() as session:
+        if args.replay:
+            session.enter_context(navigation.replaying(args.replay))
+        if args.record:
+            session.enter_context(navigation.recording(args.record))
+        params = parameters.Simulation()
+        display_parameters(params)
+        ascii_text()
+        navigation.run(configuration, params)